@@ -31,7 +31,9 @@ from gugubot.logic.plugins import (
     ActiveWhiteListSystem,
     CrossBroadcastSystem,
 )
-from gugubot.config import BotConfig
+from gugubot.config import BasicConfig, BotConfig
+from gugubot.utils.http_client import close_http_client
+from gugubot.utils.rcon_manager import close_rcon_manager
 from gugubot.utils import (
     check_plugin_version,
     StyleManager,
@@ -49,6 +51,11 @@ startup_command_system: StartupCommandSystem = None
 style_manager: StyleManager = None
 unbound_check_system: UnboundCheckSystem = None
 inactive_check_system: InactiveCheckSystem = None
+player_list_system: PlayerListSystem = None
+# 玩家进出服通知回调，在 on_load 中创建一次
+on_player_notice = None
+on_mcdr_player_joined = None
+on_mcdr_player_left = None
 
 
 # +---------------------------------------------------------------------+
@@ -60,6 +67,10 @@ async def on_load(server: PluginServerInterface, old) -> None:
     global style_manager
     global unbound_check_system
     global inactive_check_system
+    global player_list_system
+    global on_player_notice
+    global on_mcdr_player_joined
+    global on_mcdr_player_left
 
     # 尝试迁移旧版本配置
     config_path = Path(server.get_data_folder()) / "config.yml"
@@ -75,7 +86,7 @@ async def on_load(server: PluginServerInterface, old) -> None:
         except Exception as e:
             server.logger.error(f"迁移配置失败: {e}")
 
-    gugubot_config = BotConfig(config_path)
+    gugubot_config = BotConfig(config_path, logger=server.logger)
     gugubot_config.addNewConfig(server)
 
     is_main_server = gugubot_config.get_keys(
@@ -83,6 +94,8 @@ async def on_load(server: PluginServerInterface, old) -> None:
     )
 
     connector_manager = ConnectorManager(server, gugubot_config)
+    # on_load 运行在 MCDR 的异步执行器中，之后所有传输线程都把任务交给这个事件循环
+    connector_manager.runtime.bind()
 
     mc_connector = MCConnector(server, gugubot_config)
     connectors = [
@@ -204,23 +217,44 @@ async def on_load(server: PluginServerInterface, old) -> None:
         "PlayerDeathEvent", create_on_mc_death(gugubot_config, connector_manager)
     )
 
+    # 玩家进出服通知（控制台行匹配 / MCDR 事件，由 use_mcdr_player_events 切换）
+    on_player_notice = create_on_player_notice(connector_manager, gugubot_config)
+    on_mcdr_player_joined = create_on_mcdr_player_event(
+        connector_manager, gugubot_config, joined=True
+    )
+    on_mcdr_player_left = create_on_mcdr_player_event(
+        connector_manager, gugubot_config, joined=False
+    )
+
 
 # +---------------------------------------------------------------------+
 # # 防止初始化报错
 # qq_bot = None
 
 from gugubot.logic.plugins.player_notice import (
-    create_on_player_join,
-    create_on_player_left,
+    create_on_player_notice,
+    create_on_mcdr_player_event,
 )
 
 
 async def on_info(server: PluginServerInterface, info: Info) -> None:
-    if connector_manager is not None:
-        on_player_join = create_on_player_join(connector_manager, gugubot_config)
-        on_player_left = create_on_player_left(connector_manager, gugubot_config)
-        await on_player_join(server, info)
-        await on_player_left(server, info)
+    if on_player_notice is not None:
+        await on_player_notice(server, info)
+
+
+async def on_player_joined(server: PluginServerInterface, player: str, info: Info) -> None:
+    # 在线名单总是由 MCDR 事件维护，与 use_mcdr_player_events 无关
+    if player_list_system is not None:
+        player_list_system.on_player_joined(player)
+    if on_mcdr_player_joined is not None:
+        await on_mcdr_player_joined(server, player, info)
+
+
+async def on_player_left(server: PluginServerInterface, player: str) -> None:
+    if player_list_system is not None:
+        player_list_system.on_player_left(player)
+    if on_mcdr_player_left is not None:
+        await on_mcdr_player_left(server, player)
 
 
 #     # 玩家上线显示群公告
@@ -255,10 +289,20 @@ async def on_unload(server: PluginServerInterface) -> None:
         if inactive_check_system:
             inactive_check_system.stop_schedule_task()
 
+        # 停止在线名单校准任务
+        if player_list_system:
+            player_list_system.stop_schedule_task()
+
         if connector_manager:
             await connector_manager.disconnect_all()
+
+        close_http_client()
+        close_rcon_manager()
     except:
         pass
+    finally:
+        # 写入所有延迟保存的数据
+        BasicConfig.flush_all()
 
 
 # +---------------------------------------------------------------------+
@@ -268,6 +312,9 @@ from gugubot.logic.plugins import broadcast_server_start, broadcast_server_stop
 
 async def on_server_startup(server: PluginServerInterface) -> None:
     """服务器启动时的回调函数。"""
+    if player_list_system:
+        player_list_system.on_server_startup()
+
     try:
         if startup_command_system:
             await startup_command_system.execute_all_commands()
@@ -283,6 +330,9 @@ async def on_server_stop(
     server: PluginServerInterface, server_return_code: int
 ) -> None:
     """服务器停止时的回调函数。"""
+    if player_list_system:
+        player_list_system.on_server_stop()
+
     try:
         if connector_manager:
             # 广播服务器停止消息
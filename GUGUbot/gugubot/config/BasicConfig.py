@@ -1,5 +1,10 @@
+import copy
 import json
+import os
+import threading
+import time
 
+from contextlib import contextmanager
 from pathlib import Path
 from ruamel.yaml import YAML
 
@@ -8,18 +13,40 @@ yaml.preserve_quotes = True
 
 
 class BasicConfig(dict):
-    """Basic configuration class for loading and saving JSON/YAML files."""
+    """Basic configuration class for loading and saving JSON/YAML files.
+
+    By default every mutation rewrites the file synchronously. With
+    ``save_delay > 0`` the store switches to write-behind mode: mutations
+    copy the data and a debounced worker thread writes the latest copy once
+    the store has been quiet for ``save_delay`` seconds.
+    """
+
+    # id(store) -> store, stores with a pending write-behind flush
+    _pending_stores = {}
+    _pending_lock = threading.Lock()
 
     def __init__(
         self,
         path: str = "./config.json",
         default_content: dict = None,
         yaml_format: bool = False,
+        save_delay: float = 0,
     ) -> None:
         super().__init__()
         self.yaml_format = yaml_format
         self.path = Path(path).with_suffix(".yml" if yaml_format else ".json")
         self.default_content = default_content or {}
+        self.save_delay = save_delay
+        self._dirty = False
+        self._batch_depth = 0
+        # write-behind state: (sequence, data) snapshot taken on the mutating thread
+        self._pending = None
+        self._seq = 0
+        self._written_seq = 0
+        self._flush_at = 0.0
+        self._worker = None
+        self._save_lock = threading.RLock()
+        self._write_lock = threading.Lock()
         self.load()
 
     def load(self) -> None:
@@ -32,13 +59,143 @@ class BasicConfig(dict):
             self.save()
 
     def save(self) -> None:
-        """Save data to file."""
+        """Save data to file (or schedule it in write-behind mode)."""
+        self._dirty = True
+        if self._batch_depth > 0:
+            return
+
+        if self.save_delay and self.save_delay > 0:
+            self._schedule_flush()
+        else:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes to file immediately."""
+        with self._save_lock:
+            if self._dirty:
+                self._take_snapshot()
+            pending = self._pending
+            self._pending = None
+        with BasicConfig._pending_lock:
+            BasicConfig._pending_stores.pop(id(self), None)
+
+        if pending is None:
+            return
+        try:
+            self._write_pending(pending)
+        except Exception:
+            self._requeue(pending)
+            raise
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into a single write.
+
+        Examples
+        --------
+        >>> with store.batch():
+        ...     store["a"] = 1
+        ...     store["b"] = 2
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.save()
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Flush every store that still has a pending write-behind flush."""
+        with cls._pending_lock:
+            stores = list(cls._pending_stores.values())
+        for store in stores:
+            store.flush()
+
+    def _take_snapshot(self) -> None:
+        """Copy the data on the thread that changed it; the worker only writes.
+
+        Must be called with ``_save_lock`` held.
+        """
+        if self.save_delay and self.save_delay > 0:
+            data = copy.deepcopy(dict(self))
+        else:
+            data = dict(self)
+        self._dirty = False
+        self._seq += 1
+        self._pending = (self._seq, data)
+
+    def _schedule_flush(self) -> None:
+        with self._save_lock:
+            self._take_snapshot()
+            self._flush_at = time.monotonic() + self.save_delay
+            # one debounced worker per store, later saves only push the deadline back
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._flush_worker,
+                    name=f"[GUGUBot]Save_{self.path.name}",
+                    daemon=True,
+                )
+                self._worker.start()
+        with BasicConfig._pending_lock:
+            BasicConfig._pending_stores[id(self)] = self
+
+    def _flush_worker(self) -> None:
+        while True:
+            with self._save_lock:
+                if self._pending is None:
+                    self._worker = None
+                    return
+                delay = self._flush_at - time.monotonic()
+                pending = None
+                if delay <= 0:
+                    pending = self._pending
+                    self._pending = None
+
+            if pending is None:
+                time.sleep(delay)
+                continue
+
+            try:
+                self._write_pending(pending)
+            except Exception:
+                # keep the data queued and retry after another delay;
+                # flush_all() on unload still sees the store
+                self._requeue(pending)
+                with self._save_lock:
+                    self._flush_at = time.monotonic() + self.save_delay
+                continue
+
+            with BasicConfig._pending_lock, self._save_lock:
+                if self._pending is None:
+                    BasicConfig._pending_stores.pop(id(self), None)
+
+    def _requeue(self, pending) -> None:
+        with self._save_lock:
+            if self._pending is None or self._pending[0] < pending[0]:
+                self._pending = pending
+        with BasicConfig._pending_lock:
+            BasicConfig._pending_stores[id(self)] = self
+
+    def _write_pending(self, pending) -> None:
+        seq, data = pending
+        with self._write_lock:
+            # a newer snapshot may already have been written by flush()
+            if seq <= self._written_seq:
+                return
+            self._write(data)
+            self._written_seq = seq
+
+    def _write(self, data: dict) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        with self.path.open("w", encoding="UTF-8") as f:
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with temp_path.open("w", encoding="UTF-8") as f:
             if self.yaml_format:
-                yaml.dump(dict(self), f)
+                yaml.dump(data, f)
             else:
-                json.dump(dict(self), f, ensure_ascii=False)
+                json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
 
     def __setitem__(self, key, value):
         super().__setitem__(key, value)
@@ -1,6 +1,97 @@
 import json
 
+from dataclasses import dataclass
+from typing import Tuple
+
 from gugubot.config.BasicConfig import BasicConfig, yaml
+from gugubot.config.pattern_registry import PatternRegistry
+
+
+def _id_set(ids) -> frozenset:
+    if not isinstance(ids, (list, tuple, set)):
+        ids = [ids]
+    return frozenset(str(i) for i in ids if i)
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """配置的只读快照。
+
+    在配置加载/保存时预先计算好热路径上需要的数据，
+    避免每条消息都重复遍历配置字典、重建 id 列表。
+    """
+
+    command_prefix: str = "#"
+    group_admin: bool = False
+
+    qq_source: str = "QQ"
+    minecraft_source: str = "Minecraft"
+    bridge_source: str = "Bridge"
+
+    admin_ids: frozenset = frozenset()
+    admin_group_ids: frozenset = frozenset()
+    group_ids: frozenset = frozenset()
+    forward_group_ids: Tuple[str, ...] = ()  # 未配置时回退为 group_ids
+    valid_source_ids: frozenset = frozenset()  # 允许接收消息的 QQ 号/群号
+    friend_is_admin: bool = False
+    exclude_ids: frozenset = frozenset()
+
+    # 聊天模板及对应权重
+    chat_templates: Tuple[str, ...] = ()
+    chat_template_weights: Tuple[float, ...] = ()
+    max_message_length: int = 2000
+
+    # 玩家进出服识别（正则见 BotConfig.patterns）
+    use_mcdr_player_events: bool = False
+
+    @classmethod
+    def from_config(cls, config: BasicConfig) -> "ConfigSnapshot":
+        """从配置构建快照"""
+        permissions = config.get_keys(["connector", "QQ", "permissions"], {}) or {}
+
+        admin_ids = _id_set(permissions.get("admin_ids") or [])
+        admin_group_ids = _id_set(permissions.get("admin_group_ids") or [])
+        group_ids = _id_set(permissions.get("group_ids") or [])
+        forward_group_ids = [
+            str(i) for i in (permissions.get("forward_group_ids") or []) if i
+        ] or sorted(group_ids)
+
+        templates, weights = [], []
+        for item in config.get_keys(["connector", "QQ", "chat_templates"], []) or []:
+            # 旧格式为纯字符串列表，权重视为 1
+            pairs = item.items() if isinstance(item, dict) else [(item, 1)]
+            for template_str, weight in pairs:
+                templates.append(str(template_str))
+                weights.append(weight if isinstance(weight, (int, float)) else 1)
+
+        return cls(
+            command_prefix=config.get_keys(["GUGUBot", "command_prefix"], "#"),
+            group_admin=bool(config.get_keys(["GUGUBot", "group_admin"], False)),
+            qq_source=config.get_keys(["connector", "QQ", "source_name"], "QQ"),
+            minecraft_source=config.get_keys(
+                ["connector", "minecraft", "source_name"], "Minecraft"
+            ),
+            bridge_source=config.get_keys(
+                ["connector", "minecraft_bridge", "source_name"], "Bridge"
+            ),
+            admin_ids=admin_ids,
+            admin_group_ids=admin_group_ids,
+            group_ids=group_ids,
+            forward_group_ids=tuple(forward_group_ids),
+            valid_source_ids=admin_ids | admin_group_ids | group_ids,
+            friend_is_admin=bool(permissions.get("friend_is_admin", False)),
+            exclude_ids=_id_set(
+                config.get_keys(["system", "bound_notice", "exclude_ids"], []) or []
+            ),
+            chat_templates=tuple(templates),
+            chat_template_weights=tuple(weights),
+            max_message_length=config.get_keys(
+                ["connector", "QQ", "max_message_length"], 2000
+            ),
+            use_mcdr_player_events=bool(
+                config.get_keys(["connector", "minecraft", "use_mcdr_player_events"], False)
+            ),
+        )
 
 
 class BotConfig(BasicConfig):
@@ -8,12 +99,32 @@ class BotConfig(BasicConfig):
         self, path="./config.yml", default_content=None, yaml_format=True, logger=None
     ):
         self.logger = logger
+        self.snapshot = ConfigSnapshot()
+        # 用户正则按配置快照版本编译，快照替换后自动重新编译
+        self.patterns = PatternRegistry(self)
         super().__init__(path, default_content, yaml_format)
 
     def load(self):
         self.validate()
         super().load()
         self.plugin_check()
+        self.refresh_snapshot()
+
+    def save(self) -> None:
+        self.refresh_snapshot()
+        super().save()
+
+    def refresh_snapshot(self) -> ConfigSnapshot:
+        """重新构建配置快照（整体替换，读者不会看到半更新的状态）
+
+        直接修改嵌套配置后应调用 ``save()`` 或本方法以刷新快照。
+        """
+        try:
+            self.snapshot = ConfigSnapshot.from_config(self)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"配置快照构建失败: {e}")
+        return self.snapshot
 
     def addNewConfig(self, server):
         """Add new configs from latest version to current config"""
@@ -43,31 +154,46 @@ class BotConfig(BasicConfig):
         # Not exist/None -> error
         # not list -> [value]
         # extra empty value -> remove empty value
-        listTypeConfigs = ["admin_id", "group_id"]
-
-        for config_name in listTypeConfigs:
-            if not self.get(config_name):
+        with self.batch():
+            listTypeConfigs = ["admin_id", "group_id"]
+
+            for config_name in listTypeConfigs:
+                if not self.get(config_name):
+                    if self.logger:
+                        self.logger.error(f"请设置 {config_name}")
+                    continue
+
+                value = self[config_name]
+                if not isinstance(value, list):
+                    self[config_name] = [value]
+                    continue
+
+                if any(value):
+                    self[config_name] = [i for i in value if i]
+
+            # prevent None value/not list type
+            if "admin_group_id" in self:
+                if not self["admin_group_id"]:
+                    self["admin_group_id"] = []
+
+                elif not isinstance(self["admin_group_id"], list):
+                    self["admin_group_id"] = [self["admin_group_id"]]
+
+            # 旧格式 chat_templates（字符串列表）转换为 {模板: 权重}
+            chat_templates = self.get_keys(["connector", "QQ", "chat_templates"], [])
+            if isinstance(chat_templates, list) and any(
+                not isinstance(item, dict) for item in chat_templates
+            ):
+                self["connector"]["QQ"]["chat_templates"] = [
+                    item if isinstance(item, dict) else {item: 1}
+                    for item in chat_templates
+                ]
                 if self.logger:
-                    self.logger.error(f"请设置 {config_name}")
-                continue
-
-            value = self[config_name]
-            if not isinstance(value, list):
-                self[config_name] = [value]
-                continue
-
-            if any(value):
-                self[config_name] = [i for i in value if i]
-
-        # prevent None value/not list type
-        if "admin_group_id" in self:
-            if not self["admin_group_id"]:
-                self["admin_group_id"] = []
-
-            elif not isinstance(self["admin_group_id"], list):
-                self["admin_group_id"] = [self["admin_group_id"]]
+                    self.logger.info(
+                        "已自动将 chat_templates 从旧格式更新为新格式（默认权重为1）"
+                    )
 
-        self.save()
+            self.save()
 
     def validate(self):
         """Validate config file and prompt user where is wrong, including YAML/JSON syntax errors."""
@@ -2,9 +2,13 @@
 #+----------------------------------------------------------------------+
 
 from gugubot.config.BasicConfig import BasicConfig
-from gugubot.config.BotConfig import BotConfig
+from gugubot.config.BotConfig import BotConfig, ConfigSnapshot
+from gugubot.config.pattern_registry import PatternGroup, PatternRegistry
 
 __all__ = [
     'BasicConfig',
     'BotConfig',
+    'ConfigSnapshot',
+    'PatternGroup',
+    'PatternRegistry',
 ]
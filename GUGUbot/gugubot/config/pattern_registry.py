@@ -0,0 +1,220 @@
+"""用户正则表达式注册表。
+
+配置中的各组正则（机器人名称、忽略的 MC 命令等）在每个配置版本编译一次：
+同组的模式合并为一个正则，并用各模式中必定出现的固定文本做子串预筛；
+无效的模式只在加载时报告一次。热路径通过 :meth:`PatternRegistry.get`
+取得编译好的 :class:`PatternGroup`，配置重载后自动换成新版本。
+"""
+
+import re
+import threading
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+# 预筛文本过短时命中率太高，不如直接跑正则
+_MIN_LITERAL_LENGTH = 3
+
+# 反向引用与条件分组引用：合并后分组编号会改变
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# 组名 -> (配置路径列表, 编译标志)
+PATTERN_GROUPS: Dict[str, Tuple[Tuple[Tuple[str, ...], ...], int]] = {
+    "player_join": ((("connector", "minecraft", "player_join_patterns"),), 0),
+    "player_left": ((("connector", "minecraft", "player_left_patterns"),), 0),
+    # 加入与离开合并，用于一次性预筛控制台行
+    "player_event": (
+        (
+            ("connector", "minecraft", "player_join_patterns"),
+            ("connector", "minecraft", "player_left_patterns"),
+        ),
+        0,
+    ),
+    "bot_names": ((("connector", "minecraft", "bot_names_pattern"),), re.IGNORECASE),
+    "ignore_mc_command": (
+        (("connector", "minecraft", "ignore_mc_command_patterns"),),
+        0,
+    ),
+    "ignore_execute_command": (
+        (("system", "execute", "ignore_execute_command_patterns"),),
+        0,
+    ),
+    "bound_player_name": ((("system", "bound", "player_name_pattern"),), 0),
+}
+
+
+def required_literal(compiled: re.Pattern) -> Optional[str]:
+    """提取模式中必定出现的最长固定文本，无法确定时返回 None"""
+    if compiled.flags & re.IGNORECASE:
+        return None
+    try:
+        parsed = sre_parse.parse(compiled.pattern)
+    except Exception:
+        return None
+
+    longest, current = "", []
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        if len(current) > len(longest):
+            longest = "".join(current)
+        current = []
+    if len(current) > len(longest):
+        longest = "".join(current)
+
+    return longest if len(longest) >= _MIN_LITERAL_LENGTH else None
+
+
+def can_combine(pattern: str) -> bool:
+    """模式能否与其它模式合并为一个正则。
+
+    含反向引用（``\\1``、``(?P=name)``）或条件分组（``(?(1)...)``、``(?(name)...)``）
+    的模式合并后引用的分组编号会改变，只能逐个匹配。
+    """
+    return _GROUP_REFERENCE.search(pattern) is None
+
+
+class PatternGroup:
+    """一组编译好的正则。
+
+    Parameters
+    ----------
+    patterns : Iterable[str]
+        正则表达式列表
+    flags : int
+        编译标志
+
+    Attributes
+    ----------
+    patterns : List[re.Pattern]
+        有效的模式，保持配置顺序
+    invalid : List[Tuple[str, str]]
+        无效的模式及错误信息
+    literals : Optional[Tuple[str, ...]]
+        预筛文本，任一模式提取不出固定文本时为 None（不预筛）
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), flags: int = 0) -> None:
+        self.patterns: List[re.Pattern] = []
+        self.invalid: List[Tuple[str, str]] = []
+        for pattern in patterns:
+            try:
+                self.patterns.append(re.compile(str(pattern), flags))
+            except re.error as e:
+                self.invalid.append((str(pattern), str(e)))
+
+        literals = [required_literal(p) for p in self.patterns]
+        self.literals: Optional[Tuple[str, ...]] = (
+            tuple(set(literals)) if literals and None not in literals else None
+        )
+
+        self._combined: Optional[re.Pattern] = None
+        if len(self.patterns) == 1:
+            self._combined = self.patterns[0]
+        elif self.patterns and all(can_combine(p.pattern) for p in self.patterns):
+            try:
+                self._combined = re.compile(
+                    "|".join(f"(?:{p.pattern})" for p in self.patterns), flags
+                )
+            except re.error:
+                self._combined = None
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _prefilter(self, text: str) -> bool:
+        return self.literals is None or any(
+            literal in text for literal in self.literals
+        )
+
+    def search(self, text: str) -> bool:
+        """任一模式在 text 中出现（re.search 语义）"""
+        if not self.patterns or not self._prefilter(text):
+            return False
+        if self._combined is not None:
+            return self._combined.search(text) is not None
+        return any(p.search(text) for p in self.patterns)
+
+    def match(self, text: str) -> bool:
+        """任一模式从 text 开头匹配（re.match 语义）"""
+        if not self.patterns or not self._prefilter(text):
+            return False
+        if self._combined is not None:
+            return self._combined.match(text) is not None
+        return any(p.match(text) for p in self.patterns)
+
+    def first_search(self, text: str) -> Optional[re.Match]:
+        """按配置顺序返回第一个 search 命中的匹配对象，用于读取捕获组"""
+        if not self.search(text):
+            return None
+        for pattern in self.patterns:
+            if match := pattern.search(text):
+                return match
+        return None
+
+
+class PatternRegistry:
+    """按配置版本缓存的正则注册表。
+
+    Parameters
+    ----------
+    config : BotConfig
+        配置对象，``config.snapshot`` 的替换即视为配置版本变化
+    groups : Dict[str, Tuple[Tuple[Tuple[str, ...], ...], int]]
+        组定义，默认为 :data:`PATTERN_GROUPS`
+    """
+
+    def __init__(self, config: Any, groups: Optional[Dict[str, Any]] = None) -> None:
+        self.config = config
+        self.group_specs = dict(groups if groups is not None else PATTERN_GROUPS)
+        self.version = 0
+
+        self._snapshot: Any = None
+        self._groups: Dict[str, PatternGroup] = {}
+        self._reported: set = set()
+        self._lock = threading.Lock()
+
+    def _read_patterns(self, paths: Sequence[Tuple[str, ...]]) -> List[str]:
+        patterns = []
+        for path in paths:
+            value = self.config.get_keys(list(path), []) or []
+            # 单个字符串（如 player_name_pattern）视为只有一个模式
+            patterns.extend([value] if isinstance(value, str) else value)
+        return patterns
+
+    def reload(self) -> None:
+        """按当前配置重新编译所有组，整体替换"""
+        with self._lock:
+            snapshot = getattr(self.config, "snapshot", None)
+            groups = {}
+            for name, (paths, flags) in self.group_specs.items():
+                group = PatternGroup(self._read_patterns(paths), flags)
+                groups[name] = group
+                for pattern, error in group.invalid:
+                    self._report(name, pattern, error)
+
+            self._groups = groups
+            self._snapshot = snapshot
+            self.version += 1
+
+    def _report(self, name: str, pattern: str, error: str) -> None:
+        if (name, pattern) in self._reported:
+            return
+        self._reported.add((name, pattern))
+        logger = getattr(self.config, "logger", None)
+        if logger:
+            logger.warning(f"[{name}] 无效的正则表达式 {pattern!r}: {error}")
+
+    def get(self, name: str) -> PatternGroup:
+        """获取编译好的正则组，配置快照变化后自动重新编译"""
+        if self._snapshot is not getattr(self.config, "snapshot", None) or not self._groups:
+            self.reload()
+        return self._groups.get(name, _EMPTY_GROUP)
+
+
+_EMPTY_GROUP = PatternGroup()
@@ -56,6 +56,13 @@ class BasicConnector(ABC):
         self.enable_send: bool = config.get_keys(
             ["connector", self.source, "enable_send"], self.enable
         )
+        # 广播发送超时与并发上限，None 时使用 ConnectorManager 的默认值
+        self.send_timeout: Optional[float] = None
+        self.max_concurrent_sends: Optional[int] = None
+
+    def submit_task(self, coro) -> Any:
+        """从传输线程把协程交给 GUGUBot 事件循环执行"""
+        return self.connector_manager.runtime.submit(coro)
 
     @abstractmethod
     async def connect(self) -> None:
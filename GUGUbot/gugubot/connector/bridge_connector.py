@@ -1,8 +1,9 @@
-import json
-import time
 import asyncio
+import time
 import threading
-from typing import Any, Dict
+
+from collections import deque
+from typing import Any, Coroutine, Deque, Dict, Hashable, List, Optional
 
 from mcdreforged.api.types import Info
 
@@ -11,7 +12,10 @@ from gugubot.connector.basic_connector import BasicConnector
 from gugubot.config.BotConfig import BotConfig
 from gugubot.utils.types import ProcessedInfo, BoardcastInfo, Source
 from gugubot.parser.mc_parser import MCParser
-from gugubot.ws import WebSocketFactory
+from gugubot.ws import WebSocketFactory, bridge_codec
+from gugubot.ws.bridge_codec import PeerCapabilities
+from gugubot.ws.bridge_rpc import BridgeRpc, RpcHandler
+from gugubot.ws.frame_batcher import FrameBatcher
 
 
 class BridgeConnector(BasicConnector):
@@ -20,8 +24,13 @@ class BridgeConnector(BasicConnector):
     根据配置中的is_main_server决定运行模式：
     - True: 启动WebSocket服务器，等待其他服务器连接
     - False: 作为客户端连接到主服务器
+
+    服务器间的内部查询通过 :meth:`request` 发起 RPC，对端以客户端 id
+    （子服务器视角下主服务器为 ``"server"``）标识。
     """
 
+    SERVER_PEER = "server"
+
     def __init__(self, server, config: BotConfig = None):
         source_name = config.get_keys(
             ["connector", "minecraft_bridge", "source_name"], "Bridge"
@@ -67,6 +76,37 @@ class BridgeConnector(BasicConnector):
         self.extra_sslopt = config.get_keys(
             ["connector", "minecraft_bridge", "connection", "sslopt"], {}
         )
+        self.compression = config.get_keys(
+            ["connector", "minecraft_bridge", "connection", "compression"], True
+        )
+        self.request_raw = config.get_keys(
+            ["connector", "minecraft_bridge", "connection", "request_raw"], False
+        )
+
+        # 合并窗口（毫秒），0 表示不合并
+        self.batch_window = (
+            config.get_keys(
+                ["connector", "minecraft_bridge", "connection", "batch_window"], 10
+            )
+            or 0
+        ) / 1000
+        self.batch_max_size = config.get_keys(
+            ["connector", "minecraft_bridge", "connection", "batch_max_size"], 32
+        )
+        self._batcher = FrameBatcher(
+            self._send_to_server, self.batch_window, self.batch_max_size
+        )
+
+        # 协商结果：主服务器按客户端 id 记录，子服务器记录主服务器的
+        self._client_capabilities: Dict[Any, PeerCapabilities] = {}
+        self._server_capabilities = PeerCapabilities()
+
+        # RPC：已知支持 RPC 的对端与进行中的请求
+        self.rpc = BridgeRpc(self.server.logger)
+
+        # 按对端排队的入站消息，每个对端由一个任务按到达顺序逐条处理
+        self._inbound: Dict[Hashable, Deque[Coroutine]] = {}
+        self._inbound_workers: Dict[Hashable, asyncio.Task] = {}
 
         # 创建WebSocket实例
         self.ws_server = None
@@ -108,6 +148,9 @@ class BridgeConnector(BasicConnector):
                 pass
 
         self._connect_count += 1
+        self._server_capabilities = PeerCapabilities()
+        self._batcher.clear()
+        self.submit_task(self._remove_rpc_peer(self.SERVER_PEER))
 
         if self._connect_count > 1:
             self.logger.info(
@@ -148,6 +191,9 @@ class BridgeConnector(BasicConnector):
 
     def _on_client_disconnect(self, client: Dict, server: Any) -> None:
         """客户端从服务器断开时"""
+        if client:
+            self._client_capabilities.pop(client.get("id"), None)
+            self.submit_task(self._remove_rpc_peer(client.get("id")))
         client_address = client.get("address") if client else "unknown"
         client_count = self.ws_server.get_client_count() if self.ws_server else 0
         self.logger.info(
@@ -157,6 +203,13 @@ class BridgeConnector(BasicConnector):
     def _on_client_open(self, ws) -> None:
         """客户端连接建立时"""
         self.logger.info(f"{self.log_prefix} 连接成功 ~")
+        # 声明本端支持的协议，主服务器回复 hello 前仍使用旧格式
+        if self.ws_client:
+            self.ws_client.send(
+                bridge_codec.make_hello(
+                    "client", self.compression, self.request_raw, self.batch_window > 0
+                )
+            )
 
     def _on_client_error(self, ws, error: Exception) -> None:
         """客户端连接错误时"""
@@ -174,6 +227,7 @@ class BridgeConnector(BasicConnector):
 
         reason_text = f"({reason})" if reason else ""
         self.logger.info(f"{self.log_prefix} 连接已断开 {reason_text}")
+        self.submit_task(self._remove_rpc_peer(self.SERVER_PEER))
 
         # 实现持续重连
         if self.reconnect > 0 and self.enable and not self._is_reconnecting:
@@ -217,42 +271,165 @@ class BridgeConnector(BasicConnector):
             ).start()
 
     def _handle_server_message(self, client: Dict, server: Any, message: str) -> None:
-        """处理服务器端接收到的消息"""
+        """处理服务器端接收到的消息（运行在 WebSocket 线程）"""
         try:
-            message_data = json.loads(message) if isinstance(message, str) else message
+            messages = bridge_codec.decode_frames(message)
+        except Exception as e:
+            self.logger.error(f"{self.log_prefix} 消息处理失败: {e}")
+            return
 
+        # 批量帧按顺序逐条处理
+        ordered = []
+        for message_data in messages:
+            if bridge_codec.is_hello(message_data):
+                self._handle_hello_from_client(client, message_data)
+                continue
+
+            # RPC 控制帧只在两端之间往返，不转发、不经过各系统
+            if bridge_codec.is_rpc(message_data):
+                self.submit_task(
+                    self.rpc.handle(
+                        client.get("id"),
+                        message_data,
+                        lambda frame, c=client: self._send_control_to_client(c, frame),
+                    )
+                )
+                continue
+
+            ordered.append(self._handle_server_message_async(client, message_data))
+
+        self._submit_in_order(client.get("id"), ordered)
+
+    async def _handle_server_message_async(self, client: Dict, message_data: Dict) -> None:
+        """在 GUGUBot 事件循环中转发并处理服务器端消息"""
+        try:
             # 广播给其他客户端
             if self.ws_server and self.ws_server.get_client_count() > 1:
                 message_data["bridge_source"] = client.get("address", ["unknown", 0])[0]
                 sender_id = message_data.get("sender_id", None)
-                message_data["is_admin"] = asyncio.run(self._is_admin(sender_id))
+                message_data["is_admin"] = await self._is_admin(sender_id)
 
-                for other_client in self.ws_server.get_clients():
-                    if other_client["id"] != client["id"]:
-                        self.ws_server.send_message(other_client, message_data)
+                self._broadcast(message_data, exclude=client)
 
             # 处理消息并传递给本地系统
-            asyncio.run(self._process_bridge_message(message_data))
+            await self._process_bridge_message(message_data)
 
         except Exception as e:
             self.logger.error(f"{self.log_prefix} 消息处理失败: {e}")
 
     def _handle_client_message(self, ws, message: str) -> None:
-        """处理客户端接收到的消息"""
+        """处理客户端接收到的消息（运行在 WebSocket 线程）"""
         try:
-            message_data = json.loads(message) if isinstance(message, str) else message
+            messages = bridge_codec.decode_frames(message)
+        except Exception as e:
+            self.logger.error(f"{self.log_prefix} 消息处理失败: {e}")
+            return
 
+        # 批量帧按顺序逐条处理
+        ordered = []
+        for message_data in messages:
             if (
                 isinstance(message_data, dict)
                 and message_data.get("type") == "server_shutdown"
             ):
-                return
+                break
+
+            if bridge_codec.is_hello(message_data):
+                # 旧版主服务器会把其他客户端的 hello 转发过来，只认主服务器的
+                if message_data.get("role") == "server":
+                    self._server_capabilities = bridge_codec.parse_hello(
+                        message_data, self.compression, self.batch_window > 0
+                    )
+                    if bridge_codec.supports_rpc(message_data):
+                        self.rpc.add_peer(self.SERVER_PEER)
+                    self.logger.debug(
+                        f"{self.log_prefix} 协商完成: {self._server_capabilities}"
+                    )
+                continue
+
+            if bridge_codec.is_rpc(message_data):
+                self.submit_task(
+                    self.rpc.handle(self.SERVER_PEER, message_data, self._send_control)
+                )
+                continue
 
             # 处理消息并传递给本地系统
-            asyncio.run(self._process_bridge_message(message_data))
+            ordered.append(self._process_bridge_message(message_data))
 
-        except Exception as e:
-            self.logger.error(f"{self.log_prefix} 消息处理失败: {e}")
+        self._submit_in_order(self.SERVER_PEER, ordered)
+
+    def _submit_in_order(self, peer: Hashable, coros: List[Coroutine]) -> None:
+        """把同一对端的消息按到达顺序交给事件循环（运行在 WebSocket 线程）
+
+        处理过程中会等待（管理员判断、各系统处理），逐条提交任务会让后到的消息
+        先于前面的消息完成，因此入队在事件循环中同步进行，再由单个任务依次执行。
+        RPC 控制帧不经过这里，避免处理函数中发起的请求等待排在后面的回复。
+        """
+        if coros:
+            self.connector_manager.runtime.call_soon(self._enqueue_inbound, peer, coros)
+
+    def _enqueue_inbound(self, peer: Hashable, coros: List[Coroutine]) -> None:
+        queue = self._inbound.setdefault(peer, deque())
+        queue.extend(coros)
+        worker = self._inbound_workers.get(peer)
+        if worker is None or worker.done():
+            self._inbound_workers[peer] = asyncio.ensure_future(self._drain_inbound(peer))
+
+    async def _drain_inbound(self, peer: Hashable) -> None:
+        queue = self._inbound[peer]
+        try:
+            while queue:
+                try:
+                    await queue.popleft()
+                except Exception as e:
+                    self.logger.error(f"{self.log_prefix} 消息处理失败: {e}")
+        finally:
+            # 队列清空后移除，断开的对端不会残留
+            if not queue:
+                self._inbound.pop(peer, None)
+                self._inbound_workers.pop(peer, None)
+
+    def _handle_hello_from_client(self, client: Dict, message_data: Dict) -> None:
+        """记录客户端协议能力并回复主服务器的 hello"""
+        if message_data.get("role") != "client" or not self.ws_server:
+            return
+        capabilities = bridge_codec.parse_hello(
+            message_data, self.compression, self.batch_window > 0
+        )
+        self._client_capabilities[client.get("id")] = capabilities
+        if bridge_codec.supports_rpc(message_data):
+            self.rpc.add_peer(client.get("id"))
+        self.ws_server.send_message(
+            client,
+            bridge_codec.make_hello(
+                "server", self.compression, self.request_raw, self.batch_window > 0
+            ),
+        )
+        if capabilities.batch:
+            self.ws_server.set_client_batching(
+                client, self.batch_window, self.batch_max_size
+            )
+        self.logger.debug(
+            f"{self.log_prefix} 客户端 {client.get('address')} 协商完成: {capabilities}"
+        )
+
+    def _broadcast(self, message_data: Dict, exclude: Optional[Dict] = None) -> int:
+        """按各客户端协商的格式广播消息，每种格式只编码一次"""
+        frames: Dict[PeerCapabilities, str] = {}
+        exclude_id = exclude.get("id") if exclude else None
+        count = 0
+        for client in self.ws_server.get_clients():
+            if client.get("id") == exclude_id:
+                continue
+            capabilities = self._client_capabilities.get(
+                client.get("id"), PeerCapabilities()
+            )
+            frame = frames.get(capabilities)
+            if frame is None:
+                frame = frames[capabilities] = bridge_codec.encode(message_data, capabilities)
+            if self.ws_server.send_message(client, frame, control=False):
+                count += 1
+        return count
 
     async def _process_bridge_message(self, message_data: Dict) -> None:
         """处理桥接消息"""
@@ -315,16 +492,102 @@ class BridgeConnector(BasicConnector):
         if self.is_main_server:
             # 服务器模式：广播给所有连接的客户端
             if self.ws_server and self.ws_server.is_running():
-                count = self.ws_server.broadcast(message_data)
+                count = self._broadcast(message_data)
                 self.logger.debug(f"{self.log_prefix} 广播消息给 {count} 个客户端")
         else:
             # 客户端模式：发送给服务器
             if self.ws_client and self.ws_client.is_connected():
-                if self.ws_client.send(message_data):
+                frame = bridge_codec.encode(message_data, self._server_capabilities)
+                if self._server_capabilities.batch:
+                    sent = self._batcher.put(frame)
+                else:
+                    sent = self.ws_client.send(frame)
+                if sent:
                     self.logger.debug(f"{self.log_prefix} 发送消息到服务器")
                 else:
                     self.logger.warning(f"{self.log_prefix} 发送消息失败")
 
+    # ------------------------------------------------------------------
+    # RPC
+    # ------------------------------------------------------------------
+
+    def register_rpc_handler(self, method: str, handler: RpcHandler) -> None:
+        """注册 RPC 处理函数，处理函数接收 params 字典并返回可 JSON 序列化的结果"""
+        self.rpc.register(method, handler)
+
+    def rpc_peers(self) -> set:
+        """已连接且支持 RPC 的对端"""
+        return self.rpc.peers()
+
+    def legacy_peer_count(self) -> int:
+        """已连接但不支持 RPC 的旧版本对端数量"""
+        if self.is_main_server:
+            if not self.ws_server:
+                return 0
+            return self.ws_server.get_client_count() - len(self.rpc.peers())
+        connected = bool(self.ws_client and self.ws_client.is_connected())
+        return int(connected and not self.rpc.peers())
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: float = 3,
+    ) -> Dict[Hashable, Any]:
+        """向所有支持 RPC 的对端发起请求，全部回复或超时后返回
+
+        Returns
+        -------
+        Dict[Hashable, Any]
+            对端 -> 结果，未回复的对端不在其中
+        """
+        if not self.enable:
+            return {}
+        return await self.rpc.call(method, params, self._send_rpc, timeout=timeout)
+
+    def _send_rpc(self, peer: Hashable, frame: Dict[str, Any]) -> bool:
+        if not self.is_main_server:
+            return peer == self.SERVER_PEER and self._send_control(frame)
+        if not self.ws_server:
+            return False
+        for client in self.ws_server.get_clients():
+            if client.get("id") == peer:
+                return self._send_control_to_client(client, frame)
+        return False
+
+    def _send_control_to_client(self, client: Dict, frame: Dict[str, Any]) -> bool:
+        return bool(
+            self.ws_server and self.ws_server.send_message(client, frame, control=True)
+        )
+
+    def _send_control(self, frame: Dict[str, Any]) -> bool:
+        """子服务器向主服务器发送控制帧"""
+        return bool(
+            self.ws_client and self.ws_client.is_connected() and self.ws_client.send(frame)
+        )
+
+    async def _remove_rpc_peer(self, peer: Hashable) -> None:
+        self.rpc.remove_peer(peer)
+
+    def _send_to_server(self, frame: str) -> bool:
+        """子服务器合并发送器使用的实际发送函数"""
+        if self.ws_client and self.ws_client.is_connected():
+            return self.ws_client.send(frame)
+        return False
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取桥接统计信息（主服务器各客户端发送队列深度等）"""
+        if self.is_main_server and self.ws_server:
+            return {
+                "send_queues": self.ws_server.get_queue_metrics(),
+                "rpc": self.rpc.get_metrics(),
+            }
+        return {
+            "frames": self._batcher.frames,
+            "batches": self._batcher.batches,
+            "rpc": self.rpc.get_metrics(),
+        }
+
     async def disconnect(self) -> None:
         """断开连接"""
         try:
@@ -1,12 +1,12 @@
 import asyncio
-import re
 import traceback
 import logging
 
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from gugubot.connector.basic_connector import BasicConnector, BoardcastInfo
 from gugubot.config.BotConfig import BotConfig
+from gugubot.utils.async_runtime import AsyncRuntime
 from gugubot.utils.types import ProcessedInfo
 
 
@@ -21,6 +21,8 @@ class ConnectorManager:
         当前管理的所有连接器实例
     logger : logging.Logger
         日志记录器实例
+    runtime : AsyncRuntime
+        GUGUBot 事件循环句柄，传输线程通过它把任务交给事件循环
     """
 
     def __init__(
@@ -38,6 +40,23 @@ class ConnectorManager:
         self.server = server
         self.config = bot_config
         self.logger = logger or server.logger
+        self.runtime = AsyncRuntime(server, self.logger)
+
+        # 广播设置，连接器可通过同名属性单独覆盖
+        self.send_timeout = bot_config.get_keys(["GUGUBot", "broadcast", "send_timeout"], 10)
+        self.max_concurrent_sends = bot_config.get_keys(
+            ["GUGUBot", "broadcast", "max_concurrent_sends"], 8
+        )
+        self.wait_for_delivery = bot_config.get_keys(
+            ["GUGUBot", "broadcast", "wait_for_delivery"], True
+        )
+
+        # 路由表：来源名前缀 -> 匹配的连接器，注册/移除连接器时清空
+        self._route_cache: Dict[str, Tuple[BasicConnector, ...]] = {}
+        self.routes_version = 0  # 连接器列表每次变化时递增，供外部缓存判断是否失效
+        self._semaphores: Dict[int, asyncio.Semaphore] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._send_stats: Dict[str, Dict[str, int]] = {}
 
         self.system_manager = None  # gugubot.logic.system.system_manager.SystemManager
 
@@ -92,6 +111,7 @@ class ConnectorManager:
 
             await connector.connect()
             self.connectors.append(connector)
+            self._rebuild_routes()
 
             self.logger.info(f"已添加并连接到连接器: {connector.source}")
         except Exception as e:
@@ -118,22 +138,63 @@ class ConnectorManager:
         try:
             await connector.disconnect()
             self.connectors.remove(connector)
+            self._rebuild_routes()
             self.logger.info(f"已断开并移除连接器: {connector.source}")
         except Exception as e:
             error_msg = str(e) + "\n" + traceback.format_exc()
             self.logger.error(f"断开 {connector.source} 失败: {error_msg}")
             # 仍然从列表中移除，即使断开连接失败
             self.connectors.remove(connector)
+            self._rebuild_routes()
             raise
 
+    def _rebuild_routes(self) -> None:
+        """连接器变化后重建路由表"""
+        self._route_cache = {}
+        self.routes_version += 1
+        alive = {id(connector) for connector in self.connectors}
+        self._semaphores = {
+            key: semaphore for key, semaphore in self._semaphores.items() if key in alive
+        }
+
+    def _match_source(self, pattern: str) -> Tuple[BasicConnector, ...]:
+        """按来源名前缀匹配连接器（与原先 re.match(re.escape(p), source) 一致）"""
+        connectors = self._route_cache.get(pattern)
+        if connectors is None:
+            connectors = tuple(c for c in self.connectors if c.source.startswith(pattern))
+            self._route_cache[pattern] = connectors
+        return connectors
+
+    def _route(
+        self, include: Optional[List[str]], exclude: Optional[List[str]]
+    ) -> List[BasicConnector]:
+        """根据 include/exclude 得到目标连接器，保持注册顺序"""
+        if include is None and not exclude:
+            return list(self.connectors)
+
+        included = None
+        if include is not None:
+            included = {id(c) for p in include for c in self._match_source(p)}
+        excluded = {id(c) for p in exclude or () for c in self._match_source(p)}
+
+        return [
+            c
+            for c in self.connectors
+            if (included is None or id(c) in included) and id(c) not in excluded
+        ]
+
     async def broadcast_processed_info(
         self,
         processed_info: ProcessedInfo,
         include: Optional[List[str]] = None,
         exclude: Optional[List[str]] = None,
+        wait: Optional[bool] = None,
+        on_failure: Optional[Callable[[BasicConnector, ProcessedInfo, Exception], None]] = None,
     ) -> Dict[str, Exception]:
         """向所有连接器广播消息。
 
+        每个连接器的发送有超时限制和并发上限，慢速连接器不会无限期拖住调用方。
+
         Parameters
         ----------
         message : Any
@@ -142,6 +203,11 @@ class ConnectorManager:
             仅向这些源的连接器发送消息（如果为None，则发送给所有连接器）
         exclude : Optional[List[str]]
             不向这些源的连接器发送消息
+        wait : Optional[bool]
+            是否等待发送完成，None 时使用配置 GUGUBot.broadcast.wait_for_delivery；
+            为 False 时立即返回空字典，失败通过 on_failure 通知
+        on_failure : Optional[Callable]
+            发送失败（含超时）时的回调，参数为 (connector, processed_info, exception)
 
         Returns
         -------
@@ -149,32 +215,25 @@ class ConnectorManager:
             发送失败的连接器及其对应的异常信息
         """
         failures: Dict[str, Exception] = {}
-        tasks = []
-        to_conectors = self.connectors
+        to_conectors = self._route(include, exclude)
 
-        # 使用 re.escape 将来源名按字面匹配，避免 source_name 中的正则特殊字符（如 [ ]）导致排除/包含失效
-        if include is not None:
-            to_conectors = [
-                c for c in to_conectors if any(re.match(re.escape(p), c.source) for p in include)
-            ]
-
-        if exclude is not None:
-            to_conectors = [
-                c
-                for c in to_conectors
-                if not any(re.match(re.escape(p), c.source) for p in exclude)
-            ]
-
-        connector_info = f"广播消息到连接器: {to_conectors}"
-        message_info = f"消息内容: {processed_info}"
-        debug_msg = connector_info + "\n" + message_info
-        self.logger.debug(debug_msg)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            connector_info = f"广播消息到连接器: {to_conectors}"
+            message_info = f"消息内容: {processed_info}"
+            self.logger.debug(connector_info + "\n" + message_info)
 
         # 创建所有发送任务
+        tasks = []
         for connector in to_conectors:
-            task = asyncio.create_task(self._safe_send(connector, processed_info))
+            task = asyncio.create_task(self._safe_send(connector, processed_info, on_failure))
             tasks.append((connector, task))
 
+        if not (self.wait_for_delivery if wait is None else wait):
+            for _, task in tasks:
+                self._background_tasks.add(task)
+                task.add_done_callback(self._on_background_done)
+            return failures
+
         # 等待所有任务完成
         for connector, task in tasks:
             try:
@@ -184,8 +243,32 @@ class ConnectorManager:
 
         return failures
 
+    def _on_background_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        # 取出异常，失败已在 _safe_send 中记录
+        if not task.cancelled():
+            task.exception()
+
+    def _get_semaphore(self, connector: BasicConnector) -> Optional[asyncio.Semaphore]:
+        limit = getattr(connector, "max_concurrent_sends", None) or self.max_concurrent_sends
+        if not limit or limit <= 0:
+            return None
+        semaphore = self._semaphores.get(id(connector))
+        if semaphore is None:
+            semaphore = self._semaphores[id(connector)] = asyncio.Semaphore(limit)
+        return semaphore
+
+    def _count(self, connector: BasicConnector, key: str) -> None:
+        stats = self._send_stats.setdefault(
+            connector.source, {"sent": 0, "failed": 0, "timeout": 0}
+        )
+        stats[key] += 1
+
     async def _safe_send(
-        self, connector: BasicConnector, message: ProcessedInfo
+        self,
+        connector: BasicConnector,
+        message: ProcessedInfo,
+        on_failure: Optional[Callable] = None,
     ) -> None:
         """安全地向单个连接器发送消息。
 
@@ -195,19 +278,59 @@ class ConnectorManager:
             目标连接器
         message : Any
             要发送的消息
+        on_failure : Optional[Callable]
+            发送失败时的回调
 
         Raises
         ------
         Exception
-            如果发送失败
+            如果发送失败或超时
         """
+        timeout = getattr(connector, "send_timeout", None) or self.send_timeout
+        semaphore = self._get_semaphore(connector)
+
+        async def send() -> None:
+            if semaphore is None:
+                await connector.send_message(message)
+                return
+            async with semaphore:
+                await connector.send_message(message)
+
         try:
-            await connector.send_message(message)
+            # 排队等待并发名额的时间也计入超时
+            await asyncio.wait_for(send(), timeout or None)
+            self._count(connector, "sent")
         except Exception as e:
-            error_msg = str(e) + "\n" + traceback.format_exc()
-            self.logger.error(f"发送消息到 {connector.source} 失败: {error_msg}")
+            if isinstance(e, asyncio.TimeoutError):
+                self._count(connector, "timeout")
+                self.logger.warning(f"发送消息到 {connector.source} 超时（{timeout} 秒）")
+            else:
+                self._count(connector, "failed")
+                error_msg = str(e) + "\n" + traceback.format_exc()
+                self.logger.error(f"发送消息到 {connector.source} 失败: {error_msg}")
+
+            if on_failure is not None:
+                try:
+                    on_failure(connector, message, e)
+                except Exception as callback_error:
+                    self.logger.error(f"发送失败回调执行出错: {callback_error}")
             raise
 
+    def get_metrics(self) -> Dict[str, Dict]:
+        """获取运行时及各连接器的统计信息"""
+        metrics = {
+            "runtime": self.runtime.get_metrics(),
+            "broadcast": {
+                "pending": len(self._background_tasks),
+                "connectors": {k: dict(v) for k, v in self._send_stats.items()},
+            },
+        }
+        for connector in self.connectors:
+            get_metrics = getattr(connector, "get_metrics", None)
+            if callable(get_metrics):
+                metrics[connector.source] = get_metrics()
+        return metrics
+
     async def disconnect_all(self) -> Dict[str, Exception]:
         """断开所有连接器的连接。
 
@@ -1,16 +1,18 @@
 import traceback
-import time
+import threading
 import uuid
 import re
-import random
 
 import asyncio
 
-from typing import Any, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from gugubot.builder.qq_builder import CQHandler
 from gugubot.connector.basic_connector import BasicConnector
 from gugubot.config.BotConfig import BotConfig
+from gugubot.utils.chat_template import ChatTemplateSet
+from gugubot.utils.group_members import GroupMemberService
+from gugubot.utils.send_scheduler import SendScheduler
 from gugubot.utils.types import ProcessedInfo
 from gugubot.parser.qq_parser import QQParser
 from gugubot.ws import WebSocketFactory
@@ -33,44 +35,101 @@ def strip_minecraft_color_codes(text: str) -> str:
 
 
 class Bot:
+    """OneBot API 调用代理。
+
+    ``get_*`` / ``can_*`` / ``_get*`` 形式的调用会自动附加 echo，并为每个 echo
+    登记一个 ``asyncio.Future``；WebSocket 线程收到响应后通过 :meth:`resolve`
+    以 ``call_soon_threadsafe`` 的方式唤醒等待方，无需轮询。
+    """
+
     def __init__(self, send_message, max_wait_time: int = 9) -> None:
         self.send_message = send_message
         self.max_wait_time = max_wait_time if 0 < max_wait_time <= 9 else 9
-        self.function_return = {}
         self.self_id = None  # 机器人自己的QQ号
 
+        # echo -> (事件循环, Future)，仅在等待期间存在
+        self._pending: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        self._pending_lock = threading.Lock()
+        # 超时后才到达或无人等待的响应数量，用于判断 max_wait_time 是否过短
+        self.late_responses = 0
+
     @staticmethod
     def format_request(action: str, params: dict = {}):
         return {"action": action, "params": params, "echo": params.get("echo", "")}
 
+    @staticmethod
+    def _set_future_result(future: asyncio.Future, data: Any) -> None:
+        if not future.done():
+            future.set_result(data)
+
+    def resolve(self, echo: str, data: Any) -> bool:
+        """将 API 响应交付给等待中的调用（线程安全）。
+
+        Parameters
+        ----------
+        echo : str
+            响应中的 echo 标识
+        data : Any
+            响应数据
+
+        Returns
+        -------
+        bool
+            是否存在对应的等待方；否则计入 ``late_responses`` 并丢弃
+        """
+        with self._pending_lock:
+            pending = self._pending.pop(echo, None)
+
+        if pending is not None:
+            loop, future = pending
+            try:
+                loop.call_soon_threadsafe(self._set_future_result, future, data)
+                return True
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+        with self._pending_lock:
+            self.late_responses += 1
+        return False
+
+    async def _call_with_echo(
+        self, name: str, params: dict, timeout: Optional[float] = None
+    ) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        echo = str(uuid.uuid4())
+        params["echo"] = echo
+
+        with self._pending_lock:
+            self._pending[echo] = (loop, future)
+
+        try:
+            await self.send_message(self.format_request(name, params))
+            return await asyncio.wait_for(
+                future, timeout if timeout is not None else self.max_wait_time
+            )
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            # 超时或被取消时清理，避免等待表无限增长
+            with self._pending_lock:
+                self._pending.pop(echo, None)
+
     def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
         if (
             name.startswith("get_")
             or name.startswith("can_")
             or name.startswith("_get")
         ):
 
-            async def handler(**kwargs):
+            async def handler(wait_timeout: Optional[float] = None, **kwargs):
                 # For methods that are expected to return a value,
                 # automatically add an echo id to track the response.
-
-                function_return_id = str(uuid.uuid4())
-                kwargs["echo"] = function_return_id
-                command_request = self.format_request(name, kwargs)
-                await self.send_message(command_request)
-
-                start_time = time.time()
-                import asyncio
-
-                while True:
-                    if function_return_id in self.function_return:
-                        result = self.function_return[function_return_id]
-                        del self.function_return[function_return_id]
-                        return result
-
-                    await asyncio.sleep(0.2)
-                    if time.time() - start_time >= self.max_wait_time:
-                        return None
+                return await self._call_with_echo(name, kwargs, timeout=wait_timeout)
 
         else:
 
@@ -124,6 +183,31 @@ class QQWebSocketConnector(BasicConnector):
             ),
         )
 
+        # 群成员快照，绑定/未绑定检查/不活跃检查共用
+        self.group_members = GroupMemberService(
+            self.bot,
+            server.logger,
+            max_age=config.get_keys(
+                ["connector", "QQ", "permissions", "group_member_cache_ttl"], 300
+            ),
+        )
+
+        # 编译后的聊天模板，配置快照更新时重新编译
+        self._chat_template_set = ChatTemplateSet()
+        self._chat_template_snapshot = None
+
+        # 发送调度：全局与单个会话分别限速，同一会话按顺序发送，不同会话并发发送
+        self.send_scheduler = SendScheduler(
+            global_rate=config.get_keys(["connector", "QQ", "send_limit", "global_rate"], 0),
+            global_burst=config.get_keys(["connector", "QQ", "send_limit", "global_burst"], 10),
+            target_rate=config.get_keys(["connector", "QQ", "send_limit", "target_rate"], 0),
+            target_burst=config.get_keys(["connector", "QQ", "send_limit", "target_burst"], 3),
+            max_queue_size=config.get_keys(
+                ["connector", "QQ", "send_limit", "max_queue_size"], 100
+            ),
+            logger=server.logger,
+        )
+
     def _build_url(self, config):
         host = config.get_keys(["connector", "QQ", "connection", "host"], "127.0.0.1")
         port = config.get_keys(["connector", "QQ", "connection", "port"], 8080)
@@ -311,18 +395,12 @@ class QQWebSocketConnector(BasicConnector):
         if not self.enable:
             return
 
+        snapshot = self.config.snapshot
+
         # 优先使用 forward_group_ids，如果未配置则回退到 group_ids（保持向后兼容）
-        forward_group_ids = self.config.get_keys(
-            ["connector", "QQ", "permissions", "forward_group_ids"], []
-        )
-        if not forward_group_ids or not any(forward_group_ids):
-            forward_group_ids = self.config.get_keys(
-                ["connector", "QQ", "permissions", "group_ids"], []
-            )
-        forward_group_target = {
-            str(group_id): "group" for group_id in forward_group_ids if group_id
+        target = processed_info.target or {
+            group_id: "group" for group_id in snapshot.forward_group_ids
         }
-        target = processed_info.target or forward_group_target
 
         message = processed_info.processed_message
         source = processed_info.source  # Source 对象
@@ -333,88 +411,68 @@ class QQWebSocketConnector(BasicConnector):
 
         # 检查原始来源是否不是 QQ（需要添加来源前缀）
         if not source.is_from("QQ") and source.origin and processed_info.sender:
-            # 从config中获取聊天模板列表
-            chat_templates = self.config.get_keys(
-                ["connector", "QQ", "chat_templates"], []
+            # 根据权重随机选择模板；未配置模板时使用默认格式 [{display_name}] {sender}:
+            # {display_name}对应source，{sender}对应processed_info.sender
+            source_message = self.chat_template_set.render_segments(
+                source.origin, processed_info.sender
             )
-
-            # 如果配置了模板，根据权重随机选择一个；否则使用默认格式
-            if (
-                chat_templates
-                and isinstance(chat_templates, list)
-                and len(chat_templates) > 0
-            ):
-                # 检查是否为字典格式（带权重）
-                if isinstance(chat_templates[0], dict):
-                    # 字典格式: {"模板字符串": 权重值}
-                    templates = []
-                    weights = []
-                    for item in chat_templates:
-                        for template_str, weight in item.items():
-                            templates.append(template_str)
-                            weights.append(
-                                weight if isinstance(weight, (int, float)) else 1
-                            )
-                    # 使用权重随机选择
-                    template = random.choices(templates, weights=weights, k=1)[0]
-                else:
-                    # 旧格式：转换为新格式并保存
-                    new_templates = [{tmpl: 1} for tmpl in chat_templates]
-                    self.config["connector"]["QQ"]["chat_templates"] = new_templates
-                    self.config.save()  # 手动保存配置
-                    if self.logger:
-                        self.logger.info(
-                            "已自动将 chat_templates 从旧格式更新为新格式（默认权重为1）"
-                        )
-                    # 从转换后的新格式中随机选择
-                    template = random.choice(chat_templates)
-
-                # 使用模板格式化消息，{display_name}对应source，{sender}对应processed_info.sender
-                formatted_text = template.format(
-                    display_name=source.origin, sender=processed_info.sender
-                )
-            else:
-                # 默认格式（向后兼容）
-                formatted_text = f"[{source.origin}] {processed_info.sender}: "
-
-            source_message = CQHandler.parse(formatted_text)
             message = source_message + message
 
         # 如果是玩家进出服务器消息，不显示发送者
         elif not source.is_from("QQ") and source.origin and processed_info.sender == "":
             message = CQHandler.parse(f"[{source.origin}] ") + message
 
-        # 获取消息最大长度配置，默认为 2000
-        max_message_length = self.config.get_keys(
-            ["connector", "QQ", "max_message_length"], 2000
+        # 分割消息（如果太长），最大长度默认为 2000
+        message_parts = self._split_message(
+            message, max_length=snapshot.max_message_length
         )
 
-        # 分割消息（如果太长）
-        message_parts = self._split_message(message, max_length=max_message_length)
-
+        # 只入队，由发送调度器按限速发送；多段消息的分段间隔只阻塞对应会话
         for target_id, target_type in target.items():
             
             if not target_id.isdigit():
                 continue
 
-            for part in message_parts:
-                if target_type == "group":
-                    await self.bot.send_group_msg(group_id=int(target_id), message=part)
-                elif target_type == "private":
-                    await self.bot.send_private_msg(user_id=int(target_id), message=part)
-                else:
-                    await self.bot.send_temp_msg(
-                        group_id=int(target_type), user_id=int(target_id), message=part
-                    )
-                
-                # 如果消息被分割成多段，每段之间稍微延迟，避免发送过快
-                if len(message_parts) > 1:
-                    random_time = random.uniform(0.5, 1.5)
-                    await asyncio.sleep(random_time)
+            self.send_scheduler.enqueue(
+                (target_type, target_id),
+                message_parts,
+                self._make_part_sender(target_id, target_type),
+            )
+
+    @property
+    def chat_template_set(self) -> ChatTemplateSet:
+        """当前配置对应的已编译聊天模板"""
+        snapshot = self.config.snapshot
+        if snapshot is not self._chat_template_snapshot:
+            self._chat_template_set = ChatTemplateSet(
+                snapshot.chat_templates, snapshot.chat_template_weights
+            )
+            self._chat_template_snapshot = snapshot
+        return self._chat_template_set
+
+    def _make_part_sender(self, target_id: str, target_type: str):
+        """创建向指定会话发送单段消息的协程函数"""
+        if target_type == "group":
+            return lambda part: self.bot.send_group_msg(group_id=int(target_id), message=part)
+        if target_type == "private":
+            return lambda part: self.bot.send_private_msg(user_id=int(target_id), message=part)
+        return lambda part: self.bot.send_temp_msg(
+            group_id=int(target_type), user_id=int(target_id), message=part
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取发送队列深度、发送延迟与迟到的 API 响应统计"""
+        return {
+            "send_queue": self.send_scheduler.get_metrics(),
+            "late_responses": self.bot.late_responses,
+        }
 
     async def disconnect(self) -> None:
         """断开与QQ WebSocket服务器的连接"""
         try:
+            # 尽量发完已排队的消息（如关服通知）
+            await self.send_scheduler.drain(timeout=3)
+            await self.send_scheduler.close()
             if self.ws_client:
                 self.ws_client.disconnect(timeout=5)
             self.logger.info(
@@ -432,7 +490,7 @@ class QQWebSocketConnector(BasicConnector):
 
         处理流程:
         1. 将原始JSON字符串解析为消息数据
-        2. 如果是回调消息（包含echo），存储到function_return
+        2. 如果是回调消息（包含echo），交付给等待中的 API 调用
         3. 如果是事件消息：
            - 更新机器人ID（如果包含）
            - 创建并处理QQ信息对象
@@ -456,15 +514,14 @@ class QQWebSocketConnector(BasicConnector):
                 message_data = json.loads(raw_message)
                 echo = message_data.get("echo")
                 if echo:
-                    # API 响应，直接存储到 function_return（线程安全）
-                    self.bot.function_return[echo] = message_data
+                    # API 响应，唤醒对应的等待方（线程安全）
+                    self.bot.resolve(echo, message_data)
                     return
             except:
                 pass
 
-            # 对于事件消息，调度到 MCDR 主线程的事件循环
-            # 使用 server.schedule_task 确保在正确的事件循环中执行
-            self.server.schedule_task(self.parser(self).process_message(raw_message))
+            # 对于事件消息，交给 GUGUBot 事件循环执行
+            self.submit_task(self.parser(self).process_message(raw_message))
 
         except Exception as e:
             # 使用翻译条目并包含堆栈信息
@@ -8,8 +8,9 @@ from gugubot.logic.plugins.server_notice import (
     broadcast_server_stop
 )
 from gugubot.logic.plugins.player_notice import (
-    create_on_player_join,
-    create_on_player_left,
+    create_on_player_notice,
+    create_on_mcdr_player_event,
+    PlayerEventMatcher,
 )
 from gugubot.logic.plugins.unbound_check import UnboundCheckSystem
 from gugubot.logic.plugins.inactive_check import InactiveCheckSystem
@@ -19,8 +20,9 @@ from gugubot.logic.plugins.cross_broadcast import CrossBroadcastSystem
 __all__ = [
     'broadcast_server_start',
     'broadcast_server_stop',
-    'create_on_player_join',
-    'create_on_player_left',
+    'create_on_player_notice',
+    'create_on_mcdr_player_event',
+    'PlayerEventMatcher',
     'UnboundCheckSystem',
     'InactiveCheckSystem',
     'ActiveWhiteListSystem',
@@ -22,6 +22,9 @@ class ActiveWhiteListSystem(BasicConfig, BasicSystem):
     用于管理活跃白名单玩家，这些玩家在 inactive_check 时会被过滤掉。
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(self, server: PluginServerInterface, config: BotConfig = None) -> None:
         """初始化活跃白名单系统
 
@@ -85,12 +88,9 @@ class ActiveWhiteListSystem(BasicConfig, BasicSystem):
         if not boardcast_info.is_admin:
             return False
 
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
 
-        command = command.replace(command_prefix, "", 1).strip()
-
         if not command.startswith(system_name):
             return False
 
@@ -107,11 +107,8 @@ class ActiveWhiteListSystem(BasicConfig, BasicSystem):
 
     async def _handle_add(self, boardcast_info: BoardcastInfo) -> bool:
         """处理添加玩家命令"""
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
         command = command.replace(system_name, "", 1).strip()
         command = command.replace(self.get_tr("add"), "", 1).strip()
 
@@ -143,11 +140,8 @@ class ActiveWhiteListSystem(BasicConfig, BasicSystem):
 
     async def _handle_remove(self, boardcast_info: BoardcastInfo) -> bool:
         """处理移除玩家命令"""
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
         command = command.replace(system_name, "", 1).strip()
         command = command.replace(self.get_tr("remove"), "", 1).strip()
 
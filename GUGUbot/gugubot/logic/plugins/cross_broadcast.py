@@ -17,6 +17,9 @@ class CrossBroadcastSystem(BasicSystem):
     - MC 端: !!qq <消息> -> 仅发送到 QQ
     """
 
+    # MC 端的 !!qq 不带命令前缀
+    subscriptions = (("message", "*"),)
+
     def __init__(self, config=None) -> None:
         super().__init__(name="cross_broadcast", enable=True, config=config)
 
@@ -6,19 +6,20 @@
 """
 
 import asyncio
+import os
 import time
 import traceback
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import requests
-
 from mcdreforged.api.types import PluginServerInterface
 
 from gugubot.builder import MessageBuilder
 from gugubot.config import BasicConfig
 from gugubot.logic.system.basic_system import BasicSystem
+from gugubot.utils.http_client import get_http_client
+from gugubot.utils.ttl_cache import TTLCache
 from gugubot.utils.types import BoardcastInfo
 
 
@@ -29,6 +30,9 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
     同时检查群名片是否为第一个Java或基岩版游戏名，支持自动修复不匹配的群名片。
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(self, server: PluginServerInterface, config=None) -> None:
         """初始化不活跃用户检查系统。"""
         BasicSystem.__init__(self, "inactive_check", enable=False, config=config)
@@ -38,7 +42,11 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         # 设置数据文件路径
         data_path = Path(server.get_data_folder()) / "plugins" / "inactive_check.json"
         data_path.parent.mkdir(parents=True, exist_ok=True)
-        BasicConfig.__init__(self, data_path)
+        BasicConfig.__init__(
+            self,
+            data_path,
+            save_delay=config.get_keys(["GUGUBot", "save_delay"], 1) if config else 0,
+        )
 
         # 系统依赖
         self.bound_system = None
@@ -46,6 +54,17 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         self.whitelist_system = None
         self.active_whitelist_system = None  # 活跃白名单系统，用于过滤玩家
 
+        # 基岩版玩家 UUID 缓存（默认缓存 6 个月，因为 UUID 不会经常变化），
+        # 查询不到的玩家做较短时间的负缓存
+        check_config = (
+            config.get_keys(["system", "inactive_check"], {}) if config else {}
+        ) or {}
+        self._bedrock_cache = TTLCache(
+            max_size=check_config.get("bedrock_cache_size", 5000),
+            ttl=check_config.get("bedrock_cache_ttl", 15552000),
+            negative_ttl=check_config.get("bedrock_negative_cache_ttl", 604800),
+        )
+
         # 检查状态
         self._checking = False
         self._schedule_task_running = True  # 控制定时任务的运行
@@ -55,19 +74,21 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         # 从配置文件加载数据
         self.load()
 
-        # 如果没有上次检查时间，初始化为0
-        if "last_check_time" not in self:
-            self["last_check_time"] = 0
+        with self.batch():
+            # 如果没有上次检查时间，初始化为0
+            if "last_check_time" not in self:
+                self["last_check_time"] = 0
 
-        # 初始化基岩版玩家 API 数据缓存
-        if "bedrock_cache" not in self:
-            self["bedrock_cache"] = {}
+            # 初始化基岩版玩家 API 数据缓存
+            if "bedrock_cache" not in self:
+                self["bedrock_cache"] = {}
+            self._load_bedrock_cache()
 
-        # 初始化 QQ号 -> 最后游玩时间的映射（用于追踪改ID的玩家）
-        if "qq_last_play_time" not in self:
-            self["qq_last_play_time"] = {}
+            # 初始化 QQ号 -> 最后游玩时间的映射（用于追踪改ID的玩家）
+            if "qq_last_play_time" not in self:
+                self["qq_last_play_time"] = {}
 
-        self.save()
+            self.save()
 
         last_check_time = self.get("last_check_time", 0)
         if last_check_time > 0:
@@ -79,7 +100,7 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
             self.logger.info("不活跃检查系统已加载，尚未进行过检查")
 
         # 统计缓存数据
-        cache_count = len(self.get("bedrock_cache", {}))
+        cache_count = len(self._bedrock_cache)
         if cache_count > 0:
             self.logger.debug(f"已加载 {cache_count} 个基岩版玩家的 API 缓存数据")
 
@@ -144,12 +165,9 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         if not boardcast_info.is_admin:
             return False
 
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
 
-        command = command.replace(command_prefix, "", 1).strip()
-
         valid_commands = [system_name, self.get_tr("check"), self.get_tr("next")]
         if not any(command.startswith(i) for i in valid_commands):
             return False
@@ -278,36 +296,49 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         await self.reply(boardcast_info, [MessageBuilder.text(help_msg)])
         return True
 
-    def _get_player_uuid(self, player_name: str) -> Optional[str]:
-        """通过玩家名获取UUID
-
-        Parameters
-        ----------
-        player_name : str
-            玩家名
+    def _get_name_uuid_map(self) -> Dict[str, str]:
+        """读取一次白名单，构建 小写玩家名 -> UUID 的映射
 
         Returns
         -------
-        Optional[str]
-            玩家UUID，如果未找到则返回None
+        Dict[str, str]
+            玩家名（小写）到UUID的映射，白名单不可用时为空
         """
         if not self.whitelist_system or not self.whitelist_system._api:
-            return None
+            return {}
 
         try:
-            whitelist = self.whitelist_system._api.get_whitelist()
-            for player_info in whitelist:
-                if player_info.name.lower() == player_name.lower():
-                    return player_info.uuid
+            return {
+                player_info.name.lower(): player_info.uuid
+                for player_info in self.whitelist_system._api.get_whitelist()
+            }
         except Exception as e:
-            self.logger.error(f"获取玩家 {player_name} 的UUID失败: {e}")
-
-        return None
+            self.logger.error(f"读取白名单失败: {e}")
+            return {}
+
+    def _load_bedrock_cache(self) -> None:
+        """从数据文件恢复基岩版 UUID 缓存（兼容旧的 cached_at 格式）"""
+        for name, cache_data in self.get("bedrock_cache", {}).items():
+            uuid = cache_data.get("uuid")
+            expires_at = cache_data.get("expires_at")
+            if expires_at is None:
+                ttl = self._bedrock_cache.ttl if uuid else self._bedrock_cache.negative_ttl
+                expires_at = cache_data.get("cached_at", 0) + ttl
+            self._bedrock_cache.set(name, uuid, expires_at=expires_at)
+
+        # 过期或超出容量的条目不再写回
+        self._save_bedrock_cache()
+
+    def _save_bedrock_cache(self) -> None:
+        self["bedrock_cache"] = {
+            name: {"uuid": uuid, "expires_at": expires_at}
+            for name, uuid, expires_at in self._bedrock_cache.entries()
+        }
 
-    def _get_bedrock_player_uuid(self, player_name: str) -> Optional[str]:
-        """通过 MCProfile.io API 获取基岩版玩家的 UUID（XUID 或 Floodgate UUID）
+    async def _get_bedrock_player_uuid(self, player_name: str) -> Optional[str]:
+        """通过 MCProfile.io API 获取基岩版玩家的 UUID（Floodgate UUID）
 
-        使用缓存机制，避免频繁调用 API。
+        使用缓存机制，避免频繁调用 API；查询不到的玩家也会缓存一段时间。
 
         Parameters
         ----------
@@ -317,120 +348,142 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
         Returns
         -------
         Optional[str]
-            玩家 UUID（优先返回 Floodgate UUID，如果没有则返回 XUID），如果获取失败则返回None
+            玩家 Floodgate UUID，如果获取失败则返回None
         """
-        # 获取缓存配置（默认缓存 6 个月，因为 UUID 不会经常变化）
-        # 6 个月 = 180 天 = 15,552,000 秒
-        cache_ttl = self.config.get_keys(
-            ["system", "inactive_check", "bedrock_cache_ttl"], 15552000
-        )
-
-        # 检查缓存
-        bedrock_cache = self.get("bedrock_cache", {})
         player_name_lower = player_name.lower()
 
-        if player_name_lower in bedrock_cache:
-            cache_data = bedrock_cache[player_name_lower]
-            cached_at = cache_data.get("cached_at", 0)
-            current_time = time.time()
+        hit, uuid = self._bedrock_cache.lookup(player_name_lower)
+        if hit:
+            self.logger.debug(f"使用缓存的基岩版玩家 {player_name} 的查询结果: {uuid}")
+            return uuid
 
-            # 检查缓存是否过期
-            if (current_time - cached_at) < cache_ttl:
-                # 缓存有效，直接返回
-                uuid = cache_data.get("uuid")
-                if uuid:
-                    self.logger.debug(
-                        f"使用缓存的基岩版玩家 {player_name} 的 UUID: {uuid}"
-                    )
-                    return uuid
-                else:
-                    # 缓存中标记为 None（之前查询失败），也直接返回 None
-                    self.logger.debug(
-                        f"使用缓存的基岩版玩家 {player_name} 的查询结果（无 UUID）"
-                    )
-                    return None
-            else:
-                # 缓存已过期，删除旧缓存
-                self.logger.debug(f"基岩版玩家 {player_name} 的缓存已过期，将重新获取")
-                del bedrock_cache[player_name_lower]
-                # 更新缓存字典以触发保存
-                self["bedrock_cache"] = bedrock_cache
-                self.save()
-
-        # 缓存不存在或已过期，调用 API
         url = f"https://mcprofile.io/api/v1/bedrock/gamertag/{player_name}"
 
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        }
-
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-
-            if response.status_code == 200:
-                data = response.json()
-
-                # 优先使用 Floodgate UUID（用于 Floodgate 服务器）
-                uuid = None
-                if "floodgateuid" in data and data["floodgateuid"]:
-                    uuid = data["floodgateuid"]
-                    self.logger.debug(
-                        f"获取到基岩版玩家 {player_name} 的 Floodgate UUID: {uuid}"
-                    )
-                else:
-                    self.logger.debug(
-                        f"基岩版玩家 {player_name} 的 API 响应中未找到有效的 Floodgate UUID"
-                    )
-                    return None
-
-                # 保存到缓存
-                bedrock_cache[player_name_lower] = {
-                    "uuid": uuid,
-                    "cached_at": time.time(),
-                    "player_name": player_name,  # 保存原始玩家名（大小写）
-                }
-                self["bedrock_cache"] = bedrock_cache
-                self.save()
-                if uuid:
-                    self.logger.debug(f"已缓存基岩版玩家 {player_name} 的 UUID")
-                else:
-                    self.logger.debug(
-                        f"基岩版玩家 {player_name} 的 API 响应中未找到有效的 UUID"
-                    )
+            response = await get_http_client().get(url)
+        except Exception as e:
+            # 网络错误不缓存，下次检查时重试
+            self.logger.warning(f"查询基岩版玩家 {player_name} 信息出错: {e}")
+            return None
 
-                return uuid
-
-            elif response.status_code == 404:
-                # 玩家不存在，也记录到缓存（避免重复查询）
-                bedrock_cache[player_name_lower] = {
-                    "uuid": None,
-                    "cached_at": time.time(),
-                    "player_name": player_name,
-                }
-                self["bedrock_cache"] = bedrock_cache
-                self.save()
-                self.logger.debug(f"基岩版玩家 {player_name} 不存在于 MCProfile.io")
+        if response.status_code == 200:
+            try:
+                uuid = response.json().get("floodgateuid") or None
+            except Exception as e:
+                self.logger.warning(f"解析基岩版玩家 {player_name} 信息时出错: {e}")
                 return None
+
+            if uuid:
+                self.logger.debug(f"获取到基岩版玩家 {player_name} 的 Floodgate UUID: {uuid}")
             else:
-                self.logger.warning(
-                    f"查询基岩版玩家 {player_name} 信息失败: HTTP {response.status_code}"
+                self.logger.debug(
+                    f"基岩版玩家 {player_name} 的 API 响应中未找到有效的 Floodgate UUID"
                 )
-                return None
+            self._bedrock_cache.set(player_name_lower, uuid)
+            return uuid
 
-        except requests.exceptions.Timeout:
-            self.logger.warning(f"查询基岩版玩家 {player_name} 信息超时")
-            return None
-        except requests.exceptions.RequestException as e:
-            self.logger.warning(f"查询基岩版玩家 {player_name} 信息出错: {e}")
-            return None
-        except Exception as e:
-            self.logger.warning(f"解析基岩版玩家 {player_name} 信息时出错: {e}")
+        if response.status_code == 404:
+            # 玩家不存在，负缓存（避免重复查询）
+            self._bedrock_cache.set_negative(player_name_lower)
+            self.logger.debug(f"基岩版玩家 {player_name} 不存在于 MCProfile.io")
             return None
 
+        self.logger.warning(
+            f"查询基岩版玩家 {player_name} 信息失败: HTTP {response.status_code}"
+        )
+        return None
+
+    async def _resolve_bedrock_uuids(self, player_names) -> Dict[str, Optional[str]]:
+        """并发查询多个基岩版玩家的 UUID（并发与限速由共享 HTTP 客户端控制）
+
+        Returns
+        -------
+        Dict[str, Optional[str]]
+            小写玩家名到 UUID 的映射
+        """
+        names = list({name.lower(): name for name in player_names}.values())
+        uuids = await asyncio.gather(
+            *(self._get_bedrock_player_uuid(name) for name in names)
+        )
+        self._save_bedrock_cache()
+        return {name.lower(): uuid for name, uuid in zip(names, uuids)}
+
+    @staticmethod
+    def _scan_playerdata(player_data_dir: Path) -> Dict[str, float]:
+        """用 os.scandir 读取一次 playerdata 目录
+
+        Returns
+        -------
+        Dict[str, float]
+            UUID（小写）到存档文件修改时间的映射
+        """
+        mtimes = {}
+        with os.scandir(player_data_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".dat"):
+                    continue
+                try:
+                    mtimes[entry.name[:-4].lower()] = entry.stat().st_mtime
+                except OSError:
+                    continue
+        return mtimes
+
+    def _collect_play_times(
+        self,
+        players: List,
+        player_data_dir: Path,
+        bedrock_uuids: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Dict[str, float]:
+        """计算每个玩家所有账号存档的最新修改时间（在工作线程中运行）
+
+        Parameters
+        ----------
+        players : List
+            需要检查的玩家
+        player_data_dir : Path
+            playerdata 目录
+        bedrock_uuids : Optional[Dict[str, Optional[str]]]
+            预先查询好的基岩版玩家 UUID（小写玩家名为键）
+
+        Returns
+        -------
+        Dict[str, float]
+            玩家名到最新存档修改时间的映射，没有任何存档的玩家不在其中
+        """
+        mtimes = self._scan_playerdata(player_data_dir)
+        name_to_uuid = self._get_name_uuid_map()
+        bedrock_uuids = bedrock_uuids or {}
+
+        play_times = {}
+        for player in players:
+            latest_mtime = None
+
+            # 基岩版玩家的 UUID 已通过 API 查询，Java 版玩家从白名单获取
+            uuids = [
+                bedrock_uuids.get(bedrock_name.lower()) for bedrock_name in player.bedrock_name
+            ] + [name_to_uuid.get(java_name.lower()) for java_name in player.java_name]
+
+            for uuid in uuids:
+                if not uuid:
+                    continue
+                mtime = mtimes.get(str(uuid).lower())
+                if mtime is not None:
+                    latest_mtime = mtime if latest_mtime is None else max(latest_mtime, mtime)
+
+            if latest_mtime is not None:
+                play_times[player.name] = latest_mtime
+                self.logger.debug(
+                    f"玩家 {player.name} 最近的存档修改时间: {datetime.fromtimestamp(latest_mtime).strftime('%Y-%m-%d %H:%M:%S')}"
+                )
+        return play_times
+
     async def _check_inactive_players(self) -> Dict[int, Dict[str, List[Dict]]]:
         """检查不活跃玩家的核心逻辑
 
+        群成员列表来自共享的群成员快照；白名单与 playerdata 目录每次检查只读取一次，
+        并在工作线程中处理；基岩版 UUID 通过共享 HTTP 客户端并发查询，
+        避免阻塞事件循环上的消息转发。
+
         Returns
         -------
         Dict[int, Dict[str, List[Dict]]]
@@ -446,12 +499,20 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
             group_ids = self.config.get_keys(
                 ["connector", "QQ", "permissions", "group_ids"], []
             )
+            admin_group_ids = self.config.get_keys(
+                ["connector", "QQ", "permissions", "admin_group_ids"], []
+            )
             inactive_days = self.config.get_keys(
                 ["system", "inactive_check", "inactive_days"], 30
             )
             never_played_days = self.config.get_keys(
                 ["system", "inactive_check", "never_played_days"], 7
             )
+            fix_card = self.config.get_keys(
+                ["system", "inactive_check", "auto_fix_card"], True
+            ) and self.config.get_keys(
+                ["connector", "QQ", "others", "change_group_card"], True
+            )
             inactive_seconds = inactive_days * 86400
             never_played_seconds = never_played_days * 86400
             current_time = time.time()
@@ -466,119 +527,104 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
                 self.logger.warning(f"playerdata目录不存在: {player_data_dir}")
                 return {}
 
-            # 获取所有玩家
-            all_players = self.bound_system.player_manager.get_all_players()
+            # 并发获取管理群和各检查群的成员列表（与其他系统共享群成员快照）
+            group_members = self.qq_connector.group_members
+            await group_members.ensure_fresh(list(admin_group_ids) + list(group_ids))
 
-            # 获取管理员ID列表（用于跳过管理员）
-            admin_ids = set(
+            # 获取管理员ID列表，合并管理群成员ID（用于跳过管理员）
+            skip_user_ids = set(
                 str(admin_id)
                 for admin_id in self.config.get_keys(
                     ["connector", "QQ", "permissions", "admin_ids"], []
                 )
             )
+            skip_user_ids |= group_members.all_member_ids(admin_group_ids)
 
-            # 获取管理群成员ID列表（通过API获取管理群的所有成员）
-            admin_group_member_ids = set()
-            admin_group_ids = self.config.get_keys(
-                ["connector", "QQ", "permissions", "admin_group_ids"], []
-            )
-            for admin_group_id in admin_group_ids:
-                if not admin_group_id:
+            # 筛选需要检查的玩家：有QQ绑定、不是管理员、不在活跃白名单中
+            candidates = []
+            for player in self.bound_system.player_manager.get_all_players():
+                qq_accounts = player.accounts.get(QQ_connector_name, [])
+                if not qq_accounts:
                     continue
-                try:
-                    member_list_result = (
-                        await self.qq_connector.bot.get_group_member_list(
-                            group_id=int(admin_group_id)
-                        )
-                    )
-                    if member_list_result and member_list_result.get("status") == "ok":
-                        members = member_list_result.get("data", [])
-                        for member in members:
-                            user_id = str(member.get("user_id", ""))
-                            if user_id:
-                                admin_group_member_ids.add(user_id)
-                        self.logger.debug(
-                            f"从管理群 {admin_group_id} 获取到 {len(members)} 名成员"
-                        )
-                except Exception as e:
-                    self.logger.warning(
-                        f"获取管理群 {admin_group_id} 成员列表失败: {e}"
-                    )
-
-            # 合并管理员ID和管理群成员ID
-            skip_user_ids = admin_ids | admin_group_member_ids
 
-            # 遍历每个群，收集该群的不活跃玩家
-            for group_id in group_ids:
-                inactive_players = []  # 进过游戏但长时间未登录的玩家
-                never_played_players = []  # 从未进入游戏的玩家
+                if any(str(qq_account) in skip_user_ids for qq_account in qq_accounts):
+                    self.logger.debug(
+                        f"玩家 {player.name} 是管理员或在管理群中，跳过不活跃检查"
+                    )
+                    continue
 
-                # 先获取该群的成员列表（避免重复调用API）
-                group_members = {}  # key: user_id, value: member info (包含join_time)
-                try:
-                    member_list_result = (
-                        await self.qq_connector.bot.get_group_member_list(
-                            group_id=int(group_id)
-                        )
+                if self.active_whitelist_system and any(
+                    self.active_whitelist_system.is_in_whitelist(name)
+                    for name in player.java_name + player.bedrock_name
+                ):
+                    self.logger.debug(
+                        f"玩家 {player.name} 在活跃白名单中，跳过不活跃检查"
                     )
-                    if member_list_result and member_list_result.get("status") == "ok":
-                        members = member_list_result.get("data", [])
-                        for member in members:
-                            user_id = str(member.get("user_id", ""))
-                            if user_id:
-                                group_members[user_id] = member
-                except Exception as e:
-                    self.logger.error(f"获取群 {group_id} 成员列表失败: {e}")
                     continue
 
-                # 检查每个玩家
-                for player in all_players:
-                    # 只检查有QQ绑定的玩家
-                    qq_accounts = player.accounts.get(QQ_connector_name, [])
-                    if not qq_accounts:
-                        continue
+                candidates.append((player, qq_accounts))
 
-                    # 检查玩家是否是管理员或在管理群中，如果是则跳过
-                    if any(
-                        str(qq_account) in skip_user_ids for qq_account in qq_accounts
-                    ):
-                        self.logger.debug(
-                            f"玩家 {player.name} 是管理员或在管理群中，跳过不活跃检查"
-                        )
-                        continue
+            # 基岩版 UUID 并发查询，扫描存档目录在工作线程中完成
+            bedrock_uuids = await self._resolve_bedrock_uuids(
+                name for player, _ in candidates for name in player.bedrock_name
+            )
+            play_times = await asyncio.to_thread(
+                self._collect_play_times,
+                [player for player, _ in candidates],
+                player_data_dir,
+                bedrock_uuids,
+            )
 
-                    # 检查玩家是否在活跃白名单中，如果是则跳过
-                    if self.active_whitelist_system:
-                        # 检查玩家的所有名称（Java和Bedrock）是否在活跃白名单中
-                        player_names = player.java_name + player.bedrock_name
-                        if any(
-                            self.active_whitelist_system.is_in_whitelist(name)
-                            for name in player_names
-                        ):
+            # 结合历史记录得到每个玩家的最后游玩时间（处理改ID的情况）
+            qq_last_play_time = self.get("qq_last_play_time", {})
+            last_play_times = {}
+            for player, qq_accounts in candidates:
+                latest_mtime = play_times.get(player.name, 0)
+                found_any_file = player.name in play_times
+
+                for qq_account in qq_accounts:
+                    qq_str = str(qq_account)
+                    if qq_str in qq_last_play_time:
+                        latest_mtime = max(latest_mtime, qq_last_play_time[qq_str])
+                        found_any_file = True  # 标记为找到记录
+
+                # 如果从 playerdata 获取到了新的时间，更新 QQ 的最后游玩时间记录
+                if found_any_file and latest_mtime > 0:
+                    for qq_account in qq_accounts:
+                        qq_str = str(qq_account)
+                        if latest_mtime > qq_last_play_time.get(qq_str, 0):
+                            qq_last_play_time[qq_str] = latest_mtime
                             self.logger.debug(
-                                f"玩家 {player.name} 在活跃白名单中，跳过不活跃检查"
+                                f"更新 QQ {qq_str} 的游玩时间记录: {datetime.fromtimestamp(latest_mtime).strftime('%Y-%m-%d %H:%M:%S')}"
                             )
-                            continue
 
-                    # 检查该玩家是否在当前群，并获取进群时间和群名片
-                    player_in_group = False
-                    join_time = None
-                    group_card = None
+                last_play_times[player.name] = latest_mtime if found_any_file else None
+            self["qq_last_play_time"] = qq_last_play_time
+
+            # 遍历每个群，收集该群的不活跃玩家
+            for group_id in group_ids:
+                if not group_members.has_group(group_id):
+                    continue
+                members = group_members.members(group_id)
+
+                inactive_players = []  # 进过游戏但长时间未登录的玩家
+                never_played_players = []  # 从未进入游戏的玩家
 
-                    # 检查玩家的任一QQ账号是否在该群
+                for player, qq_accounts in candidates:
+                    # 检查玩家的任一QQ账号是否在该群，并获取进群时间和群名片
+                    member = None
                     for qq_account in qq_accounts:
                         qq_str = str(qq_account)
-                        if qq_str in group_members:
-                            player_in_group = True
-                            # 获取进群时间
-                            join_time = group_members[qq_str].get("join_time", 0)
-                            # 获取群名片
-                            group_card = group_members[qq_str].get("card", "")
+                        if qq_str in members:
+                            member = members[qq_str]
                             break
 
-                    if not player_in_group:
+                    if member is None:
                         continue
 
+                    join_time = member.join_time
+                    group_card = member.card
+
                     # 检查群名片是否为第一个Java或基岩名字，并自动修改
                     expected_name = None
                     if player.java_name:
@@ -586,79 +632,21 @@ class InactiveCheckSystem(BasicConfig, BasicSystem):
                     elif player.bedrock_name:
                         expected_name = player.bedrock_name[0]
 
-                    # 如果有预期名字，且群名片不匹配，自动修改
-                    if expected_name and group_card != expected_name:
-                        auto_fix_enabled = self.config.get_keys(
-                            ["system", "inactive_check", "auto_fix_card"], True
-                        )
-                        change_group_card = self.config.get_keys(
-                            ["connector", "QQ", "others", "change_group_card"], True
-                        )
-                        if auto_fix_enabled and change_group_card:
-                            try:
-                                await self.qq_connector.bot.set_group_card(
-                                    group_id=int(group_id),
-                                    user_id=int(qq_str),
-                                    card=expected_name,
-                                )
-                            except Exception:
-                                pass
-
-                    # 检查玩家的所有UUID对应的playerdata文件，找最新的修改时间
-                    latest_mtime = 0
-                    found_any_file = False
-
-                    # 先检查基岩版玩家，通过 API 获取 UUID 然后检查本地存档
-                    for bedrock_name in player.bedrock_name:
-                        uuid = self._get_bedrock_player_uuid(bedrock_name)
-
-                        if uuid:
-                            self.logger.debug(
-                                f"基岩版玩家 {bedrock_name} 的 UUID: {uuid}"
+                    if fix_card and expected_name and group_card != expected_name:
+                        try:
+                            await self.qq_connector.bot.set_group_card(
+                                group_id=int(group_id),
+                                user_id=int(qq_str),
+                                card=expected_name,
                             )
-                            player_file = player_data_dir / f"{uuid}.dat"
-                            if player_file.exists():
-                                found_any_file = True
-                                mtime = player_file.stat().st_mtime
-                                latest_mtime = max(latest_mtime, mtime)
-                                self.logger.debug(
-                                    f"找到基岩版玩家 {bedrock_name} (UUID: {uuid}) 的存档文件，修改时间: {datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')}"
-                                )
+                            group_members.update_card(group_id, qq_str, expected_name)
+                        except Exception:
+                            pass
 
-                    # 检查 Java 版玩家，使用文件修改时间
-                    for java_name in player.java_name:
-                        uuid = self._get_player_uuid(java_name)
-                        if uuid:
-                            player_file = player_data_dir / f"{uuid}.dat"
-                            if player_file.exists():
-                                found_any_file = True
-                                mtime = player_file.stat().st_mtime
-                                latest_mtime = max(latest_mtime, mtime)
-
-                    # 从历史记录中获取该QQ号的最后游玩时间（处理改ID的情况）
-                    qq_last_play_time = self.get("qq_last_play_time", {})
-                    for qq_account in qq_accounts:
-                        qq_str = str(qq_account)
-                        if qq_str in qq_last_play_time:
-                            latest_mtime = max(latest_mtime, qq_last_play_time[qq_str])
-                            found_any_file = True  # 标记为找到记录
-
-                    # 如果从 playerdata 获取到了新的时间，更新 QQ 的最后游玩时间记录
-                    if found_any_file and latest_mtime > 0:
-                        for qq_account in qq_accounts:
-                            qq_str = str(qq_account)
-                            # 更新或创建该 QQ 的游玩时间记录
-                            current_recorded_time = qq_last_play_time.get(qq_str, 0)
-                            if latest_mtime > current_recorded_time:
-                                qq_last_play_time[qq_str] = latest_mtime
-                                self.logger.debug(
-                                    f"更新 QQ {qq_str} 的游玩时间记录: {datetime.fromtimestamp(latest_mtime).strftime('%Y-%m-%d %H:%M:%S')}"
-                                )
-                        # 保存更新
-                        self["qq_last_play_time"] = qq_last_play_time
+                    latest_mtime = last_play_times[player.name]
 
                     # 区分两种情况
-                    if not found_any_file:
+                    if latest_mtime is None:
                         # 从未进入过游戏，使用进群时间作为参考
                         # 如果有进群时间且超过阈值
                         if join_time and join_time > 0:
@@ -1,164 +1,226 @@
 """玩家通知插件模块。
 
 该模块提供玩家加入和离开时的广播通知功能。
+
+控制台每一行都会经过 ``on_info``，模组服加载世界或刷报错时每秒可达数千行，
+因此加入/离开的正则由配置的正则注册表（``config.patterns``）统一编译：
+先用各模式中的固定文本（如 "joined the game"）做子串预筛，
+再用合并后的单个正则确认，绝大多数无关的行只需要几次子串查找。
+也可以改用 MCDR 自带的 ``on_player_joined`` / ``on_player_left`` 事件。
 """
 
 import traceback
-import re
 
-from typing import Optional, Callable
+from typing import Awaitable, Callable, Optional, Tuple
 from mcdreforged.api.types import PluginServerInterface, Info
 
 from gugubot.builder import MessageBuilder
+from gugubot.config.pattern_registry import PatternGroup
 from gugubot.connector.connector_manager import ConnectorManager
 from gugubot.utils.types import ProcessedInfo
 from gugubot.config.BotConfig import BotConfig
 
 
-def create_on_player_join(
-    connector_manager: ConnectorManager, config: BotConfig
-) -> Callable[[PluginServerInterface, Info], None]:
+class PlayerEventMatcher:
+    """玩家加入/离开控制台行匹配器。
 
-    # 从配置文件读取Minecraft的source_name作为默认排除项
-    minecraft_source_name = config.get_keys(
-        ["connector", "minecraft", "source_name"], "Minecraft"
-    )
-    exclude_sources = [minecraft_source_name]
+    Parameters
+    ----------
+    join : PatternGroup
+        玩家加入的正则组（第一个捕获组为玩家名）
+    left : PatternGroup
+        玩家离开的正则组
+    bot : PatternGroup
+        机器人名称的正则组
+    event : Optional[PatternGroup]
+        加入与离开合并后的正则组，用于一次预筛；缺省时分别检查
+    """
 
-    async def on_player_join(server: PluginServerInterface, info: Info) -> None:
-        # 从配置中获取玩家加入的正则表达式模式
-        join_patterns = config.get_keys(
-            ["connector", "minecraft", "player_join_patterns"], []
+    def __init__(
+        self,
+        join: PatternGroup,
+        left: PatternGroup,
+        bot: PatternGroup,
+        event: Optional[PatternGroup] = None,
+    ) -> None:
+        self.join = join
+        self.left = left
+        self.bot = bot
+        self.event = event
+
+    @classmethod
+    def from_config(cls, config: BotConfig) -> "PlayerEventMatcher":
+        """从配置的正则注册表获取当前版本的各组正则"""
+        patterns = config.patterns
+        return cls(
+            patterns.get("player_join"),
+            patterns.get("player_left"),
+            patterns.get("bot_names"),
+            patterns.get("player_event"),
         )
-        player_name = None
 
-        # 尝试匹配玩家名称
-        for pattern in join_patterns:
-            if match := re.search(pattern, info.content):
-                player_name = match.group(1) if match.groups() else match.group(0)
-                break
+    @staticmethod
+    def _player_name(group: PatternGroup, content: str) -> Optional[str]:
+        if match := group.first_search(content):
+            return match.group(1) if match.groups() else match.group(0)
+        return None
+
+    def may_match(self, content: str) -> bool:
+        """快速判断该行是否可能是玩家加入/离开消息"""
+        if self.event is not None:
+            return self.event.search(content)
+        return self.join.search(content) or self.left.search(content)
+
+    def match_join(self, content: str) -> Optional[str]:
+        return self._player_name(self.join, content)
+
+    def match_left(self, content: str) -> Optional[str]:
+        return self._player_name(self.left, content)
+
+    def match(self, content: str) -> Tuple[Optional[str], Optional[str]]:
+        """匹配控制台行
+
+        Returns
+        -------
+        Tuple[Optional[str], Optional[str]]
+            (加入的玩家名, 离开的玩家名)，未匹配的一项为 None
+        """
+        if not self.may_match(content):
+            return None, None
+        # 命中的行很少，按配置顺序逐个匹配以保持"第一个匹配的模式生效"
+        return self.match_join(content), self.match_left(content)
+
+    def is_bot(self, player_name: str) -> bool:
+        """判断玩家是否为机器人"""
+        return self.bot.match(player_name)
+
+
+def get_player_event_matcher(
+    config: BotConfig, cache: Optional[dict] = None
+) -> PlayerEventMatcher:
+    """获取与当前正则版本对应的匹配器，版本不变时复用 cache 中的实例"""
+    patterns = config.patterns
+    matcher = cache.get("matcher") if cache is not None else None
+    if (
+        matcher is not None
+        and matcher.event is patterns.get("player_event")
+        and matcher.bot is patterns.get("bot_names")
+    ):
+        return matcher
+
+    matcher = PlayerEventMatcher.from_config(config)
+    if cache is not None:
+        cache["matcher"] = matcher
+    return matcher
+
+
+async def notify_player_event(
+    server: PluginServerInterface,
+    connector_manager: ConnectorManager,
+    config: BotConfig,
+    player_name: str,
+    joined: bool,
+    matcher: Optional[PlayerEventMatcher] = None,
+) -> None:
+    """广播玩家加入/离开通知（按配置过滤玩家/机器人）
 
-        if player_name is None:
-            return
-
-        message = server.tr("gugubot.notice.player_join", player=player_name)
-
-        is_player = not is_bot(player_name, config)
-
-        if (
-            is_player
-            and not config.get_keys(
-                ["connector", "minecraft", "player_join_notice"], True
-            )
-            or not is_player
-            and not config.get_keys(["connector", "minecraft", "bot_join_notice"], True)
-        ):
-            return
+    Parameters
+    ----------
+    player_name : str
+        玩家名称
+    joined : bool
+        True 为加入，False 为离开
+    matcher : Optional[PlayerEventMatcher]
+        用于判断机器人的匹配器，缺省时按配置临时构建
+    """
+    event = "join" if joined else "left"
+    minecraft_source_name = config.snapshot.minecraft_source
 
-        try:
-            # 构建消息
-            processed_info = ProcessedInfo(
-                processed_message=[MessageBuilder.text(message)],
-                _source=minecraft_source_name,  # 使用 _source 参数
-                source_id="",
-                sender="",
-                raw=None,
-                server=server,
-                logger=server.logger,
-                event_sub_type="group",
-            )
+    is_player = not (
+        matcher.is_bot(player_name) if matcher else is_bot(player_name, config)
+    )
+    notice_key = f"player_{event}_notice" if is_player else f"bot_{event}_notice"
+    if not config.get_keys(["connector", "minecraft", notice_key], True):
+        return
+
+    message = server.tr(f"gugubot.notice.player_{event}", player=player_name)
+
+    try:
+        # 构建消息
+        processed_info = ProcessedInfo(
+            processed_message=[MessageBuilder.text(message)],
+            _source=minecraft_source_name,  # 使用 _source 参数
+            source_id="",
+            sender="",
+            raw=None,
+            server=server,
+            logger=server.logger,
+            event_sub_type="group",
+        )
 
-            # 广播消息（排除Minecraft等平台）
-            await connector_manager.broadcast_processed_info(
-                processed_info, exclude=exclude_sources
-            )
+        # 广播消息（排除Minecraft等平台）
+        await connector_manager.broadcast_processed_info(
+            processed_info, exclude=[minecraft_source_name]
+        )
 
-            server.logger.debug(
-                server.tr("gugubot.notice.player_join", player=player_name)
-            )
+        server.logger.debug(message)
 
-        except Exception as e:
-            server.logger.error(
-                server.tr(
-                    "gugubot.notice.player_notice_error",
-                    error=str(e) + "\n" + traceback.format_exc(),
-                )
+    except Exception as e:
+        server.logger.error(
+            server.tr(
+                "gugubot.notice.player_notice_error",
+                error=str(e) + "\n" + traceback.format_exc(),
             )
-
-    return on_player_join
+        )
 
 
-def create_on_player_left(
+def create_on_player_notice(
     connector_manager: ConnectorManager, config: BotConfig
-) -> Callable[[PluginServerInterface, Info], None]:
-
-    # 从配置文件读取Minecraft的source_name作为默认排除项
-    minecraft_source_name = config.get_keys(
-        ["connector", "minecraft", "source_name"], "Minecraft"
-    )
-    exclude_sources = [minecraft_source_name]
-
-    async def on_player_left(server: PluginServerInterface, info: Info) -> None:
-        # 从配置中获取玩家离开的正则表达式模式
-        left_patterns = config.get_keys(
-            ["connector", "minecraft", "player_left_patterns"], []
-        )
-        player_name = None
+) -> Callable[[PluginServerInterface, Info], Awaitable[None]]:
+    """创建处理控制台行的 on_info 回调，加入与离开共用一次匹配"""
+    cache: dict = {}
 
-        # 尝试匹配玩家名称
-        for pattern in left_patterns:
-            if match := re.search(pattern, info.content):
-                player_name = match.group(1) if match.groups() else match.group(0)
-                break
-
-        if player_name is None:
+    async def on_player_notice(server: PluginServerInterface, info: Info) -> None:
+        # 玩家聊天内容不可能是进出服消息
+        if info.is_player or config.snapshot.use_mcdr_player_events:
             return
 
-        message = server.tr("gugubot.notice.player_left", player=player_name)
-
-        is_player = not is_bot(player_name, config)
+        matcher = get_player_event_matcher(config, cache)
+        joined_player, left_player = matcher.match(info.content)
 
-        if (
-            is_player
-            and not config.get_keys(
-                ["connector", "minecraft", "player_left_notice"], True
+        if joined_player is not None:
+            await notify_player_event(
+                server, connector_manager, config, joined_player, True, matcher
             )
-            or not is_player
-            and not config.get_keys(["connector", "minecraft", "bot_left_notice"], True)
-        ):
-            return
-
-        try:
-            # 构建消息
-            processed_info = ProcessedInfo(
-                processed_message=[MessageBuilder.text(message)],
-                _source=minecraft_source_name,  # 使用 _source 参数
-                source_id="",
-                sender="",
-                raw=None,
-                server=server,
-                logger=server.logger,
-                event_sub_type="group",
+        if left_player is not None:
+            await notify_player_event(
+                server, connector_manager, config, left_player, False, matcher
             )
 
-            # 广播消息（排除Minecraft等平台）
-            await connector_manager.broadcast_processed_info(
-                processed_info, exclude=exclude_sources
-            )
+    return on_player_notice
 
-            server.logger.debug(
-                server.tr("gugubot.notice.player_left", player=player_name)
-            )
 
-        except Exception as e:
-            server.logger.error(
-                server.tr(
-                    "gugubot.notice.player_notice_error",
-                    error=str(e) + "\n" + traceback.format_exc(),
-                )
-            )
+def create_on_mcdr_player_event(
+    connector_manager: ConnectorManager, config: BotConfig, joined: bool
+) -> Callable[..., Awaitable[None]]:
+    """创建 MCDR ``on_player_joined`` / ``on_player_left`` 事件回调
+
+    MCDR 已经解析出玩家名，无需再匹配控制台行；
+    仅在 ``use_mcdr_player_events`` 开启时生效。
+    """
+    cache: dict = {}
+
+    async def on_mcdr_player_event(
+        server: PluginServerInterface, player: str, info: Optional[Info] = None
+    ) -> None:
+        if not config.snapshot.use_mcdr_player_events:
+            return
+        matcher = get_player_event_matcher(config, cache)
+        await notify_player_event(
+            server, connector_manager, config, player, joined, matcher
+        )
 
-    return on_player_left
+    return on_mcdr_player_event
 
 
 def is_bot(player_name: str, config: BotConfig) -> bool:
@@ -176,16 +238,5 @@ def is_bot(player_name: str, config: BotConfig) -> bool:
     bool
         如果是机器人返回True，否则返回False
     """
-    # 获取机器人名称模式列表
-    bot_patterns = config.get_keys(["connector", "minecraft", "bot_names_pattern"], [])
-
-    # 检查玩家名称是否匹配任何机器人模式
-    for pattern in bot_patterns:
-        try:
-            if re.match(pattern, player_name, re.IGNORECASE):
-                return True
-        except re.error:
-            # 如果正则表达式无效，跳过该模式
-            continue
-
-    return False
+    # 机器人名称模式由正则注册表编译（忽略大小写），无效的模式已在加载时跳过
+    return config.patterns.get("bot_names").match(player_name)
@@ -2,6 +2,9 @@
 """未绑定用户检查插件模块。
 
 该模块提供检查QQ群中未绑定用户的功能，支持定时自动检查和手动命令触发。
+
+未绑定集合只在首次检查和每隔 ``reconcile_interval`` 的全量对账时按群成员列表重建，
+其余时间由进群/退群通知和绑定/解绑操作增量维护，检查时不再拉取群成员。
 """
 
 import asyncio
@@ -9,7 +12,7 @@ import time
 import traceback
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Set, Tuple
 
 from mcdreforged.api.types import PluginServerInterface
 
@@ -17,6 +20,7 @@ from gugubot.builder import MessageBuilder
 from gugubot.config import BasicConfig
 from gugubot.logic.system.basic_system import BasicSystem
 from gugubot.utils.types import BoardcastInfo
+from gugubot.utils.unbound_tracker import UnboundTracker
 
 
 class UnboundCheckSystem(BasicConfig, BasicSystem):
@@ -25,6 +29,9 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
     提供定时自动检查和手动触发检查功能。
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(self, server: PluginServerInterface, config=None) -> None:
         """初始化未绑定用户检查系统。"""
         BasicSystem.__init__(self, "unbound_check", enable=False, config=config)
@@ -38,6 +45,7 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
         # 系统依赖
         self.bound_system = None
         self.qq_connector = None
+        self.tracker: UnboundTracker = None
 
         # 检查状态
         self._checking = False
@@ -68,10 +76,31 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
     def set_bound_system(self, bound_system) -> None:
         """设置绑定系统引用"""
         self.bound_system = bound_system
+        bound_system.player_manager.add_account_listener(self._on_accounts_changed)
 
     def set_qq_connector(self, qq_connector) -> None:
         """设置QQ连接器引用"""
         self.qq_connector = qq_connector
+        self.tracker = UnboundTracker(qq_connector.group_members, self._is_bound)
+
+    def _qq_source_name(self) -> str:
+        return self.config.get_keys(["connector", "QQ", "source_name"], "QQ")
+
+    def _is_bound(self, user_id: str) -> bool:
+        return bool(
+            self.bound_system.player_manager.get_player(
+                user_id, platform=self._qq_source_name()
+            )
+        )
+
+    def _on_accounts_changed(self, keys: Set[Tuple[str, str]]) -> None:
+        """绑定/解绑后更新相关用户的未绑定状态"""
+        if self.tracker is None:
+            return
+        qq_source_name = self._qq_source_name()
+        self.tracker.refresh_users(
+            account_id for platform, account_id in keys if platform == qq_source_name
+        )
 
     async def process_boardcast_info(self, boardcast_info: BoardcastInfo) -> bool:
         """处理接收到的命令。
@@ -115,12 +144,9 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
         if not boardcast_info.is_admin:
             return False
 
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
 
-        command = command.replace(command_prefix, "", 1).strip()
-
         valid_commands = [system_name, self.get_tr("check"), self.get_tr("next")]
         if not any(command.startswith(i) for i in valid_commands):
             return False
@@ -228,9 +254,22 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
         await self.reply(boardcast_info, [MessageBuilder.text(help_msg)])
         return True
 
+    async def _reconcile(self, group_ids: List, admin_group_ids: List) -> None:
+        """全量对账：拉取所有群成员列表并重建未绑定集合"""
+        group_members = self.qq_connector.group_members
+        # 首次重建可以复用其他系统刚拉取的快照，定期对账则强制重新拉取
+        max_age = 0 if self.tracker.ready else None
+        await group_members.ensure_fresh(
+            list(admin_group_ids) + list(group_ids), max_age=max_age
+        )
+        self.tracker.rebuild()
+        self.logger.info(f"未绑定集合已重建，共 {self.tracker.count()} 名未绑定成员")
+
     async def _check_unbound_users(self) -> Dict[int, List[Dict]]:
         """检查未绑定用户的核心逻辑
 
+        未绑定集合已建立且未到对账时间时直接读取集合，不访问 QQ 接口。
+
         Returns
         -------
         Dict[int, List[Dict]]
@@ -249,98 +288,51 @@ class UnboundCheckSystem(BasicConfig, BasicSystem):
             )
             timeout_seconds = timeout_days * 86400
             current_time = time.time()
-            QQ_connector_name = self.config.get_keys(
-                ["connector", "QQ", "source_name"], "QQ"
+            reconcile_interval = self.config.get_keys(
+                ["system", "unbound_check", "reconcile_interval"], 604800
             )
 
             # 获取管理员ID列表（用于跳过管理员）
-            admin_ids = set(
-                str(admin_id)
-                for admin_id in self.config.get_keys(
-                    ["connector", "QQ", "permissions", "admin_ids"], []
-                )
+            admin_ids = self.config.get_keys(
+                ["connector", "QQ", "permissions", "admin_ids"], []
             )
-
-            # 获取管理群成员ID列表（通过API获取管理群的所有成员）
-            admin_group_member_ids = set()
             admin_group_ids = self.config.get_keys(
                 ["connector", "QQ", "permissions", "admin_group_ids"], []
             )
-            for admin_group_id in admin_group_ids:
-                if not admin_group_id:
-                    continue
-                try:
-                    member_list_result = (
-                        await self.qq_connector.bot.get_group_member_list(
-                            group_id=int(admin_group_id)
-                        )
-                    )
-                    if member_list_result and member_list_result.get("status") == "ok":
-                        members = member_list_result.get("data", [])
-                        for member in members:
-                            user_id = str(member.get("user_id", ""))
-                            if user_id:
-                                admin_group_member_ids.add(user_id)
-                        self.logger.debug(
-                            f"从管理群 {admin_group_id} 获取到 {len(members)} 名成员"
-                        )
-                except Exception as e:
-                    self.logger.warning(
-                        f"获取管理群 {admin_group_id} 成员列表失败: {e}"
-                    )
 
-            # 合并管理员ID和管理群成员ID
-            skip_user_ids = admin_ids | admin_group_member_ids
+            # 检查范围变化、尚未建立、上次有群拉取失败或到达对账时间时全量重建
+            self.tracker.configure(group_ids, admin_group_ids, admin_ids)
+            if (
+                not self.tracker.ready
+                or current_time - self.tracker.built_at >= reconcile_interval
+                or not all(self.tracker.has_group(i) for i in group_ids if i)
+            ):
+                await self._reconcile(group_ids, admin_group_ids)
 
             # 遍历每个群
             for group_id in group_ids:
                 try:
-                    # 获取群成员列表
-                    member_list_result = (
-                        await self.qq_connector.bot.get_group_member_list(
-                            group_id=int(group_id)
-                        )
-                    )
-
-                    if (
-                        not member_list_result
-                        or member_list_result.get("status") != "ok"
-                    ):
+                    if not self.tracker.has_group(group_id):
                         self.logger.warning(f"获取群 {group_id} 成员列表失败")
                         continue
 
-                    members = member_list_result.get("data", [])
                     unbound_users = []
 
-                    # 检查每个成员
-                    for member in members:
-                        user_id = str(member.get("user_id", ""))
-                        join_time = member.get("join_time", 0)
-                        nickname = member.get("nickname", "未知")
-
-                        # 检查是否是管理员或在管理群中，如果是则跳过
-                        if user_id in skip_user_ids:
-                            continue
-
-                        # 检查是否超时
+                    # 集合中已排除管理员与已绑定的成员，只需判断是否超时
+                    for member in self.tracker.unbound(group_id):
+                        join_time = member.join_time
                         if current_time - join_time <= timeout_seconds:
                             continue
 
-                        # 检查是否已绑定
-                        player = self.bound_system.player_manager.get_player(
-                            user_id, platform=QQ_connector_name
+                        days_ago = int((current_time - join_time) / 86400)
+                        unbound_users.append(
+                            {
+                                "user_id": member.user_id,
+                                "nickname": member.nickname or "未知",
+                                "join_time": join_time,
+                                "days_ago": days_ago,
+                            }
                         )
-                        if not player:
-                            # 未绑定且超时
-                            days_ago = int((current_time - join_time) / 86400)
-                            unbound_users.append(
-                                {
-                                    "user_id": user_id,
-                                    "nickname": nickname,
-                                    "join_time": join_time,
-                                    "days_ago": days_ago,
-                                }
-                            )
 
                     if unbound_users:
                         unbound_users_dict[group_id] = unbound_users
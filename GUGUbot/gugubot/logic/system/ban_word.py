@@ -9,6 +9,7 @@ from mcdreforged.api.types import PluginServerInterface
 from gugubot.builder import MessageBuilder
 from gugubot.config import BasicConfig, BotConfig
 from gugubot.logic.system.basic_system import BasicSystem
+from gugubot.utils.text_matcher import AhoCorasick
 from gugubot.utils.types import BoardcastInfo
 
 
@@ -18,6 +19,11 @@ class BanWordSystem(BasicConfig, BasicSystem):
     提供添加、删除、显示违禁词，以及违禁词检测等功能。
     """
 
+    # 检查所有消息中的违禁词
+    subscriptions = (("message", "*"),)
+    # 命令所属系统未处理时，先于其它兜底系统检查
+    command_order = 1
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
@@ -25,12 +31,22 @@ class BanWordSystem(BasicConfig, BasicSystem):
         BasicSystem.__init__(self, "ban_words", enable=False, config=config)
         data_path = Path(server.get_data_folder()) / "system" / "ban_words.json"
         data_path.parent.mkdir(parents=True, exist_ok=True)
+        self._matcher = AhoCorasick()
         BasicConfig.__init__(self, data_path)
 
     def initialize(self) -> None:
         """初始化系统，加载配置等"""
         # 从配置文件加载违禁词
         self.load()
+
+        # 构建违禁词匹配自动机
+        self._matcher = AhoCorasick(
+            ignore_case=self.config.get_keys(["system", "ban_words", "ignore_case"], False),
+            normalize_width=self.config.get_keys(
+                ["system", "ban_words", "normalize_width"], False
+            ),
+        )
+        self._matcher.rebuild(dict(self))
         self.logger.debug(f"已加载 {len(self)} 个违禁词")
 
     async def process_boardcast_info(self, boardcast_info: BoardcastInfo) -> bool:
@@ -98,25 +114,23 @@ class BanWordSystem(BasicConfig, BasicSystem):
         tuple or None
             如果包含违禁词，返回 [违禁词, 理由]，否则返回 None
         """
-        for message in messages:
-            for ban_word, reason in self.items():
-                if ban_word in message.get("data", {}).get("text", ""):
-                    return ban_word, reason
-        return None
+        if not self._matcher:
+            return None
+
+        # 各段文本用 \x00 拼接后一次扫描，违禁词不会跨段匹配
+        text = "\x00".join(
+            str(message.get("data", {}).get("text", ""))
+            for message in messages
+            if isinstance(message, dict)
+        )
+        return self._matcher.find_first(text)
 
     async def _handle_command(self, boardcast_info: BoardcastInfo) -> bool:
         """处理命令"""
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-        system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
-
-        if not command.startswith(system_name):
+        command = self.get_system_command(boardcast_info)
+        if command is None:
             return False
 
-        command = command.replace(system_name, "", 1).strip()
-
         if command.startswith(self.get_tr("add")):
             return await self._handle_add(boardcast_info)
         elif command.startswith(self.get_tr("remove")):
@@ -163,7 +177,7 @@ class BanWordSystem(BasicConfig, BasicSystem):
         reason = parts[1]
 
         self[ban_word] = reason
-        self.save()
+        self._matcher.add(ban_word, reason)
         await self.reply(
             boardcast_info, [MessageBuilder.text(self.get_tr("add_success"))]
         )
@@ -187,7 +201,7 @@ class BanWordSystem(BasicConfig, BasicSystem):
             return True
 
         del self[command]
-        self.save()
+        self._matcher.remove(command)
         await self.reply(
             boardcast_info, [MessageBuilder.text(self.get_tr("remove_success"))]
         )
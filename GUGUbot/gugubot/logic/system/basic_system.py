@@ -1,6 +1,6 @@
 import logging
 
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from gugubot.builder import MessageBuilder
 from gugubot.config.BotConfig import BotConfig
@@ -23,8 +23,22 @@ class BasicSystem:
         系统管理器的引用
     logger : logging.Logger
         日志记录器实例
+    subscriptions : Tuple[Tuple[str, str], ...]
+        系统需要处理的非命令事件 (event_type, event_sub_type)，"*" 表示任意。
+        命令消息总会分发给所有系统（以便处理开启/关闭命令），
+        因此空元组表示系统只处理命令。
+    subscribed_sources : Optional[Tuple[str, ...]]
+        非命令事件的来源限制，None 表示不限制
+    command_order : int
+        命令词命中其它系统、且该系统未处理时的兜底顺序：
+        大于 0 的系统紧跟命令所属系统检查（如违禁词），
+        小于 0 的系统排在最后（如 echo），相同值保持注册顺序
     """
 
+    subscriptions: Tuple[Tuple[str, str], ...] = (("*", "*"),)
+    subscribed_sources: Optional[Tuple[str, ...]] = None
+    command_order: int = 0
+
     def __init__(self, name: str, enable: bool = True, config: Optional[BotConfig] = None) -> None:
         """初始化基础系统。
 
@@ -48,6 +62,31 @@ class BasicSystem:
         else:
             self.enable = enable
 
+    def wants_event(self, event_type: str, sub_type: str, is_command: bool) -> bool:
+        """判断系统是否需要处理某类事件，用于构建系统管理器的分发表。
+
+        Parameters
+        ----------
+        event_type : str
+            事件类型
+        sub_type : str
+            事件子类型
+        is_command : bool
+            是否为命令消息
+
+        Returns
+        -------
+        bool
+            是否需要处理
+        """
+        if is_command:
+            return True
+
+        return any(
+            etype in ("*", event_type) and stype in ("*", sub_type)
+            for etype, stype in self.subscriptions
+        )
+
     def initialize(self) -> None:
         """初始化系统。
 
@@ -98,13 +137,12 @@ class BasicSystem:
             return False
         
         content = first_message.get("data",{}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        snapshot = self.config.snapshot
 
-        if not content.startswith(command_prefix):
+        if not content.startswith(snapshot.command_prefix):
             return False
 
-        group_admin = self.config.get_keys(["GUGUBot", "group_admin"], False)
-        if group_admin and not boardcast_info.is_admin:
+        if snapshot.group_admin and not boardcast_info.is_admin:
             return False
 
         return True
@@ -188,6 +226,69 @@ class BasicSystem:
         # 回退到默认翻译
         return server.tr(full_key, **kwargs)
 
+    def get_command_body(self, boardcast_info: BoardcastInfo) -> str:
+        """获取去掉命令前缀后的命令文本。
+
+        优先使用系统管理器已解析好的命令，避免每个系统重复处理。
+
+        Parameters
+        ----------
+        boardcast_info : BoardcastInfo
+            广播信息
+
+        Returns
+        -------
+        str
+            命令文本，如 "绑定 Steve"
+        """
+        if boardcast_info.command is not None:
+            return boardcast_info.command.body
+
+        content = boardcast_info.message[0].get("data", {}).get("text", "")
+        return content.replace(self.config.snapshot.command_prefix, "", 1).strip()
+
+    def is_routed_here(self, boardcast_info: BoardcastInfo) -> bool:
+        """命令词是否属于本系统。
+
+        系统管理器已解析命令时只比较所属系统，不必再逐个翻译命令词；
+        未经解析（如直接调用）时视为是，由系统自行判断。
+        """
+        command = boardcast_info.command
+        return command is None or command.system == self.name
+
+    def get_system_command(self, boardcast_info: BoardcastInfo) -> Optional[str]:
+        """获取以本系统名称开头的命令中名称之后的文本。
+
+        Parameters
+        ----------
+        boardcast_info : BoardcastInfo
+            广播信息
+
+        Returns
+        -------
+        Optional[str]
+            如 "#待办 添加 xxx" 返回 "添加 xxx"；命令不是发给本系统的返回 None
+        """
+        if not self.is_routed_here(boardcast_info):
+            return None
+
+        system_name = self.get_tr("name")
+        command = boardcast_info.command
+        if command is not None:
+            return command.rest if command.keyword == system_name else None
+
+        body = self.get_command_body(boardcast_info)
+        if not body.startswith(system_name):
+            return None
+        return body.replace(system_name, "", 1).strip()
+
+    def get_command_keywords(self) -> List[str]:
+        """获取本系统的命令词（已按当前风格翻译），用于命令路由。
+
+        子类可重写以加入系统名称之外的命令词。
+        """
+        return [self.get_tr("name")]
+
     async def handle_enable_disable(self, boardcast_info: BoardcastInfo) -> bool:
         """处理开启/关闭命令
         
@@ -206,18 +307,11 @@ class BasicSystem:
             
         if not boardcast_info.is_admin:
             return False
-            
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-        system_name = self.get_tr("name")
-        
-        command = command.replace(command_prefix, "", 1).strip()
-        
-        if not command.startswith(system_name):
+
+        command = self.get_system_command(boardcast_info)
+        if command is None:
             return False
-        
-        command = command.replace(system_name, "", 1).strip()
-        
+
         enable_cmd = self.get_tr("gugubot.enable", global_key=True)
         disable_cmd = self.get_tr("gugubot.disable", global_key=True)
         
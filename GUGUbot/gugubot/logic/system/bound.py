@@ -1,6 +1,5 @@
 # -*- coding: utf-8 -*-
 import asyncio
-import re
 
 from typing import Dict, List, Optional, Union
 
@@ -20,6 +19,10 @@ class BoundSystem(BasicSystem):
     提供绑定、解绑、查询绑定信息等功能。
     """
 
+    # 命令之外只处理 QQ 的进群/退群通知
+    subscriptions = (("notice", "group_increase"), ("notice", "group_decrease"))
+    subscribed_sources = ("QQ",)
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
@@ -36,6 +39,15 @@ class BoundSystem(BasicSystem):
             f"已加载 {len(self.player_manager.get_all_players())} 个玩家绑定信息"
         )
 
+    def get_command_keywords(self) -> List[str]:
+        """绑定相关命令可以不带系统名称直接使用"""
+        return [
+            self.get_tr("name"),
+            self.get_tr("bind"),
+            self.get_tr("unbind"),
+            self.get_tr("search"),
+        ]
+
     def set_whitelist_system(self, whitelist: WhitelistSystem) -> None:
         """设置白名单系统引用"""
         self.whitelist = whitelist
@@ -48,6 +60,17 @@ class BoundSystem(BasicSystem):
         boardcast_info: BoardcastInfo
             广播信息，包含消息内容
         """
+        # 群成员变动时增量更新群成员快照（管理群缓存也基于它，不受绑定系统开关影响）
+        if (
+            boardcast_info.event_type == "notice"
+            and boardcast_info.event_sub_type in ("group_increase", "group_decrease")
+            and boardcast_info.source.is_from("QQ")
+            and isinstance(boardcast_info.message, dict)
+        ):
+            qq_connector = self._get_qq_connector()
+            if qq_connector is not None:
+                qq_connector.group_members.handle_notice(boardcast_info.message)
+
         # 先检查是否是开启/关闭命令
         if await self.handle_enable_disable(boardcast_info):
             return True
@@ -103,12 +126,9 @@ class BoundSystem(BasicSystem):
 
     async def _handle_command(self, boardcast_info: BoardcastInfo) -> bool:
         """处理绑定相关命令"""
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
+        command = self.get_command_body(boardcast_info)
         system_name = self.get_tr("name")
 
-        command = command.replace(command_prefix, "", 1).strip()
-
         valid_commands = [
             system_name,
             self.get_tr("bind"),
@@ -221,28 +241,28 @@ class BoundSystem(BasicSystem):
             .get("player_name_pattern", "")
         )
         if player_name_pattern:
-            try:
-                if not re.match(player_name_pattern, player_name):
-                    await self.reply(
-                        boardcast_info,
-                        [
-                            MessageBuilder.text(
-                                self.get_tr(
-                                    "bind_invalid_name",
-                                    player_name=player_name,
-                                    pattern=player_name_pattern,
-                                )
-                            )
-                        ],
-                    )
-                    return True
-            except re.error as e:
-                self.logger.error(f"正则表达式 '{player_name_pattern}' 格式错误: {e}")
+            name_pattern = self.config.patterns.get("bound_player_name")
+            if name_pattern.invalid:
+                # 格式错误已由正则注册表在加载时记录
                 await self.reply(
                     boardcast_info,
                     [MessageBuilder.text(self.get_tr("bind_pattern_error"))],
                 )
                 return True
+            if not name_pattern.match(player_name):
+                await self.reply(
+                    boardcast_info,
+                    [
+                        MessageBuilder.text(
+                            self.get_tr(
+                                "bind_invalid_name",
+                                player_name=player_name,
+                                pattern=player_name_pattern,
+                            )
+                        )
+                    ],
+                )
+                return True
 
         # 检查是否达到绑定上限
         player = self.player_manager.get_player(
@@ -582,6 +602,13 @@ class BoundSystem(BasicSystem):
         for name in player_names:
             self.whitelist.remove_player(name)
 
+    def _get_qq_connector(self):
+        """获取 QQ 连接器，不可用时返回 None"""
+        try:
+            return self.system_manager.connector_manager.get_connector("QQ")
+        except Exception:
+            return None
+
     async def _get_member_in_all_groups(self) -> set:
         """获取所有群（包括普通群和管理群）中的成员ID集合
 
@@ -606,29 +633,15 @@ class BoundSystem(BasicSystem):
         if not all_group_ids:
             return member_id_set
 
-        # 获取QQ连接器
+        # 从群成员快照服务获取（过期时并发拉取）
         try:
-            qq_connector = self.system_manager.connector_manager.get_connector("QQ")
+            qq_connector = self._get_qq_connector()
             if not qq_connector or not qq_connector.bot:
                 return member_id_set
 
-            # 遍历所有群，获取成员列表
-            for group_id in all_group_ids:
-                if not group_id:
-                    continue
-                try:
-                    member_list_result = await qq_connector.bot.get_group_member_list(
-                        group_id=int(group_id)
-                    )
-                    if member_list_result and member_list_result.get("status") == "ok":
-                        members = member_list_result.get("data", [])
-                        for member in members:
-                            user_id = str(member.get("user_id", ""))
-                            if user_id:
-                                member_id_set.add(user_id)
-                except Exception as e:
-                    self.logger.error(f"获取群 {group_id} 成员列表失败: {e}")
-                    continue
+            group_members = qq_connector.group_members
+            await group_members.ensure_fresh(all_group_ids)
+            member_id_set = group_members.all_member_ids(all_group_ids)
         except Exception as e:
             self.logger.error(f"获取群成员列表失败: {e}")
 
@@ -15,6 +15,9 @@ class BoundNoticeSystem(BasicSystem):
     则提醒其进行绑定。不会拦截消息，让其他系统继续处理。
     """
 
+    # 检查所有消息的发送者是否已绑定
+    subscriptions = (("message", "*"),)
+
     def __init__(self, config: Optional[BotConfig] = None) -> None:
         """初始化绑定提醒系统。"""
         super().__init__("bound_notice", enable=False, config=config)
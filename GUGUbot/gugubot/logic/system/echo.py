@@ -21,6 +21,11 @@ class EchoSystem(BasicSystem):
         系统是否启用
     """
 
+    # 转发所有消息
+    subscriptions = (("message", "*"),)
+    # 命令未被任何系统处理时才转发
+    command_order = -1
+
     def __init__(self, enable: bool = True, config: BotConfig = None) -> None:
         """初始化回声系统。"""
         super().__init__(name="echo", enable=enable, config=config)
@@ -56,12 +61,8 @@ class EchoSystem(BasicSystem):
 
         # 检查是否是QQ管理群的消息，如果是则不广播
         if boardcast_info.source.is_from("QQ") and boardcast_info.event_sub_type == "group":
-            admin_group_ids = self.config.get_keys(
-                ["connector", "QQ", "permissions", "admin_group_ids"], []
-            )
-            if boardcast_info.source_id and str(boardcast_info.source_id) in [
-                str(i) for i in admin_group_ids if i
-            ]:
+            admin_group_ids = self.config.snapshot.admin_group_ids
+            if boardcast_info.source_id and str(boardcast_info.source_id) in admin_group_ids:
                 # 管理群消息不广播，直接返回False
                 return False
 
@@ -13,7 +13,7 @@ from mcdreforged.api.types import PluginServerInterface
 from gugubot.builder import MessageBuilder
 from gugubot.config.BotConfig import BotConfig
 from gugubot.logic.system.basic_system import BasicSystem
-from gugubot.utils.rcon_manager import RconManager
+from gugubot.utils.rcon_manager import get_rcon_manager
 from gugubot.utils.types import BoardcastInfo, ProcessedInfo
 
 
@@ -34,11 +34,14 @@ class ExecuteSystem(BasicSystem):
         RCON 管理器实例
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(self, server: PluginServerInterface, config: Optional[BotConfig] = None) -> None:
         """初始化命令执行系统。"""
         BasicSystem.__init__(self, "execute", enable=True, config=config)
         self.server = server
-        self.rcon_manager = RconManager(server)
+        self.rcon_manager = get_rcon_manager(server, config)
         self.logger = server.logger
 
     def initialize(self) -> None:
@@ -58,22 +61,8 @@ class ExecuteSystem(BasicSystem):
         bool
             如果命令应该被忽略，返回 True
         """
-        ignore_patterns = self.config.get_keys(
-            ["system", "execute", "ignore_execute_command_patterns"],
-            []
-        )
-        
-        if not ignore_patterns:
-            return False
-        
-        for pattern in ignore_patterns:
-            try:
-                if re.match(pattern, command):
-                    return True
-            except re.error:
-                self.logger.warning(f"无效的正则表达式模式: {pattern}")
-        
-        return False
+        # 无效的模式已由正则注册表在加载时报告并跳过
+        return self.config.patterns.get("ignore_execute_command").match(command)
 
     async def process_boardcast_info(self, boardcast_info: BoardcastInfo) -> bool:
         """处理接收到的命令。
@@ -227,7 +216,9 @@ class ExecuteSystem(BasicSystem):
             if use_mcdr and not command.startswith("!!"):
                 command = f"!!{command}"
             
-            result = self.rcon_manager.execute(command, use_mcdr_command=use_mcdr)
+            result = await self.rcon_manager.execute_async(
+                command, use_mcdr_command=use_mcdr
+            )
             
             if result:
                 await self.reply(boardcast_info, [MessageBuilder.text(result)])
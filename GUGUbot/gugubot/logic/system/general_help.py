@@ -27,6 +27,9 @@ class GeneralHelpSystem(BasicSystem):
         系统是否启用
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
@@ -2,13 +2,14 @@
 import asyncio
 
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from mcdreforged.api.types import PluginServerInterface
 
 from gugubot.builder import MessageBuilder, McMessageBuilder
 from gugubot.config import BasicConfig
 from gugubot.logic.system.basic_system import BasicSystem
+from gugubot.utils.text_matcher import KeywordMatcher
 from gugubot.utils.types import BoardcastInfo, ProcessedInfo
 
 
@@ -16,22 +17,52 @@ class KeyWordSystem(BasicConfig, BasicSystem):
     """关键词系统，用于管理和响应关键词。
 
     提供添加、删除、显示关键词，以及添加图片回复等功能。
+    关键词支持完全一致、开头、包含、正则四种触发方式，见 ``KeywordMatcher``。
     """
 
+    # 所有消息都可能触发关键词
+    subscriptions = (("message", "*"),)
+
     def __init__(self, server: PluginServerInterface, config=None) -> None:
         """初始化关键词系统。"""
         BasicSystem.__init__(self, "key_words", enable=True, config=config)
         data_path = Path(server.get_data_folder()) / "system" / "key_words.json"
         data_path.parent.mkdir(parents=True, exist_ok=True)
-        BasicConfig.__init__(self, data_path)
+        BasicConfig.__init__(
+            self,
+            data_path,
+            save_delay=config.get_keys(["GUGUBot", "save_delay"], 1) if config else 0,
+        )
         self.adding_request_dict: Dict[str, str] = {}
+        self.matcher = KeywordMatcher()
+        # (连接器列表版本, 不接收转发的 connector 来源)
+        self._receive_only_cache: Optional[Tuple[int, List[str]]] = None
 
     def initialize(self) -> None:
         """初始化系统，加载配置等"""
         # 从配置文件加载关键词
         self.load()
+        self.matcher.logger = self.logger
+        self._rebuild_matcher()
         self.logger.debug(f"已加载 {len(self)} 个关键词")
 
+    def _rebuild_matcher(self) -> None:
+        """关键词增删后重建匹配器"""
+        self.matcher.rebuild(self.keys())
+
+    def _get_exclude_receive_only(self) -> List[str]:
+        """获取 enable_receive=False 的 connector 来源，连接器注册/移除后重新计算"""
+        connector_manager = self.system_manager.connector_manager
+        version = connector_manager.routes_version
+        cache = self._receive_only_cache
+        if cache is None or cache[0] != version:
+            cache = (
+                version,
+                [c.source for c in connector_manager.connectors if not c.enable_receive],
+            )
+            self._receive_only_cache = cache
+        return cache[1]
+
     async def process_boardcast_info(self, boardcast_info: BoardcastInfo) -> bool:
         """处理接收到的命令。
 
@@ -74,13 +105,16 @@ class KeyWordSystem(BasicConfig, BasicSystem):
             command = self.adding_request_dict[boardcast_info.sender_id]
             del self.adding_request_dict[boardcast_info.sender_id]
             self[command] = boardcast_info.message
-            self.save()
+            self._rebuild_matcher()
             await self.reply(
                 boardcast_info, [MessageBuilder.text(self.get_tr("add_success"))]
             )
             return True
 
-        if content in self:
+        keyword = self.matcher.match(content)
+        if keyword is not None:
+            reply_message = self[keyword]
+
             # 与 echo 一致：来源 connector enable_send=False 则不转发到任何其他渠道
             source_name = boardcast_info.receiver_source or boardcast_info.source.origin
             source_connector = self.system_manager.connector_manager.get_connector(source_name)
@@ -96,13 +130,7 @@ class KeyWordSystem(BasicConfig, BasicSystem):
                 original_processed_info = self.create_processed_info(boardcast_info)
 
                 # 排除来源、enable_receive=False（不接收转发的端）；enable_send 已在上方按来源判断
-                exclude_source = source_name
-                exclude_for_echo = [exclude_source]
-                exclude_receive_only = [
-                    c.source for c in self.system_manager.connector_manager.connectors
-                    if not c.enable_receive
-                ]
-                exclude_for_echo.extend(exclude_receive_only)
+                exclude_for_echo = [source_name, *self._get_exclude_receive_only()]
 
                 # 原文转发：排除来源 + 未开启的 connector
                 await self.system_manager.connector_manager.broadcast_processed_info(
@@ -110,12 +138,12 @@ class KeyWordSystem(BasicConfig, BasicSystem):
                 )
 
             # 关键词回复：reply 只发到当前触发的群/会话，避免 QQ 多群时发到别的群
-            await self.reply(boardcast_info, self[content])
+            await self.reply(boardcast_info, reply_message)
 
             if forward_to_other:
                 # 再广播到其他 connector（MC、bridge 等），排除来源端和未开启的 connector
                 keyword_processed_info = ProcessedInfo(
-                    processed_message=self[content],
+                    processed_message=reply_message,
                     _source=boardcast_info.source,
                     source_id=boardcast_info.source_id,
                     sender=self.get_tr("gugubot.bot_name", global_key=True),
@@ -132,29 +160,38 @@ class KeyWordSystem(BasicConfig, BasicSystem):
 
         return False
 
-    async def _handle_command(self, boardcast_info: BoardcastInfo) -> bool:
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-        system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
-
-        valid_commands = [
-            system_name,
+    def get_command_keywords(self) -> List[str]:
+        """添加、删除等子命令可以不带系统名称直接使用"""
+        return [
+            self.get_tr("name"),
             self.get_tr("add"),
             self.get_tr("remove"),
             self.get_tr("list"),
             self.get_tr("cancel"),
         ]
-        if not any(command.startswith(i) for i in valid_commands):
+
+    async def _handle_command(self, boardcast_info: BoardcastInfo) -> bool:
+        if not self.is_routed_here(boardcast_info):
             return False
 
+        parsed = boardcast_info.command
+        if parsed is None:
+            command = self.get_command_body(boardcast_info)
+            if not any(command.startswith(i) for i in self.get_command_keywords()):
+                return False
+        else:
+            command = parsed.body
+
         # 检查是否仅管理员可用
         admin_only = self.config.get_keys(["system", "key_words", "admin_only"], False)
         if admin_only and not boardcast_info.is_admin:
             return False
 
-        command = command.replace(system_name, "", 1).strip()
+        system_name = self.get_tr("name")
+        if parsed is not None and parsed.keyword == system_name:
+            command = parsed.rest
+        else:
+            command = command.replace(system_name, "", 1).strip()
 
         if command.startswith(self.get_tr("add")):
             return await self._handle_add(boardcast_info)
@@ -228,7 +265,7 @@ class KeyWordSystem(BasicConfig, BasicSystem):
             return True
 
         del self[command]
-        self.save()
+        self._rebuild_matcher()
         await self.reply(
             boardcast_info, [MessageBuilder.text(self.get_tr("remove_success"))]
         )
@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
-"""在线玩家列表查询系统。"""
+"""在线玩家列表查询系统。
+
+在线名单由玩家加入/离开事件维护在内存中（见 :class:`OnlineRoster`），
+每隔 ``roster_resync_interval`` 秒通过 RCON 管理器的线程池校准一次，
+查询时不再调用 RCON。
+
+合并多服务器结果时，主服务器通过桥接 RPC（``list.players``）向各子服务器查询，
+所有子服务器回复后立即返回；旧版本子服务器仍使用文本内部命令查询。
+"""
 import re
 import asyncio
 import time
@@ -11,7 +19,12 @@ from mcdreforged.api.types import PluginServerInterface
 from gugubot.builder import MessageBuilder
 from gugubot.config.BotConfig import BotConfig
 from gugubot.logic.system.basic_system import BasicSystem
-from gugubot.utils.rcon_manager import RconManager
+from gugubot.utils.online_roster import OnlineRoster
+from gugubot.utils.rcon_manager import (
+    RconError,
+    RconUnavailableError,
+    get_rcon_manager,
+)
 from gugubot.utils.types import BoardcastInfo, ProcessedInfo
 
 
@@ -26,98 +39,223 @@ class ListType(Enum):
 class PlayerListSystem(BasicSystem):
     """在线玩家列表系统。"""
 
+    # 只处理命令（包括桥接内部查询命令）
+    subscriptions = ()
+
+    RPC_METHOD = "list.players"
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
         super().__init__("list", enable=True, config=config)
         self.server = server
-        self.rcon_manager = RconManager(server)
+        self.rcon_manager = get_rcon_manager(server, config)
         self.bridge_query_cmd = "bridge_list_query_internal_cmd"
         self.bridge_response_cmd = "bridge_list_response_internal_cmd"
 
         # 用于收集多服务器响应
         self._pending_queries: Dict[str, Dict[str, Any]] = {}
 
+        # 列表触发词（按风格缓存）
+        self._list_triggers: Optional[Dict[str, ListType]] = None
+        self._list_triggers_style: Optional[str] = None
+
+        # 在线名单与校准任务
+        self.roster = OnlineRoster()
+        self._bot_pattern = None
+        self._resync_lock = asyncio.Lock()
+        self._schedule_task_running = True
+
     def initialize(self) -> None:
         self.logger.debug("在线玩家列表系统已初始化")
+        self.server.schedule_task(self._schedule_resync())
+
+        bridge_connector = self._get_bridge_connector()
+        if bridge_connector is not None:
+            bridge_connector.register_rpc_handler(
+                self.RPC_METHOD, self._handle_rpc_list_players
+            )
+
+    def _get_bridge_connector(self):
+        """获取已启用的桥接连接器，未启用时返回 None"""
+        if not self.config.get_keys(["connector", "minecraft_bridge", "enable"], False):
+            return None
+        bridge_source = self.config.get_keys(
+            ["connector", "minecraft_bridge", "source_name"], "Bridge"
+        )
+        return self.system_manager.connector_manager.get_connector(bridge_source)
+
+    async def _handle_rpc_list_players(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """响应主服务器的在线列表 RPC 查询"""
+        real_players, bots = await self._get_local_players_and_bots()
+        return {
+            "server_name": self._get_server_name(),
+            "players": real_players,
+            "bots": bots,
+        }
 
     def _is_bot(self, player_name: str) -> bool:
         """检查玩家名称是否匹配假人模式"""
-        bot_patterns = self.config.get_keys(
-            ["connector", "minecraft", "bot_names_pattern"], []
-        )
+        return self.config.patterns.get("bot_names").match(player_name)
 
-        for pattern in bot_patterns:
-            try:
-                if re.match(pattern, player_name, re.IGNORECASE):
-                    return True
-            except re.error:
-                continue
-        return False
+    def _classify_bot(self, player_name: str) -> bool:
+        """判断是否为假人：先检查名称模式，再使用 player_ip_logger 插件辅助判断"""
+        if self._is_bot(player_name):
+            return True
+        ip_logger = self.server.get_plugin_instance("player_ip_logger")
+        return bool(ip_logger and not ip_logger.is_player(player_name))
 
     def _separate_players_and_bots(
         self, all_players: List[str]
     ) -> Tuple[List[str], List[str]]:
         """将玩家列表分离为真实玩家和假人"""
-        # 有人绑定 -> 识别假人
-        ip_logger = self.server.get_plugin_instance("player_ip_logger")
-
         real_players = []
         bots = []
 
         for player in all_players:
-            # 先检查名称模式
-            if self._is_bot(player):
-                bots.append(player)
-            # 再使用插件辅助判断
-            elif ip_logger and not ip_logger.is_player(player):
+            if self._classify_bot(player):
                 bots.append(player)
             else:
                 real_players.append(player)
 
         return real_players, bots
 
+    # ------------------------------------------------------------------
+    # 在线名单维护
+    # ------------------------------------------------------------------
+
+    def on_player_joined(self, player_name: str) -> None:
+        self.roster.join(player_name)
+
+    def on_player_left(self, player_name: str) -> None:
+        self.roster.leave(player_name)
+
+    def on_server_startup(self) -> None:
+        # 服务器刚启动完成时没有玩家在线
+        self.roster.clear()
+
+    def on_server_stop(self) -> None:
+        self.roster.clear()
+
+    def _split_roster(self) -> Tuple[List[str], List[str]]:
+        """从在线名单获取 (真实玩家列表, 假人列表)，分类按名称缓存"""
+        # 假人名称模式随配置重载变化时重新分类
+        bot_pattern = self.config.patterns.get("bot_names")
+        if bot_pattern is not self._bot_pattern:
+            self.roster.forget_kinds()
+            self._bot_pattern = bot_pattern
+        return self.roster.split(self._classify_bot)
+
+    @staticmethod
+    def _looks_empty(raw_result: str) -> bool:
+        """list 输出是否表示没有玩家在线"""
+        return " 0 " in raw_result or "0/" in raw_result
+
+    async def _query_local(
+        self,
+    ) -> Tuple[Optional[str], List[str], Optional[List[str]]]:
+        """通过 RCON 查询本地在线名单
+
+        Returns
+        -------
+        Tuple[Optional[str], List[str], Optional[List[str]]]
+            (list 原始输出, 在线名单, 假人名单)；
+            RCON 不可用或查询失败时原始输出为 None，未启用 use_bot_list 时假人名单为 None
+        """
+        try:
+            raw_result = await self.rcon_manager.query("list")
+        except RconUnavailableError:
+            return None, [], None
+        except RconError as e:
+            self.logger.warning(f"获取本地玩家列表失败: {e}")
+            return None, [], None
+
+        colon_separator = self.config.get_keys(
+            ["system", "list", "colon_separator"], ":"
+        )
+        comma_separator = self.config.get_keys(
+            ["system", "list", "comma_separator"], ","
+        )
+        players = self.parse_player_list(raw_result, colon_separator, comma_separator)
+
+        bots = None
+        if self.config.get_keys(["system", "list", "use_bot_list"], False):
+            # leaves/lophine 端：/list 只返回真实玩家，假人通过 /bot list 获取
+            bots = await self._get_local_bots()
+        return raw_result, players, bots
+
+    async def resync(self) -> Optional[str]:
+        """用 RCON 校准在线名单
+
+        Returns
+        -------
+        Optional[str]
+            list 命令的原始输出，RCON 未运行或查询失败时为 None
+        """
+        async with self._resync_lock:
+            version = self.roster.version
+            raw_result, players, bots = await self._query_local()
+            if raw_result is None:
+                return None
+
+            # 无法解析的输出不用于校准
+            if players or bots or self._looks_empty(raw_result):
+                if self.roster.replace(players, bots, version=version):
+                    self.logger.debug(f"在线名单已校准，共 {len(self.roster)} 人")
+            return raw_result
+
+    async def _schedule_resync(self) -> None:
+        """定期校准在线名单"""
+        while self._schedule_task_running:
+            interval = self.config.get_keys(
+                ["system", "list", "roster_resync_interval"], 300
+            )
+            if self.enable and interval > 0:
+                await self.resync()
+            else:
+                interval = 60
+
+            # 分割成小段以便快速响应停止信号
+            while interval > 0 and self._schedule_task_running:
+                sleep_time = min(interval, 1.0)
+                await asyncio.sleep(sleep_time)
+                interval -= sleep_time
+
+    def stop_schedule_task(self) -> None:
+        """停止定时校准任务"""
+        self._schedule_task_running = False
+
     def _get_list_type_from_command(self, command: str) -> Optional[ListType]:
         """根据命令确定列表类型"""
-        list_cmd = self.get_tr("list")
-        bot_cmd = self.get_tr("bot")
-        server_cmd = self.get_tr("server")
-
-        # 玩家列表触发词
-        player_triggers = ["player", "玩家", "在线", "online"]
-        if (
-            list_cmd
-            and not list_cmd.startswith("gugubot.")
-            and list_cmd not in player_triggers
-        ):
-            player_triggers.append(list_cmd)
-
-        # 假人列表触发词
-        bot_triggers = ["bot", "假人", "机器人"]
-        if (
-            bot_cmd
-            and not bot_cmd.startswith("gugubot.")
-            and bot_cmd not in bot_triggers
+        return self._get_list_triggers().get(command)
+
+    def _get_list_triggers(self) -> Dict[str, ListType]:
+        """触发词 -> 列表类型，风格切换后命令词的翻译可能变化，需要重建"""
+        style_manager = getattr(self.system_manager, "style_manager", None)
+        current_style = style_manager.get_current_style() if style_manager else None
+        if self._list_triggers is not None and self._list_triggers_style == current_style:
+            return self._list_triggers
+
+        # 后写入的不覆盖先写入的：玩家 > 假人 > 服务器状态
+        triggers: Dict[str, ListType] = {}
+        for list_type, defaults, key in (
+            (ListType.PLAYERS, ["player", "玩家", "在线", "online"], "list"),
+            (ListType.BOTS, ["bot", "假人", "机器人"], "bot"),
+            (
+                ListType.ALL,
+                ["server", "服务器", "status", "状态", "all", "全部", "list"],
+                "server",
+            ),
         ):
-            bot_triggers.append(bot_cmd)
-
-        # 服务器状态触发词（显示全部）
-        server_triggers = ["server", "服务器", "status", "状态", "all", "全部", "list"]
-        if (
-            server_cmd
-            and not server_cmd.startswith("gugubot.")
-            and server_cmd not in server_triggers
-        ):
-            server_triggers.append(server_cmd)
-
-        if command in player_triggers:
-            return ListType.PLAYERS
-        elif command in bot_triggers:
-            return ListType.BOTS
-        elif command in server_triggers:
-            return ListType.ALL
+            translated = self.get_tr(key)
+            if translated and not translated.startswith("gugubot."):
+                defaults = defaults + [translated]
+            for trigger in defaults:
+                triggers.setdefault(trigger, list_type)
 
-        return None
+        self._list_triggers = triggers
+        self._list_triggers_style = current_style
+        return triggers
 
     async def _reply_to_source(
         self, boardcast_info: BoardcastInfo, message: List[dict]
@@ -171,10 +309,7 @@ class PlayerListSystem(BasicSystem):
         if not message or message[0].get("type") != "text":
             return False
 
-        content = message[0].get("data", {}).get("text", "").strip()
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-
-        command = content.replace(command_prefix, "", 1).strip()
+        command = self.get_command_body(boardcast_info)
 
         # 1. Check for internal bridge response command
         if command.startswith(self.bridge_response_cmd):
@@ -223,26 +358,52 @@ class PlayerListSystem(BasicSystem):
     async def _handle_merged_list_command(
         self, boardcast_info: BoardcastInfo, list_type: ListType
     ) -> None:
-        """处理合并多服务器结果的列表查询"""
+        """处理合并多服务器结果的列表查询
+
+        支持 RPC 的子服务器全部回复后立即返回，bridge_timeout 只是等待上限；
+        有旧版本子服务器时仍广播文本内部命令，并等待到超时以收集其响应。
+        """
         try:
             query_id = f"{boardcast_info.sender_id}_{int(time.time() * 1000)}"
             server_name = self._get_server_name()
+            start_time = time.time()
+            timeout = self.config.get_keys(["system", "list", "bridge_timeout"], 3)
 
-            real_players, bots = self._get_local_players_and_bots()
+            real_players, bots = await self._get_local_players_and_bots()
 
             self._pending_queries[query_id] = {
                 "boardcast_info": boardcast_info,
                 "list_type": list_type,
                 "responses": {server_name: {"players": real_players, "bots": bots}},
-                "start_time": time.time(),
+                "start_time": start_time,
             }
+            responses = self._pending_queries[query_id]["responses"]
 
-            await self._broadcast_query_to_bridge_with_id(
-                boardcast_info, query_id, list_type
+            bridge_connector = self._get_bridge_connector()
+            legacy_peers = (
+                bridge_connector.legacy_peer_count() if bridge_connector else 0
             )
+            if legacy_peers:
+                await self._broadcast_query_to_bridge_with_id(
+                    boardcast_info, query_id, list_type
+                )
 
-            timeout = self.config.get_keys(["system", "list", "bridge_timeout"], 3)
-            await asyncio.sleep(timeout)
+            if bridge_connector is not None:
+                results = await bridge_connector.request(
+                    self.RPC_METHOD, {"list_type": list_type.value}, timeout=timeout
+                )
+                for result in results.values():
+                    if not isinstance(result, dict):
+                        continue
+                    responses[result.get("server_name", "Server")] = {
+                        "players": list(result.get("players") or []),
+                        "bots": list(result.get("bots") or []),
+                    }
+
+            if legacy_peers:
+                remaining = start_time + timeout - time.time()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
 
             await self._send_merged_result(query_id)
 
@@ -253,23 +414,7 @@ class PlayerListSystem(BasicSystem):
                 [MessageBuilder.text(self.get_tr("query_failed", error=str(e)))],
             )
 
-    def _get_local_players(self) -> List[str]:
-        """获取本地服务器的玩家列表（不包含假人，如果启用了 use_bot_list）"""
-        try:
-            if self.server.is_rcon_running():
-                result = self.server.rcon_query("list")
-                colon_separator = self.config.get_keys(
-                    ["system", "list", "colon_separator"], ":"
-                )
-                comma_separator = self.config.get_keys(
-                    ["system", "list", "comma_separator"], ","
-                )
-                return self.parse_player_list(result, colon_separator, comma_separator)
-        except Exception as e:
-            self.logger.warning(f"获取本地玩家列表失败: {e}")
-        return []
-
-    def _get_local_bots(self) -> List[str]:
+    async def _get_local_bots(self) -> List[str]:
         """获取本地服务器的假人列表（通过 /bot list 命令）
 
         返回格式示例:
@@ -279,14 +424,11 @@ class PlayerListSystem(BasicSystem):
             world_nether(0):
         """
         try:
-            if self.server.is_rcon_running():
-                result = self.server.rcon_query("bot list")
-                if not result:
-                    return []
-                return self._parse_bot_list(result)
-        except Exception as e:
+            result = await self.rcon_manager.query("bot list")
+        except RconError as e:
             self.logger.warning(f"获取本地假人列表失败: {e}")
-        return []
+            return []
+        return self._parse_bot_list(result) if result else []
 
     def _parse_bot_list(self, raw_result: str) -> List[str]:
         """解析 /bot list 返回的假人列表
@@ -321,24 +463,17 @@ class PlayerListSystem(BasicSystem):
 
         return bots
 
-    def _get_local_players_and_bots(self) -> Tuple[List[str], List[str]]:
-        """获取本地服务器的玩家和假人列表
+    async def _get_local_players_and_bots(self) -> Tuple[List[str], List[str]]:
+        """获取本地服务器的玩家和假人列表（名单尚未确定时先校准一次）
 
         Returns:
             Tuple[List[str], List[str]]: (真实玩家列表, 假人列表)
         """
-        use_bot_list = self.config.get_keys(["system", "list", "use_bot_list"], False)
-
-        if use_bot_list:
-            # leaves/lophine 端：使用 /list 获取玩家，使用 /bot list 获取假人
-            all_players = self._get_local_players()
-            bots = self._get_local_bots()
-            # /list 在这些端只返回真实玩家，不需要额外分离
-            return all_players, bots
-        else:
-            # 其他端：使用 /list 获取所有，然后通过名称模式分离
-            all_players = self._get_local_players()
-            return self._separate_players_and_bots(all_players)
+        if not self.roster.ready:
+            await self.resync()
+        if not self.roster.ready:
+            return [], []
+        return self._split_roster()
 
     def _get_server_name(self) -> str:
         """获取当前服务器名称"""
@@ -600,27 +735,23 @@ class PlayerListSystem(BasicSystem):
     ) -> None:
         """处理本地列表命令"""
         try:
-            if self.server.is_rcon_running():
-                use_bot_list = self.config.get_keys(
-                    ["system", "list", "use_bot_list"], False
-                )
+            formatted_result = ""
+            raw_result = None if self.roster.ready else await self.resync()
 
-                if use_bot_list:
-                    # leaves/lophine 端：使用专门的方法获取分离的玩家和假人列表
-                    real_players, bots = self._get_local_players_and_bots()
-                    formatted_result = self._format_separated_list(
-                        real_players, bots, list_type
-                    )
-                else:
-                    # 其他端：使用传统方式，从 /list 结果中分离
-                    result = self.server.rcon_query("list")
-                    formatted_result = self._format_player_list(result, list_type)
+            if self.roster.ready:
+                real_players, bots = self._split_roster()
+                formatted_result = self._format_separated_list(
+                    real_players, bots, list_type
+                )
+            elif raw_result:
+                # 无法解析的 list 输出，原样返回
+                formatted_result = self._format_player_list(raw_result, list_type)
 
-                if formatted_result:
-                    await self._reply_to_source(
-                        boardcast_info, [MessageBuilder.text(formatted_result)]
-                    )
-                    return
+            if formatted_result:
+                await self._reply_to_source(
+                    boardcast_info, [MessageBuilder.text(formatted_result)]
+                )
+                return
 
             self.logger.warning(self.get_tr("rcon_not_running"))
             await self._reply_to_source(
@@ -655,7 +786,7 @@ class PlayerListSystem(BasicSystem):
                 return
 
             server_name = self._get_server_name()
-            real_players, bots = self._get_local_players_and_bots()
+            real_players, bots = await self._get_local_players_and_bots()
 
             players_str = ",".join(real_players) if real_players else ""
             bots_str = ",".join(bots) if bots else ""
@@ -34,6 +34,9 @@ class StartupCommandSystem(BasicConfig, BasicSystem):
         存储的启动指令列表（通过 self["commands"] 访问）
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
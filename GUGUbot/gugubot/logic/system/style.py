@@ -29,6 +29,9 @@ class StyleSystem(BasicSystem):
         风格管理器实例
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(
         self,
         server: PluginServerInterface,
@@ -92,12 +95,10 @@ class StyleSystem(BasicSystem):
         if not message or message[0].get("type") != "text":
             return False
 
-        content = message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
         system_name = self.get_tr("name")
 
         # 移除命令前缀和系统名称
-        command = content.replace(command_prefix, "", 1).strip()
+        command = self.get_command_body(boardcast_info)
         if not command.startswith(system_name):
             return False
 
@@ -5,12 +5,14 @@ import asyncio
 import traceback
 
 from mcdreforged.api.types import PluginServerInterface
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from gugubot.config.BotConfig import BotConfig
 from gugubot.connector.connector_manager import ConnectorManager
 from gugubot.logic.system.basic_system import BasicSystem
+from gugubot.utils.command_trie import CommandTrie
 from gugubot.utils.types import BoardcastInfo
+from gugubot.utils.types.parsed_command import ParsedCommand
 
 
 class SystemManager:
@@ -52,6 +54,118 @@ class SystemManager:
         self.connector_manager = connector_manager
         self.config = config
 
+        # (event_type, event_sub_type, is_command) -> 需要处理该事件的系统（保持注册顺序）
+        self._dispatch_table: Dict[Tuple[str, str, bool], Tuple[BasicSystem, ...]] = {}
+
+        # 命令词 -> 系统名称，随系统列表和风格变化重建
+        self._command_trie: Optional[CommandTrie] = None
+        self._command_trie_style: Optional[str] = None
+
+    def _rebuild_dispatch_table(self) -> None:
+        """系统列表变化后重置分发表，表项在首次遇到对应事件时按需构建"""
+        self._dispatch_table = {}
+        self._command_trie = None
+
+    def _get_command_trie(self) -> CommandTrie:
+        """获取命令前缀树，风格切换后命令词的翻译可能变化，需要重建"""
+        style_manager = getattr(self, "style_manager", None)
+        current_style = style_manager.get_current_style() if style_manager else None
+
+        if self._command_trie is None or self._command_trie_style != current_style:
+            trie = CommandTrie()
+            for system in self.systems:
+                try:
+                    keywords = system.get_command_keywords()
+                except Exception as e:
+                    self.logger.debug(f"获取系统 {system.name} 的命令词失败: {e}")
+                    continue
+                for keyword in keywords:
+                    # 缺失的翻译会原样返回翻译键，不作为命令词
+                    if isinstance(keyword, str) and keyword and not keyword.startswith("gugubot."):
+                        trie.insert(keyword, system.name)
+            self._command_trie = trie
+            self._command_trie_style = current_style
+
+        return self._command_trie
+
+    def parse_command(self, boardcast_info: BoardcastInfo) -> Optional[ParsedCommand]:
+        """解析命令消息，并通过命令词找到所属系统。
+
+        Parameters
+        ----------
+        boardcast_info : BoardcastInfo
+            广播信息
+
+        Returns
+        -------
+        Optional[ParsedCommand]
+            解析后的命令，非命令消息返回 None
+        """
+        if not self._is_command_message(boardcast_info):
+            return None
+
+        command_prefix = self.config.snapshot.command_prefix if self.config else "#"
+        text = boardcast_info.message[0].get("data", {}).get("text", "")
+        body = text[len(command_prefix):].lstrip()
+
+        match = self._get_command_trie().longest_prefix(body)
+        keyword, system_name = match if match else (None, None)
+        return ParsedCommand.parse(text, command_prefix, keyword, system_name)
+
+    def _is_command_message(self, boardcast_info: BoardcastInfo) -> bool:
+        """判断消息是否以命令前缀开头（不考虑 group_admin 权限）"""
+        if boardcast_info.event_type != "message":
+            return False
+
+        message = boardcast_info.message
+        if not message or not isinstance(message, list):
+            return False
+
+        first_message = message[0]
+        if first_message.get("type") != "text":
+            return False
+
+        content = first_message.get("data", {}).get("text", "")
+        command_prefix = self.config.snapshot.command_prefix if self.config else "#"
+        return content.startswith(command_prefix)
+
+    def get_dispatch_targets(self, boardcast_info: BoardcastInfo) -> List[BasicSystem]:
+        """获取需要处理该事件的系统列表。
+
+        Parameters
+        ----------
+        boardcast_info : BoardcastInfo
+            广播信息
+
+        Returns
+        -------
+        List[BasicSystem]
+            按注册顺序排列的系统列表
+        """
+        is_command = self._is_command_message(boardcast_info)
+        key = (
+            str(boardcast_info.event_type),
+            str(boardcast_info.event_sub_type),
+            is_command,
+        )
+
+        systems = self._dispatch_table.get(key)
+        if systems is None:
+            systems = tuple(
+                s for s in self.systems if s.wants_event(key[0], key[1], is_command)
+            )
+            self._dispatch_table[key] = systems
+
+        if is_command:
+            return list(systems)
+
+        return [
+            s
+            for s in systems
+            if s.subscribed_sources is None
+            or any(boardcast_info.source.is_from(src) for src in s.subscribed_sources)
+        ]
+
     def get_system(self, name: str) -> Optional[BasicSystem]:
         for system in self.systems:
             if system.name == name:
@@ -107,6 +221,8 @@ class SystemManager:
             else:
                 self.systems.append(system)
 
+            self._rebuild_dispatch_table()
+
             self.logger.info(f"已添加并初始化系统: {system.name}")
         except Exception as e:
             error_msg = str(e) + "\n" + traceback.format_exc()
@@ -130,6 +246,7 @@ class SystemManager:
         for system in self.systems:
             if system.name == system_name:
                 self.systems.remove(system)
+                self._rebuild_dispatch_table()
                 self.logger.info(f"已移除系统: {system_name}")
                 return True
         return False
@@ -156,7 +273,8 @@ class SystemManager:
         bool
             是否所有系统都成功处理了命令
         """
-        to_systems = self.systems
+        boardcast_info.command = self.parse_command(boardcast_info)
+        to_systems = self.get_dispatch_targets(boardcast_info)
 
         if include is not None:
             to_systems = [
@@ -168,6 +286,12 @@ class SystemManager:
                 s for s in to_systems if not any(re.match(p, s.name) for p in exclude)
             ]
 
+        # 命令词命中某个系统时，优先交给该系统处理；
+        # 该系统未处理时依次交给违禁词等检查、其余系统，echo 总在最后
+        command = boardcast_info.command
+        if command is not None and command.system is not None:
+            to_systems = self._route_command(command, to_systems)
+
         system_info = f"广播命令到系统: {to_systems}"
         command_info = f"命令内容: {boardcast_info}"
         debug_msg = system_info + "\n" + command_info
@@ -184,6 +308,22 @@ class SystemManager:
         # 判断是否有系统成功处理了命令
         return result
 
+    @staticmethod
+    def _route_command(
+        command: ParsedCommand, to_systems: List[BasicSystem]
+    ) -> List[BasicSystem]:
+        """按命令所属系统重新排列待处理系统（不增减系统）。
+
+        命令所属系统排在最前，其余系统按 ``command_order`` 从大到小排列，
+        相同值保持注册顺序。
+        """
+        owner = [s for s in to_systems if s.name == command.system]
+        rest = sorted(
+            (s for s in to_systems if s.name != command.system),
+            key=lambda s: -s.command_order,
+        )
+        return owner + rest
+
     async def _safe_process_boardcast_info(
         self, system: BasicSystem, boardcast_info: BoardcastInfo
     ) -> bool:
@@ -18,6 +18,9 @@ class TodoSystem(BasicConfig, BasicSystem):
     提供添加、删除、查询待办事项等功能。
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
@@ -25,7 +28,13 @@ class TodoSystem(BasicConfig, BasicSystem):
         BasicSystem.__init__(self, "todo", enable=True, config=config)
         data_path = Path(server.get_data_folder()) / "system" / "todos.yml"
         data_path.parent.mkdir(parents=True, exist_ok=True)
-        BasicConfig.__init__(self, str(data_path), default_content={}, yaml_format=True)
+        BasicConfig.__init__(
+            self,
+            str(data_path),
+            default_content={},
+            yaml_format=True,
+            save_delay=config.get_keys(["GUGUBot", "save_delay"], 1) if config else 0,
+        )
         self.server = server
         self._next_id: int = 1
 
@@ -90,17 +99,10 @@ class TodoSystem(BasicConfig, BasicSystem):
         """处理待办相关命令"""
         # 所有用户都可以使用，不检查is_admin权限
 
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-        system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
-
-        if not command.startswith(system_name):
+        command = self.get_system_command(boardcast_info)
+        if command is None:
             return False
 
-        command = command.replace(system_name, "", 1).strip()
-
         if command.startswith(self.get_tr("add")):
             return await self._handle_add(boardcast_info)
         elif command.startswith(self.get_tr("remove")):
@@ -148,10 +150,10 @@ class TodoSystem(BasicConfig, BasicSystem):
             "completed": False,
             "completed_at": None,
         }
-        self["todos"] = todos
-        self["next_id"] = self._next_id + 1
+        with self.batch():
+            self["todos"] = todos
+            self["next_id"] = self._next_id + 1
         self._next_id += 1
-        self.save()
 
         await self.reply(
             boardcast_info,
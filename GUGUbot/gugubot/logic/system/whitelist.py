@@ -13,6 +13,9 @@ class WhitelistSystem(BasicSystem):
     提供添加、删除、查询白名单玩家等功能。
     """
 
+    # 只处理命令
+    subscriptions = ()
+
     def __init__(
         self, server: PluginServerInterface, config: Optional[BotConfig] = None
     ) -> None:
@@ -77,17 +80,10 @@ class WhitelistSystem(BasicSystem):
         if not is_admin:
             return False
 
-        command = boardcast_info.message[0].get("data", {}).get("text", "")
-        command_prefix = self.config.get("GUGUBot", {}).get("command_prefix", "#")
-        system_name = self.get_tr("name")
-
-        command = command.replace(command_prefix, "", 1).strip()
-
-        if not command.startswith(system_name):
+        command = self.get_system_command(boardcast_info)
+        if command is None:
             return False
 
-        command = command.replace(system_name, "", 1).strip()
-
         if command.startswith(self.get_tr("add")):
             return await self._handle_add(boardcast_info)
         elif command.startswith(self.get_tr("remove")):
@@ -1,4 +1,3 @@
-import re
 import traceback
 
 from typing import Any, Optional
@@ -72,10 +71,5 @@ class MCParser(BasicParser):
         if content.strip().startswith(qq_cmd_prefix):
             return False
 
-        ignore_mc_command_patterns = config.get_keys(["connector", "minecraft", "ignore_mc_command_patterns"], [])
-
-        for pattern in ignore_mc_command_patterns:
-            if re.match(pattern, content):
-                return True
-        return False
+        return config.patterns.get("ignore_mc_command").match(content)
 
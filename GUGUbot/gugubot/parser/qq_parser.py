@@ -28,43 +28,6 @@ class QQParser(BasicParser):
                         pass
         return None
 
-    def _extract_sender_from_template(self, text: str, template: str) -> Optional[str]:
-        """从模板中提取发送者名字，模板如 "[{display_name}] {sender}: "
-        
-        支持模板前面有额外前缀、后面有正文消息的情况
-        """
-        try:
-            # display_name 不跨越方括号，sender 不包含常见分隔符
-            pattern = (
-                re.escape(template)
-                .replace(r"\{display_name\}", r"[^\[\]]+")
-                .replace(r"\{sender\}", r"([^\[\]:\n]+)")
-            )
-            if match := re.search(pattern, text):
-                return match.group(1).strip()
-        except re.error:
-            pass
-        return None
-
-    def _parse_sender_from_template(self, text: str, templates: List) -> Optional[str]:
-        """使用聊天模板从消息文本中解析出发送者名字"""
-        # 没有配置模板时，尝试默认格式 [{source}] {sender}:
-        if not templates:
-            # sender 不包含 [ ] : 这些分隔符
-            if match := re.search(r"\[[^\[\]]+\]\s*([^\[\]:\n]+):\s", text):
-                return match.group(1).strip()
-            return None
-
-        # 展开模板列表（支持新旧两种格式）
-        template_strs = (
-            key for item in templates
-            for key in (item.keys() if isinstance(item, dict) else [item])
-        )
-        return next(
-            (sender for t in template_strs if (sender := self._extract_sender_from_template(text, t))),
-            None
-        )
-
     def _get_replied_text(self, data: dict) -> str:
         """从API返回的消息数据中提取文本内容"""
         if raw := data.get("raw_message", ""):
@@ -96,8 +59,8 @@ class QQParser(BasicParser):
             if not (replied_text := self._get_replied_text(data)):
                 return None
 
-            templates = self.connector.config.get_keys(["connector", "QQ", "chat_templates"], [])
-            if sender := self._parse_sender_from_template(replied_text, templates):
+            # 使用预编译的聊天模板反向解析
+            if sender := self.connector.chat_template_set.extract_sender(replied_text):
                 self.logger.debug(f"从回复消息中解析出receiver: {sender}")
                 return sender
 
@@ -124,7 +87,7 @@ class QQParser(BasicParser):
 
             echo = message_data.get("echo")# 处理API调用的返回结果
             if echo:
-                self.connector.bot.function_return[echo] = message_data
+                self.connector.bot.resolve(echo, message_data)
                 return None
 
             event_type = message_data.get("post_type", "")
@@ -197,22 +160,17 @@ class QQParser(BasicParser):
 
     def _is_admin(self, sender_id) -> bool:
         """检查是否是管理员"""
-        config = self.system_manager.config
-        admin_ids = config.get_keys(["connector", "QQ", "permissions", "admin_ids"], [])
-        admin_groups = config.get_keys(["connector", "QQ", "permissions", "admin_group_ids"], [])
-        
-        if str(sender_id) in [str(i) for i in admin_ids + admin_groups]:
-            return True
-        return False
+        snapshot = self.system_manager.config.snapshot
+        sender_id = str(sender_id)
+        return sender_id in snapshot.admin_ids or sender_id in snapshot.admin_group_ids
 
     def _friend_is_admin(self, message_data, event_type: str) -> bool:
         """检查是否是好友管理员"""
         if event_type != "message":
             return False
         
-        config = self.connector.config
-        friend_is_admin = config.get_keys(["connector", "QQ", "permissions", "friend_is_admin"], False)
-        
+        friend_is_admin = self.connector.config.snapshot.friend_is_admin
+
         is_private_chat = message_data.get("message_type") == 'private'
 
         return friend_is_admin and is_private_chat
@@ -226,11 +184,7 @@ class QQParser(BasicParser):
             # 对于 notice 和 request 类型，直接使用 user_id 或 group_id
             source_id = message_data.get("group_id") or message_data.get("user_id")
 
-        admin_ids = self.connector.config.get_keys(["connector", "QQ", "permissions", "admin_ids"], [])
-        admin_groups = self.connector.config.get_keys(["connector", "QQ", "permissions", "admin_group_ids"], [])
-        group_ids = self.connector.config.get_keys(["connector", "QQ", "permissions", "group_ids"], [])
-
-        valid_source = [str(i) for i in admin_ids + admin_groups + group_ids]
+        valid_source = self.connector.config.snapshot.valid_source_ids
 
         return friend_is_admin or str(source_id) in valid_source
 
@@ -252,8 +206,7 @@ class QQParser(BasicParser):
             True 表示应该排除此用户，False 表示不应该排除
         """
         # 1. 排除配置中指定的额外用户列表
-        exclude_ids = self.connector.config.get_keys(["system", "bound_notice", "exclude_ids"], [])
-        if user_id in [str(exclude_id) for exclude_id in exclude_ids if exclude_id]:
+        if user_id in self.connector.config.snapshot.exclude_ids:
             self.logger.debug(f"用户 {user_id} 在排除列表中，忽略消息")
             return True
         
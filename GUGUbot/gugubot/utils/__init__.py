@@ -1,6 +1,6 @@
 from gugubot.utils.message import str_to_array
 from gugubot.utils.player_manager import PlayerManager
-from gugubot.utils.rcon_manager import RconManager
+from gugubot.utils.rcon_manager import RconManager, get_rcon_manager, close_rcon_manager
 from gugubot.utils.update_checker import check_plugin_version
 from gugubot.utils.style_manager import StyleManager
 from gugubot.utils.config_migrator import migrate_config_v1_to_v2
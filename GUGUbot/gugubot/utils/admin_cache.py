@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""管理群成员缓存模块。
+
+管理群成员直接取自 QQ 连接器的群成员快照（:class:`GroupMemberService`），
+与绑定、未绑定检查、不活跃检查共用同一份数据和同一次拉取；
+本模块只负责管理群的刷新间隔、拉取失败后的重试间隔，
+以及按快照版本缓存的成员并集。
+"""
+
+import time
+from typing import Any, FrozenSet, Iterable, List, Optional, Tuple
+
+from gugubot.utils.group_members import GroupMemberService
+
+
+class AdminGroupCache:
+    """管理群成员缓存。
+
+    Attributes
+    ----------
+    ttl : float
+        整体刷新间隔（秒），小于等于 0 表示仅在管理群配置变化时刷新
+    retry_ttl : float
+        有群拉取失败（如启动时 QQ 尚未连接）时的重试间隔（秒）
+    """
+
+    def __init__(self, logger=None, ttl: float = 300, retry_ttl: float = 10) -> None:
+        self.logger = logger
+        self.ttl = ttl
+        self.retry_ttl = retry_ttl
+        self._group_members: Optional[GroupMemberService] = None
+        self._group_ids: Tuple[str, ...] = ()  # 当前的管理群列表
+        self._retry_at: float = 0.0
+        self._members: FrozenSet[str] = frozenset()  # 所有管理群成员的并集
+        self._members_key: Optional[Tuple[int, Tuple[str, ...]]] = None
+
+    @property
+    def _max_age(self) -> float:
+        return self.ttl if self.ttl > 0 else float("inf")
+
+    def _missing(self, group_members: GroupMemberService) -> List[str]:
+        """没有数据或数据已过期的管理群"""
+        now = time.time()
+        missing = []
+        for group_id in self._group_ids:
+            fetched_at = group_members.fetched_at(group_id)
+            if fetched_at is None or now - fetched_at >= self._max_age:
+                missing.append(group_id)
+        return missing
+
+    def invalidate(self) -> None:
+        """使管理群快照立即过期，下次查询时重新拉取"""
+        if self._group_members is not None:
+            for group_id in self._group_ids:
+                self._group_members.invalidate(group_id)
+        self._retry_at = 0.0
+
+    async def ensure_fresh(
+        self, group_members: Optional[GroupMemberService], admin_group_ids: Iterable[Any]
+    ) -> None:
+        """在管理群快照过期时刷新，同一个群的并发拉取由快照服务共享。
+
+        Parameters
+        ----------
+        group_members : Optional[GroupMemberService]
+            QQ 连接器的群成员快照，QQ 不可用时为 None
+        admin_group_ids : Iterable[Any]
+            管理群号列表
+        """
+        if group_members is None:
+            return
+
+        group_ids = GroupMemberService.normalize_group_ids(admin_group_ids)
+        if group_ids != self._group_ids or group_members is not self._group_members:
+            self._group_ids = group_ids
+            self._group_members = group_members
+            self._retry_at = 0.0
+
+        # 上次有群拉取失败时，重试间隔内直接使用已有数据
+        if time.monotonic() < self._retry_at:
+            return
+
+        await group_members.ensure_fresh(group_ids, max_age=self._max_age)
+
+        if self._missing(group_members):
+            self._retry_at = time.monotonic() + self.retry_ttl
+        else:
+            self._retry_at = 0.0
+
+    def contains(self, user_id: Any) -> bool:
+        """用户是否在任一管理群中"""
+        return str(user_id) in self._get_members()
+
+    def _get_members(self) -> FrozenSet[str]:
+        group_members = self._group_members
+        if group_members is None:
+            return frozenset()
+        # 进群/退群通知会改变快照版本，并集随之重建
+        key = (group_members.version, self._group_ids)
+        if key != self._members_key:
+            self._members = frozenset(group_members.all_member_ids(self._group_ids))
+            self._members_key = key
+        return self._members
+
+    def get_members(self, group_id: Optional[Any] = None) -> List[str]:
+        """获取管理群成员列表"""
+        if group_id is None:
+            return list(self._get_members())
+        if self._group_members is None or str(group_id) not in self._group_ids:
+            return []
+        return list(self._group_members.members(group_id))
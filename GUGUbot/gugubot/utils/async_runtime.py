@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""GUGUBot 异步运行时模块。
+
+GUGUBot 的所有系统逻辑统一运行在 MCDR 的异步执行器事件循环上，
+WebSocket 等传输线程通过 :class:`AsyncRuntime` 把协程交给该事件循环执行，
+而不是在自己的线程里 ``asyncio.run`` 临时创建事件循环。
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+from typing import Any, Callable, Coroutine, Dict, Optional, Union
+
+
+class AsyncRuntime:
+    """长期存在的 GUGUBot 事件循环句柄。
+
+    在 ``on_load`` 中调用 :meth:`bind` 记录 MCDR 的事件循环，之后任意线程都可以用
+    :meth:`submit` 投递协程、用 :meth:`call_soon` 投递回调。
+    绑定事件循环前会退回到 ``server.schedule_task``。
+
+    同时统计线程交接延迟（投递到事件循环开始执行之间的耗时）。
+    """
+
+    def __init__(self, server, logger=None) -> None:
+        self.server = server
+        self.logger = logger or server.logger
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._metrics_lock = threading.Lock()
+        self._handoff_count = 0
+        self._handoff_total = 0.0
+        self._handoff_max = 0.0
+        self._handoff_last = 0.0
+
+    def bind(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """绑定事件循环，未指定时使用当前正在运行的事件循环"""
+        self.loop = loop or asyncio.get_running_loop()
+
+    def _in_loop_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            return False
+
+    def _record_handoff(self, submitted_at: float) -> None:
+        latency = time.perf_counter() - submitted_at
+        with self._metrics_lock:
+            self._handoff_count += 1
+            self._handoff_total += latency
+            self._handoff_last = latency
+            if latency > self._handoff_max:
+                self._handoff_max = latency
+
+    async def _timed(self, coro: Coroutine, submitted_at: float) -> Any:
+        self._record_handoff(submitted_at)
+        return await coro
+
+    def submit(self, coro: Coroutine) -> Union[concurrent.futures.Future, asyncio.Task]:
+        """在 GUGUBot 事件循环中执行协程，可从任意线程调用。
+
+        Parameters
+        ----------
+        coro : Coroutine
+            要执行的协程
+
+        Returns
+        -------
+        concurrent.futures.Future | asyncio.Task
+            在事件循环线程内调用时返回 Task，否则返回线程安全的 Future
+        """
+        wrapped = self._timed(coro, time.perf_counter())
+
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return self.server.schedule_task(wrapped)
+
+        if self._in_loop_thread():
+            return loop.create_task(wrapped)
+
+        return asyncio.run_coroutine_threadsafe(wrapped, loop)
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any) -> None:
+        """在 GUGUBot 事件循环中执行回调，可从任意线程调用"""
+        submitted_at = time.perf_counter()
+
+        def run() -> None:
+            self._record_handoff(submitted_at)
+            callback(*args)
+
+        if self.loop is None or self.loop.is_closed():
+            self.submit(self._as_coroutine(callback, *args))
+            return
+        self.loop.call_soon_threadsafe(run)
+
+    @staticmethod
+    async def _as_coroutine(callback: Callable[..., Any], *args: Any) -> Any:
+        return callback(*args)
+
+    def get_metrics(self) -> Dict[str, float]:
+        """获取线程交接延迟统计（毫秒）"""
+        with self._metrics_lock:
+            count = self._handoff_count
+            return {
+                "handoff_count": count,
+                "handoff_avg_ms": self._handoff_total / count * 1000 if count else 0.0,
+                "handoff_max_ms": self._handoff_max * 1000,
+                "handoff_last_ms": self._handoff_last * 1000,
+            }
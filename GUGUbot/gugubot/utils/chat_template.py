@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""聊天模板模块。
+
+MC→QQ 转发时按权重随机选择聊天模板生成消息前缀，
+回复机器人消息时再用模板反向解析出原发送者。
+模板在加载配置时编译一次：权重采样使用别名法（O(1)），
+前缀预先拆分为文本片段与占位符，反向解析合并为一个正则。
+"""
+
+import random
+import re
+
+from string import Formatter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from gugubot.builder.qq_builder import CQHandler
+
+DEFAULT_TEMPLATE = "[{display_name}] {sender}: "
+
+# display_name 不跨越方括号，sender 不包含常见分隔符
+_DISPLAY_NAME_PATTERN = r"[^\[\]]+"
+_SENDER_PATTERN = r"[^\[\]:\n]+"
+
+_SLOTS = ("display_name", "sender")
+
+# 未配置模板时按默认格式 [{source}] {sender}: 解析
+_DEFAULT_REVERSE_REGEX = re.compile(r"\[[^\[\]]+\]\s*([^\[\]:\n]+):\s")
+
+
+class AliasSampler:
+    """Vose 别名法加权随机采样，构建 O(n)，每次采样 O(1)。"""
+
+    def __init__(self, weights: Sequence[float]) -> None:
+        count = len(weights)
+        self._prob: List[float] = [0.0] * count
+        self._alias: List[int] = [0] * count
+        if not count:
+            return
+
+        weights = [max(0.0, float(w)) for w in weights]
+        total = sum(weights)
+        if total <= 0:
+            weights, total = [1.0] * count, float(count)
+
+        scaled = [w * count / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        for i in small + large:
+            self._prob[i] = 1.0
+
+    def __len__(self) -> int:
+        return len(self._prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        """返回一个按权重随机选中的下标"""
+        index = int(rng.random() * len(self._prob))
+        return index if rng.random() < self._prob[index] else self._alias[index]
+
+
+class CompiledTemplate:
+    """编译后的单个聊天模板。
+
+    Attributes
+    ----------
+    template : str
+        原模板字符串
+    reverse_pattern : Optional[str]
+        反向解析用的正则（sender 为唯一的捕获组），模板不含 {sender} 时为 None
+    """
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        # (文本, 占位符名或 None)
+        self._segments: List[Tuple[str, Optional[str]]] = []
+        self._use_format = False
+        try:
+            for literal, field_name, format_spec, conversion in Formatter().parse(template):
+                if field_name is None:
+                    self._segments.append((literal, None))
+                    continue
+                if field_name not in _SLOTS or format_spec or conversion:
+                    self._use_format = True
+                self._segments.append((literal, field_name))
+        except ValueError:
+            self._use_format = True
+
+        escaped = re.escape(template).replace(r"\{display_name\}", _DISPLAY_NAME_PATTERN)
+        self._reverse_parts = escaped.split(r"\{sender\}")
+        self.reverse_pattern = self.build_reverse_pattern()
+
+    def build_reverse_pattern(self, group: Optional[str] = None) -> Optional[str]:
+        """构建反向解析正则，只有第一个 {sender} 作为捕获组，group 为其命名"""
+        parts = self._reverse_parts
+        if len(parts) < 2:
+            return None
+        capture = f"(?P<{group}>" if group else "("
+        return (
+            parts[0]
+            + f"{capture}{_SENDER_PATTERN})"
+            + f"(?:{_SENDER_PATTERN})".join(parts[1:])
+        )
+
+    def render(self, display_name: str, sender: str) -> str:
+        """填充模板"""
+        if self._use_format:
+            return self.template.format(display_name=display_name, sender=sender)
+        values = {"display_name": display_name, "sender": sender}
+        return "".join(
+            literal + (values[name] if name else "") for literal, name in self._segments
+        )
+
+
+class ChatTemplateSet:
+    """编译后的聊天模板集合。
+
+    Parameters
+    ----------
+    templates : Sequence[str]
+        模板列表
+    weights : Sequence[float]
+        对应权重，缺省为 1
+    """
+
+    def __init__(
+        self, templates: Sequence[str] = (), weights: Optional[Sequence[float]] = None
+    ) -> None:
+        self.templates = [CompiledTemplate(str(t)) for t in templates]
+        weights = list(weights) if weights is not None else [1] * len(self.templates)
+        self._sampler = AliasSampler(weights[: len(self.templates)])
+        self._default = CompiledTemplate(DEFAULT_TEMPLATE)
+
+        # 所有模板合并为一个正则，命名分组 _t{i} 对应第 i 个模板的 sender
+        self._reverse_groups: Dict[str, int] = {}
+        self._reverse_regex: Optional[re.Pattern] = None
+        patterns = []
+        for index, compiled in enumerate(self.templates):
+            if compiled.reverse_pattern is None:
+                continue
+            try:
+                re.compile(compiled.reverse_pattern)
+            except re.error:
+                continue
+            group = f"_t{index}"
+            self._reverse_groups[group] = index
+            patterns.append(compiled.build_reverse_pattern(group))
+        if patterns:
+            self._reverse_regex = re.compile("|".join(patterns))
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def choose(self) -> CompiledTemplate:
+        """按权重随机选择模板，未配置模板时返回默认模板"""
+        if not self.templates:
+            return self._default
+        return self.templates[self._sampler.sample()]
+
+    def render_segments(self, display_name: str, sender: str) -> List[Dict[str, Any]]:
+        """随机选择模板并生成消息段"""
+        text = self.choose().render(display_name, sender)
+        # 纯文本无需走 CQ 码解析
+        if "[CQ:" not in text and "&" not in text:
+            return [{"type": "text", "data": {"text": text}}] if text else []
+        return CQHandler.parse(text)
+
+    def extract_sender(self, text: str) -> Optional[str]:
+        """从机器人发出的消息中解析原发送者"""
+        if not self.templates:
+            if match := _DEFAULT_REVERSE_REGEX.search(text):
+                return match.group(1).strip()
+            return None
+
+        if self._reverse_regex is None:
+            return None
+        if match := self._reverse_regex.search(text):
+            for group in self._reverse_groups:
+                if (sender := match.group(group)) is not None:
+                    return sender.strip()
+        return None
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""命令前缀树模块。
+
+用于根据命令文本的最长前缀找到所属系统。
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class CommandTrie:
+    """按字符构建的前缀树，支持最长前缀匹配。"""
+
+    _END = object()
+
+    def __init__(self) -> None:
+        self._root: Dict[Any, Any] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, word: str, value: Any) -> None:
+        """插入一个命令词，已存在时保留先插入的值"""
+        if not word:
+            return
+        node = self._root
+        for char in word:
+            node = node.setdefault(char, {})
+        if self._END not in node:
+            node[self._END] = value
+            self._size += 1
+
+    def longest_prefix(self, text: str) -> Optional[Tuple[str, Any]]:
+        """查找 text 开头最长的命令词。
+
+        Parameters
+        ----------
+        text : str
+            待匹配文本
+
+        Returns
+        -------
+        Optional[Tuple[str, Any]]
+            (命令词, 对应值)，未匹配时返回 None
+        """
+        node = self._root
+        match = None
+        for index, char in enumerate(text):
+            node = node.get(char)
+            if node is None:
+                break
+            if self._END in node:
+                match = (text[: index + 1], node[self._END])
+        return match
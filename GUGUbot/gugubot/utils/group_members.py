@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""群成员快照服务模块。
+
+绑定、未绑定检查、不活跃检查都需要完整的群成员列表。
+该服务统一并发拉取所有群的成员列表并缓存，记录每个群的拉取时间，
+在有效期内的查询直接使用缓存；同一个群同时只有一个拉取请求，
+多个系统同时检查时共享同一次拉取。
+收到 QQ 进群/退群通知时增量更新。
+"""
+
+import asyncio
+import dataclasses
+import time
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class GroupMember:
+    """群成员信息"""
+
+    user_id: str
+    join_time: int = 0
+    card: str = ""
+    role: str = "member"
+    nickname: str = ""
+
+    @classmethod
+    def from_api(cls, data: Dict[str, Any]) -> "GroupMember":
+        return cls(
+            user_id=str(data.get("user_id", "")),
+            join_time=data.get("join_time", 0) or 0,
+            card=data.get("card", "") or "",
+            role=data.get("role", "member") or "member",
+            nickname=data.get("nickname", "") or "",
+        )
+
+
+class GroupMemberService:
+    """群成员快照服务。
+
+    Parameters
+    ----------
+    bot : Bot
+        QQ 连接器的 API 代理
+    logger : Any
+        日志记录器
+    max_age : float
+        快照有效期（秒），超过后下次查询时重新拉取
+
+    Attributes
+    ----------
+    version : int
+        成员数据每次变化（拉取或通知更新）时递增
+    """
+
+    def __init__(self, bot, logger=None, max_age: float = 300) -> None:
+        self.bot = bot
+        self.logger = logger
+        self.max_age = max_age
+        self.version = 0
+
+        self._groups: Dict[str, Dict[str, GroupMember]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._listeners: List[Callable[[str, str, Optional[GroupMember]], None]] = []
+
+    def add_listener(
+        self, callback: Callable[[str, str, Optional[GroupMember]], None]
+    ) -> None:
+        """注册成员变动回调，通知更新后以 (群号, QQ号, 成员或 None) 调用"""
+        self._listeners.append(callback)
+
+    def _notify(self, group_id: str, user_id: str, member: Optional[GroupMember]) -> None:
+        for callback in self._listeners:
+            try:
+                callback(group_id, user_id, member)
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"群成员变动回调出错: {e}")
+
+    @staticmethod
+    def normalize_group_ids(group_ids: Iterable[Any]) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(str(i) for i in group_ids if i))
+
+    def fetched_at(self, group_id: Any) -> Optional[float]:
+        """该群最近一次成功拉取的时间戳，从未成功时为 None"""
+        return self._fetched_at.get(str(group_id))
+
+    def has_group(self, group_id: Any) -> bool:
+        """是否有该群的成员数据"""
+        return str(group_id) in self._groups
+
+    async def _fetch(self, group_id: str) -> bool:
+        try:
+            result = await self.bot.get_group_member_list(group_id=int(group_id))
+        except Exception as e:
+            if self.logger:
+                self.logger.warning(f"获取群 {group_id} 成员列表失败: {e}")
+            return False
+
+        if not result or result.get("status") != "ok":
+            # 拉取失败时保留旧数据
+            if self.logger:
+                self.logger.warning(f"获取群 {group_id} 成员列表失败")
+            return False
+
+        members = {}
+        for data in result.get("data", []) or []:
+            member = GroupMember.from_api(data)
+            if member.user_id:
+                members[member.user_id] = member
+
+        self._groups[group_id] = members
+        self._fetched_at[group_id] = time.time()
+        self.version += 1
+        if self.logger:
+            self.logger.debug(f"已获取群 {group_id} 的 {len(members)} 名成员")
+        return True
+
+    def _fetch_shared(self, group_id: str) -> asyncio.Future:
+        task = self._inflight.get(group_id)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._fetch(group_id))
+            self._inflight[group_id] = task
+            task.add_done_callback(
+                lambda done, gid=group_id: self._clear_inflight(gid, done)
+            )
+        return task
+
+    def _clear_inflight(self, group_id: str, task: asyncio.Future) -> None:
+        if self._inflight.get(group_id) is task:
+            del self._inflight[group_id]
+
+    async def ensure_fresh(
+        self, group_ids: Iterable[Any], max_age: Optional[float] = None
+    ) -> None:
+        """并发拉取过期或缺失的群，进行中的拉取会被共享
+
+        Parameters
+        ----------
+        group_ids : Iterable[Any]
+            需要的群号
+        max_age : Optional[float]
+            可接受的快照最大年龄（秒），缺省为 max_age 属性，0 表示强制刷新
+        """
+        max_age = self.max_age if max_age is None else max_age
+        now = time.time()
+        stale = [
+            group_id
+            for group_id in self.normalize_group_ids(group_ids)
+            if group_id not in self._fetched_at
+            or now - self._fetched_at[group_id] >= max_age
+        ]
+        if not stale:
+            return
+        # shield：某个调用方被取消时不影响共享同一次拉取的其他调用方
+        await asyncio.gather(
+            *(asyncio.shield(self._fetch_shared(group_id)) for group_id in stale)
+        )
+
+    def members(self, group_id: Any) -> Dict[str, GroupMember]:
+        """获取群成员（QQ号 -> 成员信息），没有数据时为空"""
+        return self._groups.get(str(group_id), {})
+
+    def all_member_ids(self, group_ids: Optional[Iterable[Any]] = None) -> Set[str]:
+        """获取多个群（缺省为所有已缓存的群）成员QQ号的并集"""
+        if group_ids is None:
+            group_ids = self._groups.keys()
+        member_ids = set()
+        for group_id in self.normalize_group_ids(group_ids):
+            member_ids.update(self._groups.get(group_id, ()))
+        return member_ids
+
+    def groups_of(self, user_id: Any) -> List[str]:
+        """获取用户所在的已缓存的群"""
+        user_id = str(user_id)
+        return [group_id for group_id, members in self._groups.items() if user_id in members]
+
+    def handle_notice(self, notice: Dict[str, Any]) -> bool:
+        """根据群成员变动通知增量更新。
+
+        Parameters
+        ----------
+        notice : Dict[str, Any]
+            OneBot 通知事件数据
+
+        Returns
+        -------
+        bool
+            是否更新了数据
+        """
+        group_id = str(notice.get("group_id", ""))
+        user_id = notice.get("user_id")
+        members = self._groups.get(group_id)
+        if members is None or user_id is None:
+            return False
+
+        user_id = str(user_id)
+        notice_type = notice.get("notice_type")
+
+        if notice_type == "group_increase":
+            member = members[user_id] = GroupMember(
+                user_id=user_id, join_time=notice.get("time", int(time.time()))
+            )
+        elif notice_type == "group_decrease":
+            if members.pop(user_id, None) is None:
+                return False
+            member = None
+        else:
+            return False
+
+        self.version += 1
+        self._notify(group_id, user_id, member)
+        return True
+
+    def update_card(self, group_id: Any, user_id: Any, card: str) -> None:
+        """修改群名片后同步到快照"""
+        members = self._groups.get(str(group_id))
+        member = members.get(str(user_id)) if members is not None else None
+        if member is not None:
+            members[member.user_id] = dataclasses.replace(member, card=card)
+
+    def invalidate(self, group_id: Optional[Any] = None) -> None:
+        """使某个群（缺省为所有群）的快照过期，下次查询时重新拉取"""
+        if group_id is None:
+            self._fetched_at.clear()
+        else:
+            self._fetched_at.pop(str(group_id), None)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""共享的异步 HTTP 客户端模块。
+
+基于 ``requests.Session`` 复用连接，请求在专用线程池中执行，
+因此不会阻塞 MCDR 的事件循环；线程池大小即并发上限，
+每个主机另有令牌桶限速，所有请求都带默认超时。
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from gugubot.utils.send_scheduler import TokenBucket
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+}
+
+
+class HttpClient:
+    """异步 HTTP 客户端。
+
+    Parameters
+    ----------
+    max_concurrency : int
+        同时进行的请求数上限（连接池大小）
+    timeout : float | Tuple[float, float]
+        默认超时（秒），可为 (连接超时, 读取超时)
+    host_rate : float
+        每个主机每秒最多发起的请求数，小于等于 0 表示不限速
+    host_burst : float
+        每个主机允许的瞬时突发请求数
+    headers : Optional[Dict[str, str]]
+        默认请求头
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        timeout: Union[float, Tuple[float, float]] = (5, 10),
+        host_rate: float = 5,
+        host_burst: float = 5,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = timeout
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+
+        self._session = None
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.failures = 0
+
+    def _get_session(self):
+        # 延迟导入，未安装 requests 时只有真正发请求才会报错
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_concurrency,
+                    pool_maxsize=self.max_concurrency,
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(self.headers)
+                self._session = session
+            if self._executor is None:
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="GUGUBot-HTTP",
+                )
+            return self._session, self._executor
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.host_rate, self.host_burst)
+        return bucket
+
+    async def request(self, method: str, url: str, **kwargs: Any):
+        """发起请求
+
+        Parameters
+        ----------
+        method : str
+            HTTP 方法
+        url : str
+            请求地址
+        **kwargs
+            传给 ``requests.Session.request`` 的参数，未指定 timeout 时使用默认超时
+
+        Returns
+        -------
+        requests.Response
+            响应（内容已读取完毕）
+
+        Raises
+        ------
+        requests.exceptions.RequestException
+            网络错误或超时
+        """
+        session, executor = self._get_session()
+        kwargs.setdefault("timeout", self.timeout)
+
+        await self._bucket(url).acquire()
+
+        self.requests += 1
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, lambda: session.request(method, url, **kwargs)
+            )
+        except Exception:
+            self.failures += 1
+            raise
+
+    async def get(self, url: str, **kwargs: Any):
+        return await self.request("GET", url, **kwargs)
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"requests": self.requests, "failures": self.failures}
+
+    def close(self) -> None:
+        """关闭连接池与线程池"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+_shared_client: Optional[HttpClient] = None
+
+
+def get_http_client() -> HttpClient:
+    """获取全局共享的 HTTP 客户端"""
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = HttpClient()
+    return _shared_client
+
+
+def close_http_client() -> None:
+    """关闭全局共享的 HTTP 客户端（插件卸载时调用）"""
+    global _shared_client
+    if _shared_client is not None:
+        _shared_client.close()
+        _shared_client = None
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""在线玩家名单模块。
+
+名单由 MCDR 的玩家加入/离开事件维护，定期用 RCON ``list`` 的结果校准；
+玩家/假人分类按名称缓存，查询在线列表时只读内存。
+"""
+
+import threading
+import time
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+class OnlineRoster:
+    """在线玩家名单。
+
+    Attributes
+    ----------
+    synced_at : Optional[float]
+        名单最近一次确定（RCON 校准、开服或关服）的时间戳，尚未确定时为 None
+    version : int
+        每次加入/离开事件递增，用于丢弃与事件交错的过期校准结果
+    """
+
+    def __init__(self) -> None:
+        self.synced_at: Optional[float] = None
+        self.version = 0
+
+        # 用 dict 保持加入顺序
+        self._online: Dict[str, None] = {}
+        # 名称 -> 是否为假人
+        self._kinds: Dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.synced_at is not None
+
+    def __len__(self) -> int:
+        return len(self._online)
+
+    def __contains__(self, player_name: str) -> bool:
+        return player_name in self._online
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._online)
+
+    def join(self, player_name: str) -> None:
+        with self._lock:
+            self._online[player_name] = None
+            self.version += 1
+
+    def leave(self, player_name: str) -> None:
+        with self._lock:
+            self._online.pop(player_name, None)
+            self.version += 1
+
+    def replace(
+        self,
+        players: Iterable[str],
+        bots: Optional[Iterable[str]] = None,
+        version: Optional[int] = None,
+    ) -> bool:
+        """用完整名单替换当前名单
+
+        Parameters
+        ----------
+        players : Iterable[str]
+            在线名单（给出 bots 时为真实玩家）
+        bots : Optional[Iterable[str]]
+            已确定的假人名单（如 ``/bot list`` 的结果），给出时直接作为分类缓存
+        version : Optional[int]
+            开始查询时的 version，期间有加入/离开事件时放弃本次替换
+            （名单尚未确定时仍然替换，之后的校准会修正）
+
+        Returns
+        -------
+        bool
+            是否已替换
+        """
+        players = list(players)
+        bots = list(bots) if bots is not None else None
+        with self._lock:
+            if version is not None and version != self.version and self.ready:
+                return False
+            self._online = dict.fromkeys(players + (bots or []))
+            # 校准时重新分类（假人识别插件的数据可能已更新），缓存也不会无限增长
+            self._kinds = {}
+            if bots is not None:
+                self._kinds.update(dict.fromkeys(players, False))
+                self._kinds.update(dict.fromkeys(bots, True))
+            self.synced_at = time.time()
+            return True
+
+    def clear(self) -> None:
+        """服务器停止（或刚启动）时名单确定为空"""
+        self.replace(())
+
+    def invalidate(self) -> None:
+        """名单不再可信，下次查询前需要重新校准"""
+        with self._lock:
+            self.synced_at = None
+
+    def forget_kinds(self) -> None:
+        """清空分类缓存（分类规则变化时调用）"""
+        with self._lock:
+            self._kinds.clear()
+
+    def split(self, is_bot: Callable[[str], bool]) -> Tuple[List[str], List[str]]:
+        """按分类缓存拆分在线名单，未缓存的名称用 is_bot 判断后缓存
+
+        Returns
+        -------
+        Tuple[List[str], List[str]]
+            (真实玩家列表, 假人列表)
+        """
+        real_players, bots = [], []
+        for player_name in self.names():
+            kind = self._kinds.get(player_name)
+            if kind is None:
+                kind = self._kinds[player_name] = bool(is_bot(player_name))
+            (bots if kind else real_players).append(player_name)
+        return real_players, bots
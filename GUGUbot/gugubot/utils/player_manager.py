@@ -3,9 +3,10 @@
 import asyncio
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
 
 from gugubot.config import BasicConfig, BotConfig
+from gugubot.utils.admin_cache import AdminGroupCache
 from mcdreforged.api.types import PluginServerInterface
 
 # +----------------------------------------------------------------------+
@@ -45,15 +46,38 @@ class Player:
 
 
 class PlayerManager(BasicConfig):
-    """玩家管理器"""
+    """玩家管理器
+
+    除玩家数据外还维护两个哈希索引：
+    - 名称索引：小写的 Java/基岩版名称 -> 玩家列表
+    - 账号索引：(平台, 账号ID) -> 玩家
+
+    通过本类方法增删玩家/账号时索引会增量更新；外部直接修改 Player
+    后调用 ``save()`` 会将索引标记为过期，在下次查询时重建。
+
+    注册了账号变动回调（``add_account_listener``）时，``save()`` 会立即重建索引，
+    并与重建前的账号索引比较，把绑定状态可能变化的 (平台, 账号ID) 通知给回调。
+    """
 
     def __init__(self, server: PluginServerInterface, bound_system):
         self.server = server
         self.logger = server.logger
         self.bound_system = bound_system
         self._players: Dict[str, Player] = {}  # 玩家数据字典
+        self.admin_group_cache = AdminGroupCache(self.logger)  # 管理群成员缓存
+        self._name_index: Dict[str, List[Player]] = {}
+        self._account_index: Dict[Tuple[str, str], Player] = {}
+        self._account_id_index: Dict[str, List[Player]] = {}
+        self._index_dirty = True
+        self._account_listeners: List[Callable[[Set[Tuple[str, str]]], None]] = []
         data_path = Path(server.get_data_folder()) / "system" / "players.json"
-        super().__init__(path=str(data_path), default_content={}, yaml_format=True)
+        config = getattr(bound_system, "config", None)
+        super().__init__(
+            path=str(data_path),
+            default_content={},
+            yaml_format=True,
+            save_delay=config.get_keys(["GUGUBot", "save_delay"], 1) if config else 0,
+        )
 
     def load(self) -> None:
         """加载玩家数据"""
@@ -67,9 +91,39 @@ class PlayerManager(BasicConfig):
                 accounts=data.get("accounts", {}),
                 properties=data.get("properties", {}),
             )
+        self._rebuild_index()
 
     def save(self) -> None:
-        """保存玩家数据"""
+        """保存玩家数据
+
+        调用方可能直接修改了 Player 的名称/账号列表，因此索引在下次查询时重建。
+        """
+        if self._account_listeners:
+            before = None if self._index_dirty else set(self._account_index)
+            self._rebuild_index()
+            if before is not None:
+                self._notify_accounts(before ^ set(self._account_index))
+        else:
+            self._index_dirty = True
+        self._save_players()
+
+    def add_account_listener(
+        self, callback: Callable[[Set[Tuple[str, str]]], None]
+    ) -> None:
+        """注册账号绑定变动回调，以变动的 {(平台, 账号ID)} 调用"""
+        self._account_listeners.append(callback)
+
+    def _notify_accounts(self, keys: Iterable[Tuple[str, str]]) -> None:
+        keys = set(keys)
+        if not keys:
+            return
+        for callback in self._account_listeners:
+            try:
+                callback(keys)
+            except Exception as e:
+                self.logger.error(f"账号绑定变动回调出错: {e}")
+
+    def _save_players(self) -> None:
         temp = {}
         for name, player in self._players.items():
             temp[name] = {
@@ -82,6 +136,108 @@ class PlayerManager(BasicConfig):
         self.update(temp)
         super().save()
 
+    # ------------------------------------------------------------------
+    # 索引维护
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _append_unique(index: Dict[str, List[Player]], key: str, player: Player) -> None:
+        players = index.setdefault(key, [])
+        if not any(p is player for p in players):
+            players.append(player)
+
+    @staticmethod
+    def _remove_from(index: Dict[str, List[Player]], key: str, player: Player) -> None:
+        players = index.get(key)
+        if not players:
+            return
+        players[:] = [p for p in players if p is not player]
+        if not players:
+            del index[key]
+
+    def _index_player(self, player: Player) -> None:
+        for player_name in player.java_name + player.bedrock_name:
+            self._append_unique(self._name_index, str(player_name).lower(), player)
+        for platform, account_ids in player.accounts.items():
+            for account_id in account_ids:
+                self._account_index.setdefault((platform, str(account_id)), player)
+                self._append_unique(self._account_id_index, str(account_id), player)
+
+    def _unindex_player(self, player: Player) -> None:
+        for player_name in player.java_name + player.bedrock_name:
+            self._remove_from(self._name_index, str(player_name).lower(), player)
+        for platform, account_ids in player.accounts.items():
+            for account_id in account_ids:
+                key = (platform, str(account_id))
+                if self._account_index.get(key) is player:
+                    del self._account_index[key]
+                    # 同一账号可能被其他玩家持有，回填
+                    for other in self._account_id_index.get(str(account_id), []):
+                        if other is not player and self._has_account(other, str(account_id), platform):
+                            self._account_index[key] = other
+                            break
+                self._remove_from(self._account_id_index, str(account_id), player)
+
+    def _rebuild_index(self) -> None:
+        self._name_index = {}
+        self._account_index = {}
+        self._account_id_index = {}
+        for player in self._players.values():
+            self._index_player(player)
+        self._index_dirty = False
+
+    def _ensure_index(self) -> None:
+        if self._index_dirty:
+            self._rebuild_index()
+
+    @staticmethod
+    def _has_name(player: Player, player_name: str, ignore_case: bool = False) -> bool:
+        names = (str(name) for name in player.java_name + player.bedrock_name)
+        if ignore_case:
+            player_name = player_name.lower()
+            return any(name.lower() == player_name for name in names)
+        return player_name in names
+
+    @staticmethod
+    def _has_account(player: Player, account_id: str, platform: str = None) -> bool:
+        for platform_name, account_ids in player.accounts.items():
+            if platform and platform_name != platform:
+                continue
+            if account_id in (str(i) for i in account_ids):
+                return True
+        return False
+
+    def _players_by_name(self, player_name: str, ignore_case: bool = True) -> List[Player]:
+        """通过名称索引查找玩家，精确匹配的排在前面"""
+        self._ensure_index()
+        candidates = self._name_index.get(player_name.lower(), [])
+        exact = [p for p in candidates if self._has_name(p, player_name)]
+        if not ignore_case:
+            return exact
+        return exact + [
+            p
+            for p in candidates
+            if not any(p is e for e in exact) and self._has_name(p, player_name, True)
+        ]
+
+    def _players_by_account(self, account_id: str, platform: str = None) -> List[Player]:
+        """通过账号索引查找玩家"""
+        self._ensure_index()
+        if platform:
+            player = self._account_index.get((platform, account_id))
+            if player is None or not self._has_account(player, account_id, platform):
+                return []
+            return [player]
+        return [
+            p
+            for p in self._account_id_index.get(account_id, [])
+            if self._has_account(p, account_id)
+        ]
+
+    # ------------------------------------------------------------------
+    # 玩家操作
+    # ------------------------------------------------------------------
+
     def add_player(
         self, name: str, player_name: str = None, is_bedrock: bool = False
     ) -> Player:
@@ -94,16 +250,26 @@ class PlayerManager(BasicConfig):
         """
         if name not in self._players:
             self._players[name] = Player(name=name)
+        player = self._players[name]
         if player_name:
-            self._players[name].add_name(player_name, is_bedrock)
-        self.save()
-        return self._players[name]
+            player.add_name(player_name, is_bedrock)
+            if not self._index_dirty:
+                self._append_unique(self._name_index, str(player_name).lower(), player)
+        self._save_players()
+        return player
 
     def remove_player(self, name: str) -> bool:
         """删除玩家"""
         if name in self._players:
-            del self._players[name]
-            self.save()
+            player = self._players.pop(name)
+            if not self._index_dirty:
+                self._unindex_player(player)
+            self._save_players()
+            self._notify_accounts(
+                (platform, str(account_id))
+                for platform, account_ids in player.accounts.items()
+                for account_id in account_ids
+            )
             return True
         return False
 
@@ -133,20 +299,18 @@ class PlayerManager(BasicConfig):
         if identifier in self._players:
             return self._players[identifier]
 
-        if name_only:
+        if name_only or identifier is None:
             return None
 
-        for player in self._players.values():
-            # 2. 通过UUID查找
-            if identifier in player.java_name or identifier in player.bedrock_name:
-                return player
+        identifier = str(identifier)
+
+        # 2. 通过游戏名查找（Java版或基岩版，不区分大小写）
+        if players := self._players_by_name(identifier):
+            return players[0]
 
-            # 3. 通过关联账号查找
-            for platform_name, account_ids in player.accounts.items():
-                if platform and platform_name != platform:
-                    continue
-                if identifier in account_ids:
-                    return player
+        # 3. 通过关联账号查找
+        if players := self._players_by_account(identifier, platform):
+            return players[0]
 
         return None
 
@@ -166,7 +330,11 @@ class PlayerManager(BasicConfig):
                 identifier, player_name=identifier, is_bedrock=is_bedrock
             )
         player.add_account(platform, account_id)
-        self.save()
+        if not self._index_dirty:
+            self._account_index.setdefault((platform, str(account_id)), player)
+            self._append_unique(self._account_id_index, str(account_id), player)
+        self._save_players()
+        self._notify_accounts([(platform, str(account_id))])
         return True
 
     def is_name_bound_by_other_user(
@@ -183,14 +351,11 @@ class PlayerManager(BasicConfig):
         Returns:
             bool - 如果已被其他用户绑定则返回True
         """
-        for player in self._players.values():
-            player_in_name = (
-                player_name in player.java_name or player_name in player.bedrock_name
-            )
+        for player in self._players_by_name(str(player_name), ignore_case=False):
             not_current_user = current_user_id not in player.accounts.get(source, [])
             platform_not_bound = source in player.accounts
 
-            if player_in_name and not_current_user and platform_not_bound:
+            if not_current_user and platform_not_bound:
                 return True
 
         return False
@@ -204,44 +369,45 @@ class PlayerManager(BasicConfig):
 
         config: BotConfig = self.bound_system.config
         connectors = config.get_keys(["connector"], {})
+        qq_source = config.get_keys(["connector", "QQ", "source_name"], "QQ")
 
         for source, connector_config in connectors.items():
+            platform_accounts = player.accounts.get(source, [])
+            if not platform_accounts:
+                continue
+
             permissions = connector_config.get("permissions", {})
-            admin_ids = permissions.get("admin_ids", [])
-            admin_group_ids = permissions.get("admin_group_ids", [])
+            admin_ids = {str(i) for i in permissions.get("admin_ids", []) if i}
+            if any(str(account_id) in admin_ids for account_id in platform_accounts):
+                return True
 
-            if source == config.get_keys(["connector", "QQ", "source_name"], "QQ"):
-                admin_group_member_ids = set()
-                for admin_group_id in admin_group_ids:
-                    if not admin_group_id:
-                        continue
-                    try:
-                        admin_group_members = await self.bound_system.system_manager.connector_manager.get_connector(
-                            "QQ"
-                        ).bot.get_group_member_list(
-                            group_id=int(admin_group_id)
-                        )
-
-                        if (
-                            admin_group_members
-                            and admin_group_members.get("status") == "ok"
-                        ):
-                            admin_group_member_ids.update(
-                                [
-                                    str(member.get("user_id", ""))
-                                    for member in admin_group_members.get("data", [])
-                                ]
-                            )
-                    except Exception as e:
-                        self.logger.error(
-                            f"获取管理群 {admin_group_id} 成员列表失败: {e}"
-                        )
-                        continue
-                admin_group_ids = list(admin_group_member_ids)
+            if source != qq_source:
+                continue
 
-            platform_accounts = player.accounts.get(source, [])
-            for account_id in platform_accounts:
-                if str(account_id) in [str(i) for i in admin_ids + admin_group_ids]:
-                    return True
+            admin_group_ids = permissions.get("admin_group_ids", [])
+            if not any(admin_group_ids):
+                continue
+
+            self.admin_group_cache.ttl = config.get_keys(
+                ["connector", "QQ", "permissions", "admin_group_cache_ttl"], 300
+            )
+            await self.admin_group_cache.ensure_fresh(
+                self._get_group_members(), admin_group_ids
+            )
+            if any(
+                self.admin_group_cache.contains(account_id)
+                for account_id in platform_accounts
+            ):
+                return True
 
         return False
+
+    def _get_group_members(self):
+        """获取 QQ 连接器的群成员快照，不可用时返回 None"""
+        try:
+            connector = self.bound_system.system_manager.connector_manager.get_connector(
+                "QQ"
+            )
+        except Exception:
+            return None
+        return getattr(connector, "group_members", None) if connector else None
@@ -2,11 +2,85 @@
 """RCON 管理器模块。
 
 提供统一的命令执行接口，支持 RCON 和降级策略。
+
+``server.rcon_query`` 是阻塞调用，RCON 卡住时会拖住整个事件循环，
+因此协程中应使用 :meth:`RconManager.query` / :meth:`RconManager.execute_async`：
+查询在专用线程池中执行并带超时，连续失败后熔断一段时间直接失败，
+可选为每个工作线程维护一个持久的 RCON 连接以并行查询。
 """
 
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+from typing import Any, Dict, List, Optional
+
 from mcdreforged.api.types import PluginServerInterface
 
 
+class RconError(RuntimeError):
+    """RCON 查询失败"""
+
+
+class RconUnavailableError(RconError):
+    """RCON 未运行或已熔断，命令没有发出"""
+
+
+class RconTimeoutError(RconError):
+    """RCON 查询超时，命令可能已经执行"""
+
+
+class CircuitBreaker:
+    """熔断器。
+
+    连续失败达到阈值后打开，冷却期内拒绝请求；冷却结束后放行一次试探，
+    成功则关闭，失败则重新打开。
+
+    Parameters
+    ----------
+    failure_threshold : int
+        连续失败多少次后打开
+    cooldown : float
+        打开后的冷却时间（秒）
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        """是否允许发起请求"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            # 每个冷却期只放行一次试探（试探的调用方被取消时下个冷却期再试）
+            now = time.monotonic()
+            if now - max(self.opened_at, self._probe_at) < self.cooldown:
+                return False
+            self._probe_at = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+
 class RconManager:
     """RCON 管理器。
 
@@ -16,20 +90,47 @@ class RconManager:
     ----------
     server : PluginServerInterface
         MCDR 服务器接口实例
+    config : Optional[BotConfig]
+        配置，从 ``connector.minecraft.rcon`` 读取超时与熔断参数
     """
 
-    def __init__(self, server: PluginServerInterface) -> None:
+    def __init__(self, server: PluginServerInterface, config=None) -> None:
         """初始化 RCON 管理器。
 
         Parameters
         ----------
         server : PluginServerInterface
             MCDR 服务器接口实例
+        config : Optional[BotConfig]
+            配置对象
         """
         self.server = server
+        self.config = config
+
+        self.pool_size = max(0, int(self._get_option("pool_size", 0)))
+        self.breaker = CircuitBreaker(
+            self._get_option("failure_threshold", 3), self._get_option("cooldown", 30)
+        )
+
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._connections: List[Any] = []
+        self._lock = threading.Lock()
+
+        self.queries = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def _get_option(self, key: str, default: Any) -> Any:
+        if self.config is None:
+            return default
+        return self.config.get_keys(["connector", "minecraft", "rcon", key], default)
 
     def execute(self, command: str, use_mcdr_command: bool = False) -> str:
-        """执行命令并返回结果。
+        """执行命令并返回结果（阻塞，协程中请使用 :meth:`execute_async`）。
 
         Parameters
         ----------
@@ -61,6 +162,188 @@ class RconManager:
         # RCON 不可用，使用降级策略
         return self._execute_fallback(command)
 
+    async def execute_async(self, command: str, use_mcdr_command: bool = False) -> str:
+        """异步执行命令并返回结果，RCON 在工作线程中查询。
+
+        Parameters
+        ----------
+        command : str
+            要执行的命令
+        use_mcdr_command : bool, optional
+            是否强制使用 MCDR 命令执行方式，默认为 False
+
+        Returns
+        -------
+        str
+            命令执行结果。RCON 模式下返回实际结果，非 RCON 模式返回"指令已执行"
+
+        Raises
+        ------
+        RconTimeoutError
+            RCON 查询超时（命令可能已执行，因此不降级重复执行）
+        """
+        if use_mcdr_command:
+            self.server.execute_command(command)
+            return "指令已执行"
+
+        try:
+            result = await self.query(command)
+        except RconUnavailableError:
+            return self._execute_fallback(command)
+        except RconTimeoutError:
+            raise
+        except RconError as e:
+            self.server.logger.error(f"[RconManager] RCON 查询失败: {e}")
+            return self._execute_fallback(command)
+        return result
+
+    async def query(self, command: str, timeout: Optional[float] = None) -> str:
+        """在专用线程池中执行 RCON 查询
+
+        Parameters
+        ----------
+        command : str
+            要执行的命令
+        timeout : Optional[float]
+            超时（秒），缺省读取配置 ``connector.minecraft.rcon.timeout``
+
+        Returns
+        -------
+        str
+            查询结果
+
+        Raises
+        ------
+        RconUnavailableError
+            RCON 未运行或已熔断
+        RconTimeoutError
+            查询超时
+        RconError
+            查询失败
+        """
+        if not self.server.is_rcon_running():
+            raise RconUnavailableError("RCON 未运行")
+        if not self.breaker.allow():
+            self.rejected += 1
+            raise RconUnavailableError("RCON 连续失败，暂停查询")
+
+        if timeout is None:
+            timeout = self._get_option("timeout", 5)
+
+        self.queries += 1
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self._get_executor(), self._query_blocking, command),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            self.failures += 1
+            self.breaker.record_failure()
+            raise RconTimeoutError(f"RCON 查询超时（{timeout} 秒）: {command}")
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            raise RconError(str(e)) from e
+        finally:
+            latency = time.perf_counter() - start
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+
+        if result is None:
+            # MCDR 在连接断开等情况下返回 None
+            self.failures += 1
+            self.breaker.record_failure()
+            raise RconError(f"RCON 查询无结果: {command}")
+
+        self.breaker.record_success()
+        return result
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # 使用 MCDR 的连接时查询本身是串行的，多一个线程避免卡住的查询阻塞后续请求
+                self._executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.pool_size or 2,
+                    thread_name_prefix="GUGUBot-RCON",
+                )
+            return self._executor
+
+    def _query_blocking(self, command: str) -> Optional[str]:
+        """在工作线程中执行查询，开启连接池时使用本线程的持久连接"""
+        if self.pool_size <= 0:
+            return self.server.rcon_query(command)
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._open_connection()
+            if connection is None:
+                return self.server.rcon_query(command)
+            self._local.connection = connection
+
+        result = connection.send_command(command)
+        if result is None:
+            # 连接失效，下次重新建立
+            self._close_connection(connection)
+            self._local.connection = None
+        return result
+
+    def _open_connection(self):
+        try:
+            from mcdreforged.api.rcon import RconConnection
+
+            rcon_config = (self.server.get_mcdr_config() or {}).get("rcon", {}) or {}
+            connection = RconConnection(
+                rcon_config.get("address", "127.0.0.1"),
+                int(rcon_config.get("port", 25575)),
+                rcon_config.get("password", ""),
+            )
+            if not connection.connect():
+                return None
+        except Exception as e:
+            self.server.logger.warning(f"[RconManager] 建立 RCON 连接失败: {e}")
+            return None
+
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def _close_connection(self, connection) -> None:
+        with self._lock:
+            if connection in self._connections:
+                self._connections.remove(connection)
+        try:
+            connection.disconnect()
+        except Exception:
+            pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_latency": self.total_latency / self.queries if self.queries else 0.0,
+            "max_latency": self.max_latency,
+            "breaker_open": self.breaker.is_open,
+            "connections": len(self._connections),
+        }
+
+    def close(self) -> None:
+        """关闭线程池与持久连接"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            connections, self._connections = self._connections, []
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        for connection in connections:
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
+
     def _execute_fallback(self, command: str) -> str:
         """降级执行策略：RCON 不可用时的执行方式。
 
@@ -82,3 +365,22 @@ class RconManager:
             self.server.execute(command)
 
         return "指令已执行"
+
+
+_shared_manager: Optional[RconManager] = None
+
+
+def get_rcon_manager(server: PluginServerInterface, config=None) -> RconManager:
+    """获取全局共享的 RCON 管理器（所有系统共用线程池、熔断器与统计）"""
+    global _shared_manager
+    if _shared_manager is None:
+        _shared_manager = RconManager(server, config)
+    return _shared_manager
+
+
+def close_rcon_manager() -> None:
+    """关闭全局共享的 RCON 管理器（插件卸载时调用）"""
+    global _shared_manager
+    if _shared_manager is not None:
+        _shared_manager.close()
+        _shared_manager = None
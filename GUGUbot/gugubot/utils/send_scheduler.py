@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""限速发送调度模块。
+
+每个发送目标（如一个 QQ 群）一个 FIFO 队列与工作协程，不同目标之间并发发送；
+所有发送共用一个全局令牌桶，每个目标另有自己的令牌桶，
+用于控制整体和单群的发送频率。
+"""
+
+import asyncio
+import random
+import time
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+
+class TokenBucket:
+    """令牌桶限速器。
+
+    Parameters
+    ----------
+    rate : float
+        每秒补充的令牌数，小于等于 0 表示不限速
+    burst : float
+        桶容量，即允许的瞬时突发数量
+    """
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        self.rate = rate
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None  # 在事件循环中首次使用时创建
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """获取一个令牌，不足时等待"""
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+@dataclass
+class _SendJob:
+    parts: List[Any]
+    send: Callable[[Any], Awaitable[Any]]
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class SendScheduler:
+    """按目标排队、限速发送的调度器。
+
+    Parameters
+    ----------
+    global_rate, global_burst : float
+        全局令牌桶参数（条/秒，突发数），速率为 0 表示不限速
+    target_rate, target_burst : float
+        单个目标的令牌桶参数
+    part_interval : Tuple[float, float]
+        同一条长消息分段之间的随机间隔（秒），只阻塞该目标的队列
+    max_queue_size : int
+        单个目标最多排队的消息数，超过后丢弃新消息
+    logger : Any
+        日志记录器
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 0,
+        global_burst: float = 10,
+        target_rate: float = 0,
+        target_burst: float = 3,
+        part_interval: Tuple[float, float] = (0.5, 1.5),
+        max_queue_size: int = 100,
+        logger: Any = None,
+    ) -> None:
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.target_rate = target_rate
+        self.target_burst = target_burst
+        self.part_interval = part_interval
+        self.max_queue_size = max_queue_size
+        self.logger = logger
+
+        self._queues: Dict[Hashable, Deque[_SendJob]] = {}
+        self._buckets: Dict[Hashable, TokenBucket] = {}
+        self._workers: Dict[Hashable, asyncio.Task] = {}
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+    def enqueue(
+        self, target: Hashable, parts: List[Any], send: Callable[[Any], Awaitable[Any]]
+    ) -> bool:
+        """把一条（可能分段的）消息放入目标队列，立即返回。
+
+        Parameters
+        ----------
+        target : Hashable
+            发送目标，相同目标按 FIFO 顺序发送
+        parts : List[Any]
+            消息分段
+        send : Callable[[Any], Awaitable[Any]]
+            发送单个分段的协程函数
+
+        Returns
+        -------
+        bool
+            是否成功入队
+        """
+        queue = self._queues.setdefault(target, deque())
+        if len(queue) >= self.max_queue_size:
+            self.dropped += 1
+            if self.logger:
+                self.logger.warning(f"发送队列 {target} 已满，丢弃消息")
+            return False
+
+        queue.append(_SendJob(parts, send))
+
+        worker = self._workers.get(target)
+        if worker is None or worker.done():
+            self._workers[target] = asyncio.create_task(self._run(target))
+        return True
+
+    async def _run(self, target: Hashable) -> None:
+        queue = self._queues[target]
+        bucket = self._buckets.get(target)
+        if bucket is None:
+            bucket = self._buckets[target] = TokenBucket(self.target_rate, self.target_burst)
+
+        while queue:
+            job = queue[0]
+            for index, part in enumerate(job.parts):
+                if index > 0:
+                    await asyncio.sleep(random.uniform(*self.part_interval))
+                await bucket.acquire()
+                await self.global_bucket.acquire()
+                try:
+                    await job.send(part)
+                except Exception as e:
+                    self.failed += 1
+                    if self.logger:
+                        self.logger.error(f"发送消息到 {target} 失败: {e}")
+                    break
+            else:
+                self.sent += 1
+                latency = time.monotonic() - job.enqueued_at
+                self._latency_total += latency
+                if latency > self._latency_max:
+                    self._latency_max = latency
+            queue.popleft()
+
+        self._queues.pop(target, None)
+        self._workers.pop(target, None)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """获取队列深度与发送延迟（入队到发送完成，毫秒）统计"""
+        return {
+            "depth": sum(len(queue) for queue in self._queues.values()),
+            "depth_by_target": {
+                str(target): len(queue) for target, queue in self._queues.items()
+            },
+            "sent": self.sent,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "latency_avg_ms": self._latency_total / self.sent * 1000 if self.sent else 0.0,
+            "latency_max_ms": self._latency_max * 1000,
+        }
+
+    async def drain(self, timeout: float) -> None:
+        """等待队列中的消息发送完毕，最多等待 timeout 秒"""
+        workers = [worker for worker in self._workers.values() if not worker.done()]
+        if workers:
+            await asyncio.wait(workers, timeout=timeout)
+
+    async def close(self) -> None:
+        """取消所有未完成的发送"""
+        for worker in list(self._workers.values()):
+            worker.cancel()
+        self._workers.clear()
+        self._queues.clear()
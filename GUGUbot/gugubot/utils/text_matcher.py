@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""多模式文本匹配模块。
+
+提供 Aho–Corasick 自动机，一次扫描即可找出文本中出现的所有模式串，
+用于违禁词、关键词等需要同时匹配大量词条的场景。
+"""
+
+import re
+import unicodedata
+
+from collections import deque
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from gugubot.config.pattern_registry import can_combine
+from gugubot.utils.command_trie import CommandTrie
+
+
+def normalize_text(text: str, ignore_case: bool = False, normalize_width: bool = False) -> str:
+    """文本归一化。
+
+    Parameters
+    ----------
+    text : str
+        原始文本
+    ignore_case : bool
+        是否忽略大小写
+    normalize_width : bool
+        是否将全角字符转换为半角（NFKC）
+
+    Returns
+    -------
+    str
+        归一化后的文本
+    """
+    if normalize_width:
+        text = unicodedata.normalize("NFKC", text)
+    if ignore_case:
+        text = text.casefold()
+    return text
+
+
+class AhoCorasick:
+    """Aho–Corasick 多模式匹配自动机。
+
+    新增模式串时只更新 goto 表并标记失效，失败指针在下一次匹配前统一重建；
+    删除模式串时重建整个自动机。
+
+    Examples
+    --------
+    >>> matcher = AhoCorasick()
+    >>> matcher.add("he", 1)
+    >>> matcher.add("she", 2)
+    >>> list(matcher.iter_matches("ushers"))
+    [(1, 'she', 2), (2, 'he', 1)]
+    """
+
+    def __init__(self, ignore_case: bool = False, normalize_width: bool = False) -> None:
+        self.ignore_case = ignore_case
+        self.normalize_width = normalize_width
+        self._patterns: Dict[str, Tuple[str, Any]] = {}  # 归一化模式串 -> (原模式串, 值)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]  # 节点 -> 以该节点结尾的归一化模式串
+        self._built = True
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __contains__(self, pattern: str) -> bool:
+        return self._normalize(pattern) in self._patterns
+
+    def _normalize(self, text: str) -> str:
+        return normalize_text(text, self.ignore_case, self.normalize_width)
+
+    def _insert(self, key: str) -> None:
+        node = 0
+        for char in key:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        if key not in self._output[node]:
+            self._output[node].append(key)
+        self._built = False
+
+    def _build(self) -> None:
+        """按广度优先重建失败指针"""
+        queue = deque()
+        for next_node in self._goto[0].values():
+            self._fail[next_node] = 0
+            queue.append(next_node)
+
+        while queue:
+            node = queue.popleft()
+            for char, next_node in self._goto[node].items():
+                queue.append(next_node)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_node] = self._goto[fail].get(char, 0)
+                if self._fail[next_node] == next_node:
+                    self._fail[next_node] = 0
+
+        self._built = True
+
+    def add(self, pattern: str, value: Any = None) -> None:
+        """添加模式串，已存在时更新对应值"""
+        if not pattern:
+            return
+        key = self._normalize(pattern)
+        if not key:
+            return
+        exists = key in self._patterns
+        self._patterns[key] = (pattern, value)
+        if not exists:
+            self._insert(key)
+
+    def remove(self, pattern: str) -> bool:
+        """删除模式串并重建自动机"""
+        key = self._normalize(pattern)
+        if key not in self._patterns:
+            return False
+        del self._patterns[key]
+        self.rebuild()
+        return True
+
+    def rebuild(self, patterns: Optional[Dict[str, Any]] = None) -> None:
+        """重建自动机，传入 patterns 时替换全部模式串"""
+        if patterns is not None:
+            self._patterns = {}
+            for pattern, value in patterns.items():
+                key = self._normalize(str(pattern)) if pattern else ""
+                if key:
+                    self._patterns[key] = (str(pattern), value)
+        self._reset()
+        for key in self._patterns:
+            self._insert(key)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, Any]]:
+        """遍历文本中的所有匹配。
+
+        Yields
+        ------
+        Tuple[int, str, Any]
+            (匹配起始位置, 原模式串, 值)，按匹配结束位置排序
+        """
+        if not self._patterns:
+            return
+        if not self._built:
+            self._build()
+
+        text = self._normalize(text)
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match_node = node
+            while match_node:
+                for key in output[match_node]:
+                    pattern, value = self._patterns[key]
+                    yield index - len(key) + 1, pattern, value
+                match_node = fail[match_node]
+
+    def find_first(self, text: str) -> Optional[Tuple[str, Any]]:
+        """返回最先结束的匹配 (原模式串, 值)，没有匹配时返回 None"""
+        for _, pattern, value in self.iter_matches(text):
+            return pattern, value
+        return None
+
+
+class KeywordMatcher:
+    """关键词触发器匹配器。
+
+    关键词通过前缀区分触发方式：
+
+    - ``re:<正则>``：正则搜索
+    - ``prefix:<文本>``：消息以该文本开头
+    - ``contains:<文本>``：消息包含该文本
+    - 其他：消息与关键词完全一致
+
+    所有触发器会编译成一个组合匹配器（完全匹配用哈希表、前缀用前缀树、
+    包含用 Aho–Corasick、正则合并为一个分支表达式），
+    匹配优先级依次为完全匹配、前缀（最长）、包含、正则。
+    """
+
+    TRIGGER_TYPES = ("re", "prefix", "contains")
+
+    def __init__(self, logger=None) -> None:
+        self.logger = logger
+        self.rebuild([])
+
+    @classmethod
+    def parse_trigger(cls, keyword: str) -> Tuple[str, str]:
+        """解析关键词，返回 (触发方式, 模式)"""
+        trigger_type, sep, pattern = keyword.partition(":")
+        if sep and trigger_type in cls.TRIGGER_TYPES and pattern:
+            return trigger_type, pattern
+        return "exact", keyword
+
+    def rebuild(self, keywords: Iterable[str]) -> None:
+        """根据关键词列表重建匹配器"""
+        self._exact = set()
+        self._prefix = CommandTrie()
+        self._contains = AhoCorasick()
+        self._regex = None
+        self._regex_groups: Dict[str, str] = {}  # 分组名 -> 关键词
+        self._regex_list: List[Tuple[re.Pattern, str]] = []
+
+        regex_list = []
+        for keyword in keywords:
+            keyword = str(keyword)
+            trigger_type, pattern = self.parse_trigger(keyword)
+            if trigger_type == "exact":
+                self._exact.add(keyword)
+            elif trigger_type == "prefix":
+                self._prefix.insert(pattern, keyword)
+            elif trigger_type == "contains":
+                self._contains.add(pattern, keyword)
+            else:
+                try:
+                    regex_list.append((re.compile(pattern), keyword))
+                except re.error as e:
+                    if self.logger:
+                        self.logger.warning(f"关键词正则 {pattern} 无效，已忽略: {e}")
+
+        # 含反向引用或条件分组的正则合并后分组编号会改变，保留逐个匹配
+        self._regex_list = [
+            item for item in regex_list if not can_combine(item[0].pattern)
+        ]
+        regex_list = [item for item in regex_list if can_combine(item[0].pattern)]
+        if not regex_list:
+            return
+
+        groups = {f"_kw{index}": keyword for index, (_, keyword) in enumerate(regex_list)}
+        combined = "|".join(
+            f"(?P<{group}>{regex.pattern})"
+            for group, (regex, _) in zip(groups, regex_list)
+        )
+        try:
+            self._regex = re.compile(combined)
+            self._regex_groups = groups
+        except re.error:
+            # 单独有效但合并后冲突（如重复的命名分组、全局标记），退化为逐个匹配
+            self._regex_list = regex_list + self._regex_list
+
+    def __len__(self) -> int:
+        return (
+            len(self._exact) + len(self._prefix) + len(self._contains)
+            + len(self._regex_groups) + len(self._regex_list)
+        )
+
+    def match(self, text: str) -> Optional[str]:
+        """返回命中的关键词，没有命中时返回 None"""
+        if text in self._exact:
+            return text
+
+        if match := self._prefix.longest_prefix(text):
+            return match[1]
+
+        if match := self._contains.find_first(text):
+            return match[1]
+
+        if self._regex is not None:
+            if regex_match := self._regex.search(text):
+                # 外层分组最后闭合，lastgroup 即命中的关键词分组
+                return self._regex_groups[regex_match.lastgroup]
+        for regex, keyword in self._regex_list:
+            if regex.search(text):
+                return keyword
+
+        return None
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""TTL + LRU 缓存模块。
+
+条目按写入时指定的有效期过期，总数超过上限时淘汰最久未使用的条目；
+查询失败的结果（如 404）可以用较短的有效期做负缓存，避免反复请求。
+线程安全，可在工作线程与事件循环之间共享。
+"""
+
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """带有效期与容量上限的缓存。
+
+    Parameters
+    ----------
+    max_size : int
+        最多保存的条目数，超过后淘汰最久未使用的条目
+    ttl : float
+        默认有效期（秒）
+    negative_ttl : Optional[float]
+        负缓存（值为 None）的有效期，缺省与 ttl 相同
+    sweep_interval : float
+        两次过期清扫之间的最短间隔（秒），清扫在写入时顺带进行
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 3600,
+        negative_ttl: Optional[float] = None,
+        sweep_interval: float = 60,
+    ) -> None:
+        self.max_size = max(1, int(max_size))
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.sweep_interval = sweep_interval
+
+        # key -> (value, 过期时间)
+        self._data: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.lookup(key)[0]
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """查询缓存
+
+        Returns
+        -------
+        Tuple[bool, Any]
+            (是否命中, 值)，负缓存命中时返回 (True, None)
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                self.misses += 1
+                return False, None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """获取未过期的值，未命中时返回 default"""
+        hit, value = self.lookup(key)
+        return value if hit else default
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """写入缓存
+
+        Parameters
+        ----------
+        ttl : Optional[float]
+            有效期，缺省时按值是否为 None 使用 ttl 或 negative_ttl
+        expires_at : Optional[float]
+            绝对过期时间（时间戳），用于从持久化数据恢复，优先于 ttl
+        """
+        now = time.time()
+        if expires_at is None:
+            if ttl is None:
+                ttl = self.negative_ttl if value is None else self.ttl
+            expires_at = now + ttl
+        if expires_at <= now:
+            return
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            if now - self._last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def set_negative(self, key: Hashable) -> None:
+        """记录一次查询失败"""
+        self.set(key, None)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def sweep(self) -> int:
+        """清除所有过期条目，返回清除数量"""
+        with self._lock:
+            return self._sweep(time.time())
+
+    def _sweep(self, now: float) -> int:
+        expired = [key for key, (_, expires_at) in self._data.items() if expires_at <= now]
+        for key in expired:
+            del self._data[key]
+        self._last_sweep = now
+        return len(expired)
+
+    def entries(self) -> Iterator[Tuple[Hashable, Any, float]]:
+        """按从旧到新的顺序返回未过期的 (key, value, 过期时间)，用于持久化"""
+        now = time.time()
+        with self._lock:
+            items = list(self._data.items())
+        for key, (value, expires_at) in items:
+            if expires_at > now:
+                yield key, value, expires_at
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -5,6 +5,7 @@ from typing import Any, List, Literal, Optional, Union
 
 from mcdreforged.api.types import PluginServerInterface
 
+from gugubot.utils.types.parsed_command import ParsedCommand
 from gugubot.utils.types.source import Source
 
 
@@ -36,6 +37,8 @@ class BoardcastInfo:
         发送者是否是管理员
     target : Optional[dict]
         目标字典，指定消息发送的目标
+    command : Optional[ParsedCommand]
+        解析后的命令，由系统管理器在分发命令消息时填充
     """
 
     event_type: Literal["message", "notice", "request"]
@@ -59,6 +62,8 @@ class BoardcastInfo:
         None  # e.g., {"123456789": "group", "987654321": "private"}
     )
 
+    command: Optional[ParsedCommand] = None
+
     def __post_init__(self):
         """初始化后处理，确保 source 是 Source 对象。"""
         if not isinstance(self._source, Source):
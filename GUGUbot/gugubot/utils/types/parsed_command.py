@@ -0,0 +1,42 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class ParsedCommand:
+    """解析后的命令，每条命令消息只解析一次。
+
+    以 "#绑定 Steve 基岩" 为例（命令前缀为 "#"）：
+
+    Attributes
+    ----------
+    prefix : str
+        命令前缀，如 "#"
+    body : str
+        去掉前缀后的命令文本，如 "绑定 Steve 基岩"
+    keyword : Optional[str]
+        命中的命令词，如 "绑定"；未命中时为 None
+    system : Optional[str]
+        命令词所属的系统名称，如 "bound"
+    rest : str
+        命令词之后的文本，如 "Steve 基岩"
+    """
+
+    prefix: str
+    body: str
+    keyword: Optional[str] = None
+    system: Optional[str] = None
+    rest: str = ""
+
+    @classmethod
+    def parse(
+        cls,
+        text: str,
+        prefix: str,
+        keyword: Optional[str] = None,
+        system: Optional[str] = None,
+    ) -> "ParsedCommand":
+        """根据命令文本与已匹配的命令词构建命令对象"""
+        body = text[len(prefix):].strip() if text.startswith(prefix) else text.strip()
+        rest = body[len(keyword):].strip() if keyword else body
+        return cls(prefix=prefix, body=body, keyword=keyword, system=system, rest=rest)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""未绑定成员增量维护模块。
+
+未绑定检查只在首次和定期全量对账时根据群成员快照重建未绑定集合，
+之后通过群成员服务的进群/退群回调与玩家管理器的绑定/解绑回调增量维护，
+查询时直接读取集合，不再访问 QQ 接口。
+"""
+
+import time
+
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from gugubot.utils.group_members import GroupMember, GroupMemberService
+
+
+class UnboundTracker:
+    """未绑定成员集合。
+
+    管理员与管理群成员不计入；入群时间是否超时在查询时由调用方判断。
+
+    Parameters
+    ----------
+    group_members : GroupMemberService
+        群成员快照服务
+    is_bound : Callable[[str], bool]
+        判断 QQ 号是否已绑定
+
+    Attributes
+    ----------
+    built_at : Optional[float]
+        最近一次全量重建的时间戳，尚未重建时为 None
+    """
+
+    def __init__(
+        self, group_members: GroupMemberService, is_bound: Callable[[str], bool]
+    ) -> None:
+        self.group_members = group_members
+        self.is_bound = is_bound
+        self.built_at: Optional[float] = None
+
+        self.group_ids: Tuple[str, ...] = ()
+        self.admin_group_ids: Tuple[str, ...] = ()
+        self.admin_ids: FrozenSet[str] = frozenset()
+
+        # 群号 -> (QQ号 -> 成员)，只包含重建时拉取成功的群
+        self._unbound: Dict[str, Dict[str, GroupMember]] = {}
+
+        group_members.add_listener(self._on_member_change)
+
+    @property
+    def ready(self) -> bool:
+        return self.built_at is not None
+
+    def configure(
+        self,
+        group_ids: Iterable[Any],
+        admin_group_ids: Iterable[Any],
+        admin_ids: Iterable[Any],
+    ) -> bool:
+        """更新检查范围，范围变化后需要重新全量重建
+
+        Returns
+        -------
+        bool
+            范围是否变化
+        """
+        normalize = GroupMemberService.normalize_group_ids
+        scope = (
+            normalize(group_ids),
+            normalize(admin_group_ids),
+            frozenset(str(i) for i in admin_ids if i),
+        )
+        if scope == (self.group_ids, self.admin_group_ids, self.admin_ids):
+            return False
+        self.group_ids, self.admin_group_ids, self.admin_ids = scope
+        self.built_at = None
+        return True
+
+    def rebuild(self) -> None:
+        """根据当前群成员快照全量重建，调用前应先拉取成员列表"""
+        skip_user_ids = self.admin_ids | self.group_members.all_member_ids(
+            self.admin_group_ids
+        )
+        unbound = {}
+        for group_id in self.group_ids:
+            if not self.group_members.has_group(group_id):
+                continue
+            unbound[group_id] = {
+                user_id: member
+                for user_id, member in self.group_members.members(group_id).items()
+                if user_id not in skip_user_ids and not self.is_bound(user_id)
+            }
+        self._unbound = unbound
+        self.built_at = time.time()
+
+    def has_group(self, group_id: Any) -> bool:
+        """该群是否在集合中（重建时拉取失败的群不在）"""
+        return str(group_id) in self._unbound
+
+    def unbound(self, group_id: Any) -> List[GroupMember]:
+        return list(self._unbound.get(str(group_id), {}).values())
+
+    def count(self) -> int:
+        return sum(len(members) for members in self._unbound.values())
+
+    def _is_skipped(self, user_id: str) -> bool:
+        return user_id in self.admin_ids or any(
+            user_id in self.group_members.members(group_id)
+            for group_id in self.admin_group_ids
+        )
+
+    def _evaluate(self, group_id: str, user_id: str) -> None:
+        unbound = self._unbound[group_id]
+        member = self.group_members.members(group_id).get(user_id)
+        if member is None or self._is_skipped(user_id) or self.is_bound(user_id):
+            unbound.pop(user_id, None)
+        else:
+            unbound[user_id] = member
+
+    def refresh_users(self, user_ids: Iterable[Any]) -> None:
+        """重新判断若干用户在各群的状态（绑定/解绑后调用）"""
+        if not self.ready:
+            return
+        for user_id in user_ids:
+            user_id = str(user_id)
+            for group_id in self._unbound:
+                self._evaluate(group_id, user_id)
+
+    def _on_member_change(
+        self, group_id: str, user_id: str, member: Optional[GroupMember]
+    ) -> None:
+        if not self.ready:
+            return
+        if group_id in self.admin_group_ids:
+            # 管理群成员变动会改变该用户在所有群的跳过判断
+            self.refresh_users([user_id])
+        elif group_id in self._unbound:
+            self._evaluate(group_id, user_id)
@@ -1,36 +1,34 @@
-import requests
-
 from packaging import version
 
 from mcdreforged.api.types import PluginServerInterface
 
+from gugubot.utils.http_client import get_http_client
+
 
 # 检查插件版本
-def check_plugin_version(server: PluginServerInterface):
-    async def check_plugin_version():
-        try:
-            response = requests.get(
-                "https://api.github.com/repos/LoosePrince/PF-GUGUBot/releases/latest"
+async def check_plugin_version(server: PluginServerInterface):
+    try:
+        response = await get_http_client().get(
+            "https://api.github.com/repos/LoosePrince/PF-GUGUBot/releases/latest",
+            headers={"Accept": "application/vnd.github+json"},
+        )
+        if response.status_code != 200:
+            server.logger.warning(
+                f"无法检查插件版本，网络代码: {response.status_code}"
             )
-            if response.status_code != 200:
-                server.logger.warning(
-                    f"无法检查插件版本，网络代码: {response.status_code}"
-                )
-                return
-            latest_version = response.json()["tag_name"].replace("v", "")
-            current_version = str(server.get_self_metadata().version)
-            if version.parse(latest_version) > version.parse(current_version):
-                server.logger.info(
-                    f"§e[PF-GUGUBot] §6有新版本可用: §b{latest_version}§6，当前版本: §b{current_version}"
-                )
-                server.logger.info(
-                    "§e[PF-GUGUBot] §6请使用 §b!!MCDR plugin install -U -y gugubot §6来更新插件"
-                )
-            else:
-                server.logger.info(
-                    f"§e[PF-GUGUBot] §6已是最新版本: §b{current_version}"
-                )
-        except Exception as e:
-            server.logger.warning(f"检查插件版本时出错: {e}")
-
-    return check_plugin_version
+            return
+        latest_version = response.json()["tag_name"].replace("v", "")
+        current_version = str(server.get_self_metadata().version)
+        if version.parse(latest_version) > version.parse(current_version):
+            server.logger.info(
+                f"§e[PF-GUGUBot] §6有新版本可用: §b{latest_version}§6，当前版本: §b{current_version}"
+            )
+            server.logger.info(
+                "§e[PF-GUGUBot] §6请使用 §b!!MCDR plugin install -U -y gugubot §6来更新插件"
+            )
+        else:
+            server.logger.info(
+                f"§e[PF-GUGUBot] §6已是最新版本: §b{current_version}"
+            )
+    except Exception as e:
+        server.logger.warning(f"检查插件版本时出错: {e}")
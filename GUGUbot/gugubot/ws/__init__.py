@@ -1,9 +1,11 @@
 from .websocket_server import WebSocketServer
 from .websocket_client import WebSocketClient
 from .websocket_factory import WebSocketFactory
+from . import bridge_codec
 
 __all__ = [
     "WebSocketServer",
     "WebSocketClient", 
-    "WebSocketFactory"
+    "WebSocketFactory",
+    "bridge_codec",
 ]
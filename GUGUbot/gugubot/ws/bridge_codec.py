@@ -0,0 +1,232 @@
+"""桥接消息编解码
+
+v1（旧版）：直接发送完整的 JSON 消息，包含 raw 原始事件。
+v2（紧凑格式）：使用单字母字段名，省略空字段，默认不发送 raw；
+较大的消息可使用 zlib 压缩，以 ``Z`` 开头加 base64 文本帧发送；
+繁忙时多条消息可合并为一个批量帧，以 ``B`` 开头、每行一个帧。
+
+双方连接后互相发送 hello 控制帧协商版本，收到对方 hello 之前一律使用 v1，
+因此可以与旧版本混合组网。
+
+hello 中声明 ``rpc`` 的对端支持 RPC 控制帧（``type`` 为 ``rpc``），
+用于服务器间的内部查询，不经过各系统的消息处理。
+"""
+
+import base64
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+PROTOCOL_VERSION = 2
+
+# hello 帧的 target 只含这个不存在的来源，旧版本收到后会在 _process_bridge_message 中直接忽略
+HELLO_TARGET = "__gugubot_hello__"
+# 同理，旧版本会忽略 RPC 控制帧
+RPC_TARGET = "__gugubot_rpc__"
+
+COMPRESSED_PREFIX = "Z"
+BATCH_PREFIX = "B"
+
+# 完整字段名 -> 紧凑字段名
+_FIELDS = {
+    "sender": "s",
+    "sender_id": "i",
+    "event_sub_type": "e",
+    "receiver": "r",
+    "source": "c",
+    "source_id": "d",
+    "processed_message": "m",
+    "target": "t",
+    "is_admin": "a",
+    "bridge_source": "b",
+    "raw": "x",
+}
+_REVERSE_FIELDS = {short: full for full, short in _FIELDS.items()}
+
+
+@dataclass(frozen=True)
+class PeerCapabilities:
+    """对端协商结果，默认值对应旧版本"""
+
+    version: int = 1
+    compression: bool = False
+    want_raw: bool = True
+    batch: bool = False
+
+
+def make_hello(
+    role: str,
+    compression: bool,
+    want_raw: bool,
+    batch: bool = False,
+    rpc: bool = True,
+) -> Dict[str, Any]:
+    """构建 hello 控制帧
+
+    Parameters
+    ----------
+    role : str
+        "server" 或 "client"，避免旧版主服务器转发的客户端 hello 被误认
+    compression : bool
+        是否接受 zlib 压缩帧
+    want_raw : bool
+        是否需要对方发送 raw 原始事件
+    batch : bool
+        是否接受批量帧
+    rpc : bool
+        是否支持 RPC 控制帧
+    """
+    return {
+        "type": "hello",
+        "role": role,
+        "v": PROTOCOL_VERSION,
+        "compression": ["zlib"] if compression else [],
+        "want_raw": want_raw,
+        "batch": batch,
+        "rpc": rpc,
+        "target": {HELLO_TARGET: ""},
+    }
+
+
+def is_hello(message_data: Any) -> bool:
+    return isinstance(message_data, dict) and message_data.get("type") == "hello"
+
+
+def supports_rpc(hello: Dict[str, Any]) -> bool:
+    """对端 hello 是否声明支持 RPC"""
+    return bool(hello.get("rpc", False))
+
+
+def make_rpc_request(
+    call_id: str, method: str, params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    return {
+        "type": "rpc",
+        "kind": "request",
+        "id": call_id,
+        "method": method,
+        "params": params or {},
+        "target": {RPC_TARGET: ""},
+    }
+
+
+def make_rpc_response(
+    call_id: str, result: Any = None, error: Optional[str] = None
+) -> Dict[str, Any]:
+    response = {
+        "type": "rpc",
+        "kind": "response",
+        "id": call_id,
+        "result": result,
+        "target": {RPC_TARGET: ""},
+    }
+    if error is not None:
+        response["error"] = error
+    return response
+
+
+def is_rpc(message_data: Any) -> bool:
+    return isinstance(message_data, dict) and message_data.get("type") == "rpc"
+
+
+def parse_hello(
+    message_data: Dict[str, Any], compression: bool, batch: bool = False
+) -> PeerCapabilities:
+    """根据对端 hello 和本端设置得到协商结果"""
+    return PeerCapabilities(
+        version=min(int(message_data.get("v", 1)), PROTOCOL_VERSION),
+        compression=compression and "zlib" in (message_data.get("compression") or []),
+        want_raw=bool(message_data.get("want_raw", False)),
+        batch=batch and bool(message_data.get("batch", False)),
+    )
+
+
+def encode(
+    message_data: Dict[str, Any],
+    capabilities: PeerCapabilities = None,
+    compress_threshold: int = 512,
+) -> str:
+    """按对端能力编码消息
+
+    Parameters
+    ----------
+    message_data : Dict[str, Any]
+        完整字段名的消息
+    capabilities : PeerCapabilities
+        对端能力，None 时按旧版本编码
+    compress_threshold : int
+        超过该长度（字符）才尝试压缩
+
+    Returns
+    -------
+    str
+        文本帧
+    """
+    capabilities = capabilities or PeerCapabilities()
+    if capabilities.version < 2:
+        return json.dumps(message_data, ensure_ascii=False)
+
+    envelope: Dict[str, Any] = {"v": PROTOCOL_VERSION}
+    extra = {}
+    for key, value in message_data.items():
+        if key == "raw" and not capabilities.want_raw:
+            continue
+        if value is None or value == [] or value == {}:
+            continue
+        short = _FIELDS.get(key)
+        if short is None:
+            extra[key] = value
+        else:
+            envelope[short] = value
+    if extra:
+        envelope["o"] = extra
+
+    frame = json.dumps(envelope, ensure_ascii=False, separators=(",", ":"))
+    if capabilities.compression and len(frame) > compress_threshold:
+        compressed = COMPRESSED_PREFIX + base64.b64encode(
+            zlib.compress(frame.encode("utf-8"))
+        ).decode("ascii")
+        if len(compressed) < len(frame):
+            return compressed
+    return frame
+
+
+def encode_batch(frames: List[str]) -> str:
+    """把多个已编码的帧合并为一个批量帧（JSON 与 base64 中都不含换行）"""
+    if len(frames) == 1:
+        return frames[0]
+    return BATCH_PREFIX + "\n".join(frames)
+
+
+def decode_frames(frame: Any) -> List[Any]:
+    """解码单个帧或批量帧，按发送顺序返回消息列表"""
+    if isinstance(frame, bytes):
+        frame = frame.decode("utf-8")
+    if isinstance(frame, str) and frame.startswith(BATCH_PREFIX):
+        return [decode(item) for item in frame[len(BATCH_PREFIX):].split("\n")]
+    return [decode(frame)]
+
+
+def decode(frame: Any) -> Any:
+    """解码任意版本的帧，v2 会还原为完整字段名的消息"""
+    if isinstance(frame, bytes):
+        frame = frame.decode("utf-8")
+    if not isinstance(frame, str):
+        return frame
+
+    if frame.startswith(COMPRESSED_PREFIX):
+        frame = zlib.decompress(base64.b64decode(frame[len(COMPRESSED_PREFIX):])).decode(
+            "utf-8"
+        )
+
+    data = json.loads(frame)
+    if not isinstance(data, dict) or data.get("v") != PROTOCOL_VERSION or "type" in data:
+        return data
+
+    message_data = dict(data.get("o", {}))
+    for short, value in data.items():
+        full = _REVERSE_FIELDS.get(short)
+        if full is not None:
+            message_data[full] = value
+    return message_data
@@ -0,0 +1,201 @@
+"""桥接 RPC
+
+服务器之间的内部查询（如合并在线玩家列表）通过 RPC 控制帧完成：
+请求带关联 id 发给所有已知支持 RPC 的对端，各对端的处理函数返回结构化结果，
+所有对端都回复（或断开）后立即返回，超时只是上限。
+本模块只负责关联与等待，实际的收发由 :class:`BridgeConnector` 提供。
+"""
+
+import asyncio
+import threading
+import uuid
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Set
+
+from gugubot.ws import bridge_codec
+
+RpcHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class _PendingCall:
+    """一次进行中的请求"""
+
+    def __init__(self) -> None:
+        self.expected: Set[Hashable] = set()
+        self.results: Dict[Hashable, Any] = {}
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    def resolve(self, peer: Hashable, result: Any) -> None:
+        if peer not in self.expected:
+            return
+        self.expected.discard(peer)
+        self.results[peer] = result
+        self.check_done()
+
+    def drop(self, peer: Hashable) -> None:
+        self.expected.discard(peer)
+        self.check_done()
+
+    def check_done(self) -> None:
+        if not self.expected and not self.future.done():
+            self.future.set_result(None)
+
+
+class BridgeRpc:
+    """RPC 请求关联与对端记录。
+
+    对端的增删可以在传输线程中进行，请求的发起与响应的处理在事件循环中进行。
+
+    Parameters
+    ----------
+    logger : Any
+        日志记录器
+    """
+
+    def __init__(self, logger: Any = None) -> None:
+        self.logger = logger
+        self._handlers: Dict[str, RpcHandler] = {}
+        self._peers: Set[Hashable] = set()
+        self._pending: Dict[str, _PendingCall] = {}
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    # ------------------------------------------------------------------
+    # 对端
+    # ------------------------------------------------------------------
+
+    def add_peer(self, peer: Hashable) -> None:
+        with self._lock:
+            self._peers.add(peer)
+
+    def remove_peer(self, peer: Hashable) -> None:
+        """对端断开，进行中的请求不再等待它（需在事件循环中调用）"""
+        with self._lock:
+            self._peers.discard(peer)
+            pending = list(self._pending.values())
+        for call in pending:
+            call.drop(peer)
+
+    def peers(self) -> Set[Hashable]:
+        with self._lock:
+            return set(self._peers)
+
+    # ------------------------------------------------------------------
+    # 请求与响应
+    # ------------------------------------------------------------------
+
+    def register(self, method: str, handler: RpcHandler) -> None:
+        """注册处理函数，处理函数接收 params 并返回可 JSON 序列化的结果"""
+        self._handlers[method] = handler
+
+    async def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]],
+        send: Callable[[Hashable, Dict[str, Any]], bool],
+        peers: Optional[Iterable[Hashable]] = None,
+        timeout: float = 3,
+    ) -> Dict[Hashable, Any]:
+        """向对端发起请求并等待回复
+
+        Parameters
+        ----------
+        method : str
+            方法名
+        params : Optional[Dict[str, Any]]
+            参数
+        send : Callable[[Hashable, Dict[str, Any]], bool]
+            向指定对端发送控制帧，返回是否发送成功
+        peers : Optional[Iterable[Hashable]]
+            目标对端，缺省为所有已知对端
+        timeout : float
+            最长等待时间（秒）
+
+        Returns
+        -------
+        Dict[Hashable, Any]
+            已回复的对端 -> 结果，出错或超时未回复的对端不在其中
+        """
+        call_id = uuid.uuid4().hex
+        call = _PendingCall()
+        self._pending[call_id] = call
+        self.requests += 1
+        try:
+            frame = bridge_codec.make_rpc_request(call_id, method, params)
+            for peer in self.peers() if peers is None else peers:
+                # 先登记再发送，避免回复早于登记
+                call.expected.add(peer)
+                if not send(peer, frame):
+                    call.expected.discard(peer)
+            call.check_done()
+
+            try:
+                await asyncio.wait_for(asyncio.shield(call.future), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                if self.logger:
+                    self.logger.debug(
+                        f"RPC {method} 超时，未回复: {sorted(map(str, call.expected))}"
+                    )
+            return dict(call.results)
+        finally:
+            self._pending.pop(call_id, None)
+
+    async def handle(
+        self,
+        peer: Hashable,
+        message: Dict[str, Any],
+        reply: Callable[[Dict[str, Any]], bool],
+    ) -> None:
+        """处理收到的 RPC 控制帧
+
+        Parameters
+        ----------
+        peer : Hashable
+            发送方
+        message : Dict[str, Any]
+            RPC 控制帧
+        reply : Callable[[Dict[str, Any]], bool]
+            向发送方回复控制帧
+        """
+        call_id = message.get("id")
+        if message.get("kind") == "response":
+            call = self._pending.get(call_id)
+            if call is None:
+                return
+            if "error" in message:
+                self.errors += 1
+                if self.logger:
+                    self.logger.warning(f"RPC 对端 {peer} 返回错误: {message['error']}")
+                call.drop(peer)
+            else:
+                call.resolve(peer, message.get("result"))
+            return
+
+        handler = self._handlers.get(message.get("method"))
+        if handler is None:
+            reply(
+                bridge_codec.make_rpc_response(
+                    call_id, error=f"unknown method {message.get('method')!r}"
+                )
+            )
+            return
+        try:
+            result = await handler(message.get("params") or {})
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"RPC {message.get('method')} 处理失败: {e}")
+            reply(bridge_codec.make_rpc_response(call_id, error=str(e)))
+            return
+        reply(bridge_codec.make_rpc_response(call_id, result))
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "peers": len(self._peers),
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
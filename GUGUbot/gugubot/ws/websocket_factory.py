@@ -136,6 +136,13 @@ class WebSocketFactory:
         port = config.get_keys(
             ["connector", "minecraft_bridge", "connection", "port"], 8787
         )
+        send_queue_size = config.get_keys(
+            ["connector", "minecraft_bridge", "connection", "send_queue_size"], 256
+        )
+        overflow_policy = config.get_keys(
+            ["connector", "minecraft_bridge", "connection", "overflow_policy"],
+            "drop_oldest",
+        )
 
         return WebSocketServer(
             host=host,
@@ -144,6 +151,8 @@ class WebSocketFactory:
             on_client_connect=on_client_connect,
             on_client_disconnect=on_client_disconnect,
             logger=logger,
+            send_queue_size=send_queue_size,
+            overflow_policy=overflow_policy,
         )
 
     @staticmethod
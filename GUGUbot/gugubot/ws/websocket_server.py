@@ -8,13 +8,135 @@ import json
 import logging
 import traceback
 import threading
-from typing import Any, Optional, Callable, Dict, List
+import time
+from collections import deque
+from typing import Any, Optional, Callable, Dict, List, Tuple
 
 try:
     from websocket_server import WebsocketServer
 except ImportError:
     WebsocketServer = None
 
+from .bridge_codec import encode_batch
+
+
+class _ClientOutbox:
+    """单个客户端的有界发送队列与发送线程
+
+    队列满时普通消息按溢出策略丢弃（drop_oldest 丢弃最旧的普通消息，
+    drop_newest 丢弃新消息），控制帧永不丢弃。
+
+    开启合并后，距上次发送不足一个窗口时会等待窗口结束，
+    把期间入队的消息合并为一个批量帧发送；空闲时仍立即发送。
+    """
+
+    POLICIES = ("drop_oldest", "drop_newest")
+
+    def __init__(
+        self,
+        server: "WebSocketServer",
+        client: Dict,
+        max_size: int = 256,
+        policy: str = "drop_oldest",
+    ) -> None:
+        self.server = server
+        self.client = client
+        self.max_size = max(1, int(max_size))
+        self.policy = policy if policy in self.POLICIES else "drop_oldest"
+
+        self._queue: deque = deque()  # (消息, 是否控制帧)
+        self._cond = threading.Condition()
+        self._closed = False
+
+        self.batch_window = 0.0
+        self.batch_size = 1
+        self._last_send = 0.0
+
+        self.sent = 0
+        self.frames = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"WebSocketServerSender_{client.get('id')}",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def put(self, message: str, control: bool = False) -> bool:
+        """放入一条消息，被丢弃时返回 False"""
+        with self._cond:
+            if self._closed:
+                return False
+
+            if not control and len(self._queue) >= self.max_size:
+                if self.policy == "drop_newest" or not self._drop_oldest_chat():
+                    self.dropped += 1
+                    return False
+                self.dropped += 1
+
+            self._queue.append((message, control))
+            if len(self._queue) > self.max_depth:
+                self.max_depth = len(self._queue)
+            self._cond.notify()
+            return True
+
+    def _drop_oldest_chat(self) -> bool:
+        for index, (_, control) in enumerate(self._queue):
+            if not control:
+                del self._queue[index]
+                return True
+        return False
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                messages = [self._queue.popleft()[0]]
+
+                deadline = self._last_send + self.batch_window
+                while len(messages) < self.batch_size:
+                    if self._queue:
+                        messages.append(self._queue.popleft()[0])
+                        continue
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._cond.wait(remaining)
+
+            try:
+                self.server.server.send_message(self.client, encode_batch(messages))
+                self._last_send = time.monotonic()
+                self.sent += len(messages)
+                self.frames += 1
+            except Exception as e:
+                self.server.logger.error(f"向 {self.client.get('address')} 发送消息失败: {e}")
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """停止发送线程，timeout 不为 None 时等待队列发送完毕"""
+        with self._cond:
+            self._closed = True
+            if timeout is None:
+                self._queue.clear()
+            self._cond.notify()
+        if timeout is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def get_metrics(self) -> Dict[str, int]:
+        with self._cond:
+            depth = len(self._queue)
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "frames": self.frames,
+            "dropped": self.dropped,
+        }
+
 
 class WebSocketServer:
     """WebSocket服务器类
@@ -36,6 +158,9 @@ class WebSocketServer:
         日志记录器
     clients : List[Dict]
         已连接的客户端列表
+
+    每个客户端有独立的有界发送队列和发送线程，接收线程只负责入队，
+    慢速或半断开的客户端不会阻塞其他客户端和后续消息的接收。
     """
 
     def __init__(
@@ -46,6 +171,8 @@ class WebSocketServer:
         on_client_connect: Optional[Callable] = None,
         on_client_disconnect: Optional[Callable] = None,
         logger: Optional[logging.Logger] = None,
+        send_queue_size: int = 256,
+        overflow_policy: str = "drop_oldest",
     ):
         """初始化WebSocket服务器
 
@@ -63,6 +190,11 @@ class WebSocketServer:
             客户端断开回调函数，签名: (client, server)
         logger : Optional[logging.Logger]
             日志记录器
+        send_queue_size : int
+            每个客户端发送队列的最大长度，默认 256
+        overflow_policy : str
+            队列满时的策略：drop_oldest（丢弃最旧消息）或 drop_newest（丢弃新消息），
+            控制帧永不丢弃
         """
         if WebsocketServer is None:
             raise ImportError(
@@ -77,6 +209,11 @@ class WebSocketServer:
         self.clients: List[Dict] = []
         self._is_running = False
 
+        self.send_queue_size = send_queue_size
+        self.overflow_policy = overflow_policy
+        self._outboxes: Dict[Any, _ClientOutbox] = {}  # client id -> 发送队列
+        self._outbox_lock = threading.Lock()
+
         # 回调函数
         self._on_message_callback = on_message
         self._on_client_connect_callback = on_client_connect
@@ -93,6 +230,10 @@ class WebSocketServer:
             服务器实例
         """
         self.clients.append(client)
+        with self._outbox_lock:
+            self._outboxes[client["id"]] = _ClientOutbox(
+                self, client, self.send_queue_size, self.overflow_policy
+            )
         self.logger.info(f"新客户端连接: {client['address']}")
 
         if self._on_client_connect_callback:
@@ -113,6 +254,11 @@ class WebSocketServer:
         """
         if client in self.clients:
             self.clients.remove(client)
+        if client:
+            with self._outbox_lock:
+                outbox = self._outboxes.pop(client.get("id"), None)
+            if outbox:
+                outbox.close()
         client_address = client.get("address") if client else "unknown"
         self.logger.info(f"客户端断开: {client_address}")
 
@@ -212,6 +358,13 @@ class WebSocketServer:
                 if client_count > 0:
                     self.logger.info(f"正在断开 {client_count} 个客户端...")
 
+                    # 丢弃未发送的消息，避免关闭通知排在积压消息之后
+                    with self._outbox_lock:
+                        outboxes = list(self._outboxes.values())
+                        self._outboxes.clear()
+                    for outbox in outboxes:
+                        outbox.close()
+
                     # 通知所有客户端服务器即将关闭
                     for client in self.clients.copy():
                         try:
@@ -256,8 +409,26 @@ class WebSocketServer:
             self.logger.error(f"停止WebSocket服务器时出错: {error_msg}")
             raise
 
-    def send_message(self, client: Dict, message: Any) -> bool:
-        """向指定客户端发送消息
+    @staticmethod
+    def _encode(message: Any) -> Tuple[str, bool]:
+        """序列化消息，并判断是否为控制帧（带 type 字段的字典）"""
+        control = isinstance(message, dict) and "type" in message
+        if isinstance(message, (dict, list)):
+            message = json.dumps(message, ensure_ascii=False)
+        return message, control
+
+    def _enqueue(self, client: Dict, message: str, control: bool) -> bool:
+        with self._outbox_lock:
+            outbox = self._outboxes.get(client.get("id"))
+        if outbox is None:
+            return False
+        if not outbox.put(message, control):
+            self.logger.debug(f"{client.get('address')} 发送队列已满，丢弃消息")
+            return False
+        return True
+
+    def send_message(self, client: Dict, message: Any, control: Optional[bool] = None) -> bool:
+        """向指定客户端发送消息（放入该客户端的发送队列）
 
         Parameters
         ----------
@@ -265,52 +436,69 @@ class WebSocketServer:
             客户端信息字典
         message : Any
             要发送的消息（会自动转换为JSON字符串）
+        control : Optional[bool]
+            是否为控制帧（永不丢弃），默认根据消息是否带 type 字段判断
 
         Returns
         -------
         bool
-            是否发送成功
+            是否成功入队
         """
         if not self._is_running or not self.server:
             self.logger.warning("服务器未运行，无法发送消息")
             return False
 
         try:
-            if isinstance(message, (dict, list)):
-                message = json.dumps(message, ensure_ascii=False)
+            message, is_control = self._encode(message)
+            if control is None:
+                control = is_control
 
-            self.server.send_message(client, message)
+            result = self._enqueue(client, message, control)
             self.logger.debug(f"向 {client['address']} 发送消息: {message}")
-            return True
+            return result
 
         except Exception as e:
             error_msg = str(e) + "\n" + traceback.format_exc()
             self.logger.error(f"发送消息失败: {error_msg}")
             return False
 
-    def broadcast(self, message: Any) -> int:
+    def broadcast(
+        self, message: Any, exclude: Optional[Dict] = None, control: Optional[bool] = None
+    ) -> int:
         """向所有已连接的客户端广播消息
 
+        消息只序列化一次，然后放入各客户端的发送队列。
+
         Parameters
         ----------
         message : Any
             要广播的消息（会自动转换为JSON字符串）
+        exclude : Optional[Dict]
+            不发送的客户端（如消息来源）
+        control : Optional[bool]
+            是否为控制帧（永不丢弃），默认根据消息是否带 type 字段判断
 
         Returns
         -------
         int
-            成功发送的客户端数量
+            成功入队的客户端数量
         """
         if not self._is_running or not self.server:
             self.logger.warning("服务器未运行，无法广播消息")
             return 0
 
         try:
-            if isinstance(message, (dict, list)):
-                message = json.dumps(message, ensure_ascii=False)
-
-            self.server.send_message_to_all(message)
-            count = len(self.clients)
+            message, is_control = self._encode(message)
+            if control is None:
+                control = is_control
+
+            exclude_id = exclude.get("id") if exclude else None
+            count = 0
+            for client in self.clients.copy():
+                if client.get("id") == exclude_id:
+                    continue
+                if self._enqueue(client, message, control):
+                    count += 1
             self.logger.debug(f"向 {count} 个客户端广播消息: {message}")
             return count
 
@@ -319,6 +507,40 @@ class WebSocketServer:
             self.logger.error(f"广播消息失败: {error_msg}")
             return 0
 
+    def set_client_batching(self, client: Dict, window: float, max_size: int) -> None:
+        """为对端支持批量帧的客户端开启合并发送
+
+        Parameters
+        ----------
+        client : Dict
+            客户端信息字典
+        window : float
+            合并窗口（秒）
+        max_size : int
+            单个批量帧最多包含的消息数
+        """
+        with self._outbox_lock:
+            outbox = self._outboxes.get(client.get("id"))
+        if outbox is None:
+            return
+        with outbox._cond:
+            outbox.batch_window = max(0.0, window)
+            outbox.batch_size = max(1, int(max_size))
+
+    def get_queue_metrics(self) -> Dict[str, Dict[str, int]]:
+        """获取各客户端发送队列的统计信息
+
+        Returns
+        -------
+        Dict[str, Dict[str, int]]
+            客户端地址 -> {depth, max_depth, sent, frames, dropped}
+        """
+        with self._outbox_lock:
+            outboxes = list(self._outboxes.values())
+        return {
+            f"{outbox.client.get('address')}": outbox.get_metrics() for outbox in outboxes
+        }
+
     def is_running(self) -> bool:
         """检查服务器是否正在运行
 
@@ -1,7 +1,12 @@
+import tempfile
+import time
 import unittest
 
+from pathlib import Path
+
 from gugubot.config.BasicConfig import BasicConfig
-from gugubot.config.BotConfig import BotConfig
+from gugubot.config.BotConfig import BotConfig, ConfigSnapshot
+from gugubot.config.pattern_registry import PatternGroup, PatternRegistry, can_combine
 
 class TestBasicConfig(unittest.TestCase):
     @classmethod
@@ -54,6 +59,66 @@ class TestBasicConfig(unittest.TestCase):
 
         config.path.unlink()
 
+    def test_batch(self):
+        # Test batch writes only once on exit
+        config = BasicConfig()
+        with config.batch():
+            config["a"] = 1
+            config["b"] = 2
+            self.assertEqual(config.path.read_text(encoding='UTF-8'), '{}')
+        self.assertEqual(config.path.read_text(encoding='UTF-8'), '{"a": 1, "b": 2}')
+
+        config.path.unlink()
+
+    def test_write_behind(self):
+        # Test delayed saving and flush
+        config = BasicConfig(save_delay=60)
+        config.flush()
+        config["key"] = "value"
+        self.assertEqual(config.path.read_text(encoding='UTF-8'), '{}')
+
+        BasicConfig.flush_all()
+        self.assertEqual(config.path.read_text(encoding='UTF-8'), '{"key": "value"}')
+
+        config.path.unlink()
+
+    def test_write_behind_snapshot(self):
+        # Test the worker writes the data as of the last save, not the live dict
+        config = BasicConfig(save_delay=0.05)
+        config.flush()
+        config["items"] = [1]
+        config["items"].append(2)  # changed without save()
+
+        time.sleep(0.2)
+        self.assertEqual(config.path.read_text(encoding='UTF-8'), '{"items": [1]}')
+        self.assertIsNone(config._worker)
+
+        config.path.unlink()
+
+    def test_write_behind_retry(self):
+        # Test a failed background write stays pending for retry and flush_all
+        config = BasicConfig(save_delay=0.05)
+        config.flush()
+        write = config._write
+        failures = []
+
+        def failing_write(data):
+            failures.append(data)
+            raise OSError("disk full")
+
+        config._write = failing_write
+        config["key"] = "value"
+        time.sleep(0.2)
+        self.assertTrue(failures)
+        self.assertIn(id(config), BasicConfig._pending_stores)
+
+        config._write = write
+        BasicConfig.flush_all()
+        self.assertEqual(config.path.read_text(encoding='UTF-8'), '{"key": "value"}')
+        self.assertNotIn(id(config), BasicConfig._pending_stores)
+
+        config.path.unlink()
+
 class TestBotConfig(unittest.TestCase):
     @classmethod
     def setUpClass(self):
@@ -95,4 +160,119 @@ class TestBotConfig(unittest.TestCase):
         config.plugin_check()
         self.assertEqual(config["admin_group_id"], [1, 2])
 
-        config.path.unlink()
\ No newline at end of file
+        config.path.unlink()
+
+    def test_snapshot_from_config(self):
+        permissions = {
+            "admin_ids": [1, None],
+            "admin_group_ids": [30],
+            "group_ids": [20, 10],
+        }
+        config = _FakeConfig({
+            "GUGUBot": {"command_prefix": "!"},
+            "connector": {"QQ": {
+                "permissions": permissions,
+                "chat_templates": ["{name}: {msg}", {"[{name}] {msg}": 3}],
+            }},
+        })
+
+        snapshot = ConfigSnapshot.from_config(config)
+        self.assertEqual(snapshot.command_prefix, "!")
+        self.assertEqual(snapshot.admin_ids, frozenset({"1"}))
+        # 未配置 forward_group_ids 时回退为 group_ids
+        self.assertEqual(snapshot.forward_group_ids, ("10", "20"))
+        self.assertEqual(snapshot.valid_source_ids, frozenset({"1", "10", "20", "30"}))
+        self.assertEqual(snapshot.chat_templates, ("{name}: {msg}", "[{name}] {msg}"))
+        self.assertEqual(snapshot.chat_template_weights, (1, 3))
+
+        permissions["forward_group_ids"] = [20, None]
+        snapshot = ConfigSnapshot.from_config(config)
+        self.assertEqual(snapshot.forward_group_ids, ("20",))
+        self.assertEqual(snapshot.group_ids, frozenset({"10", "20"}))
+
+    def test_snapshot_refresh(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "config.yml"
+            config = BotConfig(path=str(path))
+            self.assertEqual(config.snapshot.command_prefix, "#")
+
+            config["GUGUBot"] = {"command_prefix": "!"}
+            self.assertEqual(config.snapshot.command_prefix, "!")
+
+            # 直接修改嵌套配置时快照不变，save() 后刷新
+            config["GUGUBot"]["command_prefix"] = "?"
+            self.assertEqual(config.snapshot.command_prefix, "!")
+            config.save()
+            self.assertEqual(config.snapshot.command_prefix, "?")
+
+            # 重新加载时按文件内容构建快照
+            self.assertEqual(BotConfig(path=str(path)).snapshot.command_prefix, "?")
+
+
+class _FakeConfig(dict):
+    """只提供 get_keys / snapshot / logger 的配置替身"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.snapshot = object()
+        self.logger = None
+
+    def get_keys(self, keys, default=None):
+        value = self
+        for key in keys:
+            if not isinstance(value, dict) or key not in value:
+                return default
+            value = value[key]
+        return value
+
+
+class TestPatternRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(self):
+        print("\n** Testing Config PatternRegistry **")
+
+    def test_group(self):
+        group = PatternGroup(["!!.*", r".*?\[Command: /.*\]", "(["])
+        self.assertEqual(len(group), 2)
+        self.assertEqual(group.invalid[0][0], "([")
+        self.assertTrue(group.match("!!MCDR status"))
+        self.assertTrue(group.match("Steve [Command: /tp]"))
+        self.assertFalse(group.match("hello !!"))
+
+    def test_prefilter(self):
+        group = PatternGroup([r"(\w+) joined the game", r"(\w+) left the game"])
+        self.assertEqual(set(group.literals), {" joined the game", " left the game"})
+        self.assertFalse(group.search("Preparing spawn area"))
+        self.assertEqual(group.first_search("Alex left the game").group(1), "Alex")
+
+    def test_can_combine(self):
+        self.assertTrue(can_combine(r"(\w+) joined the game"))
+        self.assertFalse(can_combine(r"(\w)\1"))
+        self.assertFalse(can_combine(r"(?P<c>\w)(?P=c)"))
+        self.assertFalse(can_combine(r"(<)?\w+(?(1)>)"))
+        self.assertFalse(can_combine(r"(?P<q>\")?\w+(?(q)\")"))
+
+        # 含条件分组时逐个匹配，分组编号不受其它模式影响
+        group = PatternGroup([r"(x)y", r"(<)?(\w+)(?(1)>)"])
+        self.assertTrue(group.match("<Steve>"))
+        self.assertTrue(group.match("Steve"))
+        self.assertFalse(group.match("<Steve"))
+
+    def test_reload_on_snapshot_change(self):
+        config = _FakeConfig({"connector": {"minecraft": {"bot_names_pattern": ["^bot_"]}}})
+        registry = PatternRegistry(config)
+        group = registry.get("bot_names")
+        self.assertTrue(group.match("BOT_1"))
+        self.assertIs(registry.get("bot_names"), group)
+
+        config["connector"]["minecraft"]["bot_names_pattern"] = ["^fake_"]
+        config.snapshot = object()
+        self.assertFalse(registry.get("bot_names").match("bot_1"))
+        self.assertTrue(registry.get("bot_names").match("fake_1"))
+        self.assertEqual(registry.version, 2)
+
+    def test_single_string_pattern(self):
+        config = _FakeConfig({"system": {"bound": {"player_name_pattern": "^[A-Za-z0-9_]{3,16}$"}}})
+        registry = PatternRegistry(config)
+        self.assertTrue(registry.get("bound_player_name").match("Steve"))
+        self.assertFalse(registry.get("bound_player_name").match("a"))
@@ -0,0 +1,1101 @@
+"""工具模块测试
+
+测试命令前缀树、命令解析、多模式匹配、异步运行时、发送调度与聊天模板
+"""
+import asyncio
+import http.server
+import importlib.util
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import unittest
+
+from pathlib import Path
+from types import SimpleNamespace
+
+from gugubot.config.pattern_registry import PatternGroup
+from gugubot.connector.connector_manager import ConnectorManager
+from gugubot.logic.plugins.inactive_check import InactiveCheckSystem
+from gugubot.logic.plugins.player_notice import PlayerEventMatcher
+from gugubot.logic.system.basic_system import BasicSystem
+from gugubot.logic.system.system_manager import SystemManager
+from gugubot.utils.admin_cache import AdminGroupCache
+from gugubot.utils.async_runtime import AsyncRuntime
+from gugubot.utils.chat_template import AliasSampler, ChatTemplateSet
+from gugubot.utils.command_trie import CommandTrie
+from gugubot.utils.group_members import GroupMemberService
+from gugubot.utils.send_scheduler import SendScheduler
+from gugubot.utils.text_matcher import AhoCorasick, KeywordMatcher
+from gugubot.utils.http_client import HttpClient
+from gugubot.utils.online_roster import OnlineRoster
+from gugubot.utils.player_manager import PlayerManager
+from gugubot.utils.rcon_manager import (
+    CircuitBreaker,
+    RconManager,
+    RconTimeoutError,
+    RconUnavailableError,
+)
+from gugubot.utils.ttl_cache import TTLCache
+from gugubot.utils.unbound_tracker import UnboundTracker
+from gugubot.utils.types import BoardcastInfo
+from gugubot.utils.types.parsed_command import ParsedCommand
+
+
+class TestCommandTrie(unittest.TestCase):
+    """测试命令前缀树"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils CommandTrie **")
+
+    def test_longest_prefix(self):
+        trie = CommandTrie()
+        trie.insert("绑定", "bound")
+        trie.insert("绑定提醒", "bound_notice")
+        self.assertEqual(len(trie), 2)
+
+        self.assertEqual(trie.longest_prefix("绑定 Steve"), ("绑定", "bound"))
+        self.assertEqual(trie.longest_prefix("绑定提醒 开"), ("绑定提醒", "bound_notice"))
+        self.assertIsNone(trie.longest_prefix("解绑"))
+        self.assertIsNone(trie.longest_prefix(""))
+
+    def test_first_insert_wins(self):
+        trie = CommandTrie()
+        trie.insert("检查", "unbound_check")
+        trie.insert("检查", "inactive_check")
+        self.assertEqual(trie.longest_prefix("检查"), ("检查", "unbound_check"))
+        self.assertEqual(len(trie), 1)
+
+
+class TestParsedCommand(unittest.TestCase):
+    """测试命令解析"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils ParsedCommand **")
+
+    def test_parse(self):
+        command = ParsedCommand.parse("#绑定 Steve 基岩", "#", "绑定", "bound")
+        self.assertEqual(command.body, "绑定 Steve 基岩")
+        self.assertEqual(command.rest, "Steve 基岩")
+        self.assertEqual(command.system, "bound")
+
+    def test_parse_without_keyword(self):
+        command = ParsedCommand.parse("#  执行 list", "#")
+        self.assertEqual(command.body, "执行 list")
+        self.assertIsNone(command.keyword)
+        self.assertEqual(command.rest, "执行 list")
+
+
+class _RecordingSystem(BasicSystem):
+    """记录处理顺序的测试系统"""
+
+    def __init__(self, name, calls, keywords=(), handles=False):
+        super().__init__(name)
+        self.calls = calls
+        self.keywords = list(keywords)
+        self.handles = handles
+
+    def get_command_keywords(self):
+        return self.keywords
+
+    async def process_boardcast_info(self, boardcast_info):
+        self.calls.append(self.name)
+        return self.handles
+
+
+class _PrefilterSystem(_RecordingSystem):
+    subscriptions = (("message", "*"),)
+    command_order = 1
+
+
+class _EchoLikeSystem(_RecordingSystem):
+    subscriptions = (("message", "*"),)
+    command_order = -1
+
+
+class _NoticeSystem(_RecordingSystem):
+    subscriptions = (("notice", "group_increase"),)
+
+
+class _CommandOnlySystem(_RecordingSystem):
+    subscriptions = ()
+
+
+class _QQOnlySystem(_RecordingSystem):
+    subscriptions = (("message", "*"),)
+    subscribed_sources = ("QQ",)
+
+
+class TestSystemManager(unittest.TestCase):
+    """测试系统管理器的命令路由"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils SystemManager **")
+
+    @staticmethod
+    def _message(text, source=None):
+        return BoardcastInfo(
+            event_type="message",
+            event_sub_type="group",
+            message=[{"type": "text", "data": {"text": text}}],
+            raw=None,
+            _source=source,
+        )
+
+    def _build(self, systems):
+        manager = SystemManager(server=None, logger=logging.getLogger("test_system_manager"))
+        for system in systems:
+            manager.register_system(system)
+        return manager
+
+    def test_owner_declines_falls_back_before_echo(self):
+        calls = []
+        manager = self._build([
+            _RecordingSystem("fallback", calls, handles=True),
+            _PrefilterSystem("ban_words", calls),
+            _RecordingSystem("owner", calls, keywords=["绑定"]),
+            _EchoLikeSystem("echo", calls, handles=True),
+        ])
+
+        result = asyncio.run(manager.broadcast_command(self._message("#绑定 Steve")))
+
+        self.assertTrue(result)
+        self.assertEqual(calls, ["owner", "ban_words", "fallback"])
+
+    def test_unhandled_command_reaches_echo_last(self):
+        calls = []
+        manager = self._build([
+            _EchoLikeSystem("echo", calls, handles=True),
+            _RecordingSystem("owner", calls, keywords=["绑定"]),
+            _RecordingSystem("other", calls),
+        ])
+
+        asyncio.run(manager.broadcast_command(self._message("#绑定 Steve")))
+
+        self.assertEqual(calls, ["owner", "other", "echo"])
+
+    def test_dispatch_by_subscription(self):
+        calls = []
+        command_only = _CommandOnlySystem("command_only", calls)
+        notice = _NoticeSystem("notice", calls)
+        qq_only = _QQOnlySystem("qq_only", calls)
+        catch_all = _RecordingSystem("catch_all", calls)
+        manager = self._build([command_only, notice, qq_only, catch_all])
+
+        join = BoardcastInfo(
+            event_type="notice", event_sub_type="group_increase", message=[], raw=None
+        )
+        self.assertEqual(manager.get_dispatch_targets(join), [notice, catch_all])
+        self.assertEqual(
+            manager.get_dispatch_targets(self._message("hi", "QQ")), [qq_only, catch_all]
+        )
+        # 来源限制只作用于非命令事件
+        self.assertEqual(
+            manager.get_dispatch_targets(self._message("hi", "Minecraft")), [catch_all]
+        )
+        self.assertEqual(
+            manager.get_dispatch_targets(self._message("#hi", "Minecraft")),
+            [command_only, notice, qq_only, catch_all],
+        )
+
+    def test_dispatch_table_cache(self):
+        calls = []
+        notice = _NoticeSystem("notice", calls)
+        manager = self._build([notice])
+
+        join = BoardcastInfo(
+            event_type="notice", event_sub_type="group_increase", message=[], raw=None
+        )
+        manager.get_dispatch_targets(join)
+        self.assertEqual(
+            manager._dispatch_table[("notice", "group_increase", False)], (notice,)
+        )
+
+        # 注册或移除系统后分发表重建
+        catch_all = _RecordingSystem("catch_all", calls)
+        manager.register_system(catch_all)
+        self.assertEqual(manager._dispatch_table, {})
+        self.assertEqual(manager.get_dispatch_targets(join), [notice, catch_all])
+
+        manager.remove_system("notice")
+        self.assertEqual(manager.get_dispatch_targets(join), [catch_all])
+
+
+class TestAhoCorasick(unittest.TestCase):
+    """测试 Aho–Corasick 自动机"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils AhoCorasick **")
+
+    def test_iter_matches(self):
+        matcher = AhoCorasick()
+        for word in ["he", "she", "his", "hers"]:
+            matcher.add(word, word.upper())
+
+        matches = sorted((start, word) for start, word, _ in matcher.iter_matches("ushers"))
+        self.assertEqual(matches, [(1, "she"), (2, "he"), (2, "hers")])
+        self.assertEqual(matcher.find_first("ushers"), ("she", "SHE"))
+        self.assertIsNone(matcher.find_first("xyz"))
+
+    def test_add_and_remove(self):
+        matcher = AhoCorasick()
+        matcher.rebuild({"坏词": "理由"})
+        self.assertEqual(matcher.find_first("这是坏词"), ("坏词", "理由"))
+
+        matcher.add("脏话", "理由2")
+        self.assertEqual(matcher.find_first("说脏话"), ("脏话", "理由2"))
+
+        self.assertTrue(matcher.remove("坏词"))
+        self.assertIsNone(matcher.find_first("这是坏词"))
+        self.assertEqual(len(matcher), 1)
+
+    def test_normalize(self):
+        matcher = AhoCorasick(ignore_case=True, normalize_width=True)
+        matcher.add("abc", 1)
+        self.assertEqual(matcher.find_first("xＡＢＣx"), ("abc", 1))
+        self.assertIsNone(AhoCorasick().find_first("ABC"))
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    """测试关键词触发器匹配"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils KeywordMatcher **")
+
+    def test_trigger_types(self):
+        matcher = KeywordMatcher()
+        matcher.rebuild(["你好", "prefix:签到", "contains:地图", r"re:^第\d+天$"])
+        self.assertEqual(len(matcher), 4)
+
+        self.assertEqual(matcher.match("你好"), "你好")
+        self.assertIsNone(matcher.match("你好呀"))
+        self.assertEqual(matcher.match("签到 今天"), "prefix:签到")
+        self.assertEqual(matcher.match("服务器地图在哪"), "contains:地图")
+        self.assertEqual(matcher.match("第12天"), r"re:^第\d+天$")
+        self.assertIsNone(matcher.match("第十二天"))
+
+    def test_priority(self):
+        matcher = KeywordMatcher()
+        matcher.rebuild(["contains:签到", "prefix:签", "prefix:签到", "签到"])
+        self.assertEqual(matcher.match("签到"), "签到")
+        self.assertEqual(matcher.match("签到啦"), "prefix:签到")
+        self.assertEqual(matcher.match("快签到"), "contains:签到")
+
+    def test_invalid_regex(self):
+        matcher = KeywordMatcher()
+        matcher.rebuild(["re:(", "re:a(?P<x>b)", "re:c(?P<x>d)"])
+        self.assertEqual(matcher.match("cd"), "re:c(?P<x>d)")
+        self.assertEqual(matcher.parse_trigger("re:"), ("exact", "re:"))
+
+    def test_backreference(self):
+        matcher = KeywordMatcher()
+        matcher.rebuild([r"re:(x)y", r"re:(\w)\1", r"re:(?P<c>z)-(?P=c)"])
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.match("aa"), r"re:(\w)\1")
+        self.assertEqual(matcher.match("xy"), r"re:(x)y")
+        self.assertEqual(matcher.match("z-z"), r"re:(?P<c>z)-(?P=c)")
+
+    def test_conditional_group(self):
+        matcher = KeywordMatcher()
+        matcher.rebuild([r"re:(x)y", r"re:^(<)?ok(?(1)>)$"])
+        self.assertEqual(matcher.match("<ok>"), r"re:^(<)?ok(?(1)>)$")
+        self.assertEqual(matcher.match("ok"), r"re:^(<)?ok(?(1)>)$")
+        self.assertIsNone(matcher.match("<ok"))
+        self.assertEqual(matcher.match("xy"), r"re:(x)y")
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    """测试异步运行时"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils AsyncRuntime **")
+
+    def test_submit_from_thread(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            runtime = AsyncRuntime(server=None, logger=object())
+            runtime.bind(loop)
+
+            async def add(a, b):
+                return a + b
+
+            self.assertEqual(runtime.submit(add(1, 2)).result(timeout=1), 3)
+
+            done = threading.Event()
+            runtime.call_soon(done.set)
+            self.assertTrue(done.wait(timeout=1))
+
+            metrics = runtime.get_metrics()
+            self.assertEqual(metrics["handoff_count"], 2)
+            self.assertGreaterEqual(metrics["handoff_max_ms"], 0)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=1)
+            loop.close()
+
+
+class TestSendScheduler(unittest.TestCase):
+    """测试限速发送调度"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils SendScheduler **")
+
+    def test_fifo_per_target(self):
+        sent = []
+
+        async def run():
+            scheduler = SendScheduler(
+                global_rate=0, target_rate=0, part_interval=(0, 0), max_queue_size=2
+            )
+
+            def sender(target):
+                async def send(part):
+                    await asyncio.sleep(0)
+                    sent.append((target, part))
+                return send
+
+            self.assertTrue(scheduler.enqueue("a", ["1", "2"], sender("a")))
+            self.assertTrue(scheduler.enqueue("b", ["x"], sender("b")))
+            self.assertTrue(scheduler.enqueue("a", ["3"], sender("a")))
+            self.assertFalse(scheduler.enqueue("a", ["4"], sender("a")))
+            self.assertEqual(scheduler.get_metrics()["depth"], 3)
+
+            await scheduler.drain(timeout=1)
+            return scheduler.get_metrics()
+
+        metrics = asyncio.run(run())
+        self.assertEqual([part for target, part in sent if target == "a"], ["1", "2", "3"])
+        self.assertIn(("b", "x"), sent)
+        self.assertEqual(metrics["sent"], 3)
+        self.assertEqual(metrics["dropped"], 1)
+        self.assertEqual(metrics["depth"], 0)
+
+
+class TestChatTemplate(unittest.TestCase):
+    """测试聊天模板"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils ChatTemplate **")
+
+    def test_alias_sampler(self):
+        sampler = AliasSampler([1, 0, 3])
+        rng = random.Random(0)
+        counts = [0, 0, 0]
+        for _ in range(4000):
+            counts[sampler.sample(rng)] += 1
+        self.assertEqual(counts[1], 0)
+        self.assertAlmostEqual(counts[2] / counts[0], 3, delta=0.5)
+
+    def test_render_and_extract(self):
+        templates = ChatTemplateSet(["({display_name}) {sender}: "], [1])
+        segments = templates.render_segments("生存服", "Steve")
+        self.assertEqual(segments, [{"type": "text", "data": {"text": "(生存服) Steve: "}}])
+        self.assertEqual(templates.extract_sender("(生存服) Steve: 你好"), "Steve")
+        self.assertIsNone(templates.extract_sender("普通消息"))
+
+    def test_default_template(self):
+        templates = ChatTemplateSet()
+        text = templates.render_segments("生存服", "Alex")[0]["data"]["text"]
+        self.assertEqual(text, "[生存服] Alex: ")
+        self.assertEqual(templates.extract_sender(text + "hi"), "Alex")
+
+
+class TestPlayerEventMatcher(unittest.TestCase):
+    """测试玩家进出服匹配器"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils PlayerEventMatcher **")
+
+    def setUp(self):
+        self.matcher = self._matcher(
+            [r"([^\s]+) joined the game"],
+            [r"([^\[]+)\[.*?\] left the game", r"([^\s]+) left the game"],
+        )
+
+    @staticmethod
+    def _matcher(join, left=()):
+        return PlayerEventMatcher(
+            PatternGroup(join),
+            PatternGroup(left),
+            PatternGroup([r".*bot.*"], re.IGNORECASE),
+            PatternGroup(list(join) + list(left)),
+        )
+
+    def test_prefilter_literals(self):
+        self.assertEqual(
+            set(self.matcher.event.literals),
+            {" joined the game", "] left the game", " left the game"},
+        )
+        self.assertFalse(self.matcher.may_match("Preparing spawn area: 42%"))
+
+    def test_match(self):
+        self.assertEqual(self.matcher.match("Steve joined the game"), ("Steve", None))
+        self.assertEqual(self.matcher.match("Alex[/1.2.3.4:5] left the game"), (None, "Alex"))
+        self.assertEqual(self.matcher.match("Alex left the game"), (None, "Alex"))
+        self.assertEqual(self.matcher.match("Loading chunks"), (None, None))
+
+    def test_pattern_without_literal_disables_prefilter(self):
+        matcher = self._matcher([r"(?i)(\w+) JOINED", r"(\w+) came"])
+        self.assertIsNone(matcher.event.literals)
+        self.assertEqual(matcher.match("steve joined"), ("steve", None))
+
+    def test_is_bot(self):
+        self.assertTrue(self.matcher.is_bot("FarmBot"))
+        self.assertFalse(self.matcher.is_bot("Steve"))
+
+
+
+class TestTTLCache(unittest.TestCase):
+    """测试 TTL/LRU 缓存"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils TTLCache **")
+
+    def test_lru_eviction(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)  # a 变为最近使用
+        cache.set("c", 3)
+        self.assertNotIn("b", cache)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_expiry_and_negative(self):
+        cache = TTLCache(ttl=60, negative_ttl=0.05)
+        cache.set_negative("missing")
+        self.assertEqual(cache.lookup("missing"), (True, None))
+        time.sleep(0.06)
+        self.assertEqual(cache.lookup("missing"), (False, None))
+
+        cache.set("old", 1, expires_at=time.time() - 1)
+        self.assertNotIn("old", cache)
+        cache.set("soon", 1, ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache.sweep(), 1)
+        self.assertEqual(len(cache), 0)
+
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 404 if self.path.startswith("/missing") else 200
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(importlib.util.find_spec("requests") is None, "requests 未安装")
+class TestHttpClient(unittest.TestCase):
+    """使用本地 HTTP 服务测试异步 HTTP 客户端"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils HttpClient **")
+        cls.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        threading.Thread(target=cls.httpd.serve_forever, daemon=True).start()
+        cls.base = f"http://127.0.0.1:{cls.httpd.server_port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.httpd.shutdown()
+        cls.httpd.server_close()
+
+    def test_concurrent_requests(self):
+        client = HttpClient(max_concurrency=4, host_rate=0)
+
+        async def run():
+            return await asyncio.gather(
+                *(client.get(f"{self.base}/item/{i}") for i in range(10)),
+                client.get(f"{self.base}/missing"),
+            )
+
+        try:
+            responses = asyncio.run(run())
+        finally:
+            client.close()
+
+        self.assertEqual([r.json()["path"] for r in responses[:10]], [f"/item/{i}" for i in range(10)])
+        self.assertEqual(responses[-1].status_code, 404)
+        self.assertEqual(client.get_metrics()["requests"], 11)
+
+
+
+class _FakeBot:
+    def __init__(self):
+        self.calls = []
+
+    async def get_group_member_list(self, group_id):
+        self.calls.append(group_id)
+        await asyncio.sleep(0.01)
+        return {
+            "status": "ok",
+            "data": [
+                {"user_id": group_id * 10 + i, "join_time": 100, "card": f"c{i}"}
+                for i in range(3)
+            ],
+        }
+
+
+class TestGroupMemberService(unittest.TestCase):
+    """测试群成员快照服务"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils GroupMemberService **")
+
+    def test_shared_fetch(self):
+        bot = _FakeBot()
+        service = GroupMemberService(bot, max_age=60)
+
+        async def run():
+            # 两个系统同时检查，同一个群只拉取一次
+            await asyncio.gather(
+                service.ensure_fresh([1, 2]), service.ensure_fresh(["2", 3])
+            )
+            await service.ensure_fresh([1, 2, 3])
+
+        asyncio.run(run())
+        self.assertEqual(sorted(bot.calls), [1, 2, 3])
+        self.assertEqual(service.members(1)["10"].card, "c0")
+        self.assertEqual(service.all_member_ids([1, 2]), {"10", "11", "12", "20", "21", "22"})
+
+    def test_notice(self):
+        service = GroupMemberService(_FakeBot())
+        asyncio.run(service.ensure_fresh([1]))
+        version = service.version
+
+        service.handle_notice({"notice_type": "group_increase", "group_id": 1, "user_id": 99, "time": 5})
+        service.handle_notice({"notice_type": "group_decrease", "group_id": 1, "user_id": 10})
+        self.assertFalse(service.handle_notice({"notice_type": "group_increase", "group_id": 2, "user_id": 1}))
+
+        self.assertEqual(service.members(1)["99"].join_time, 5)
+        self.assertNotIn("10", service.members(1))
+        self.assertEqual(service.groups_of(99), ["1"])
+        self.assertEqual(service.version, version + 2)
+
+
+class _FlakyBot(_FakeBot):
+    """第一次拉取失败（如 QQ 尚未连接）"""
+
+    async def get_group_member_list(self, group_id):
+        if not self.calls:
+            self.calls.append(group_id)
+            raise ConnectionError("not connected")
+        return await super().get_group_member_list(group_id)
+
+
+class TestAdminGroupCache(unittest.TestCase):
+    """测试管理群成员缓存"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils AdminGroupCache **")
+
+    def test_shared_first_load(self):
+        bot = _FakeBot()
+        service = GroupMemberService(bot)
+        cache = AdminGroupCache(ttl=60)
+
+        async def run():
+            # 管理群与其他群共用快照，同一个群只拉取一次
+            await asyncio.gather(
+                cache.ensure_fresh(service, [1]), service.ensure_fresh([1, 2])
+            )
+
+        asyncio.run(run())
+        self.assertEqual(sorted(bot.calls), [1, 2])
+        self.assertTrue(cache.contains(10))
+        self.assertFalse(cache.contains(20))
+
+        service.handle_notice({"notice_type": "group_increase", "group_id": 1, "user_id": 99})
+        self.assertTrue(cache.contains(99))
+
+    def test_retry_after_failure(self):
+        bot = _FlakyBot()
+        service = GroupMemberService(bot)
+        cache = AdminGroupCache(ttl=300, retry_ttl=0.05)
+
+        asyncio.run(cache.ensure_fresh(service, [1]))
+        self.assertFalse(cache.contains(10))
+        # 重试间隔内不再拉取
+        asyncio.run(cache.ensure_fresh(service, [1]))
+        self.assertEqual(len(bot.calls), 1)
+
+        time.sleep(0.06)
+        asyncio.run(cache.ensure_fresh(service, [1]))
+        self.assertTrue(cache.contains(10))
+        self.assertEqual(len(bot.calls), 2)
+
+class TestUnboundTracker(unittest.TestCase):
+    """测试未绑定成员增量维护"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils UnboundTracker **")
+
+    def test_incremental(self):
+        bot = _FakeBot()
+        service = GroupMemberService(bot)
+        bound = {"11"}
+        tracker = UnboundTracker(service, lambda user_id: user_id in bound)
+
+        # 群 1、2 为检查群，群 3 为管理群，12 为管理员
+        tracker.configure([1, 2], [3], [12])
+        asyncio.run(service.ensure_fresh([1, 2, 3]))
+        tracker.rebuild()
+        calls = len(bot.calls)
+        self.assertEqual({m.user_id for m in tracker.unbound(1)}, {"10"})
+        self.assertEqual(tracker.count(), 4)
+
+        # 进群/退群通知
+        service.handle_notice({"notice_type": "group_increase", "group_id": 1, "user_id": 99})
+        service.handle_notice({"notice_type": "group_decrease", "group_id": 2, "user_id": 20})
+        self.assertEqual({m.user_id for m in tracker.unbound(1)}, {"10", "99"})
+        self.assertEqual({m.user_id for m in tracker.unbound(2)}, {"21", "22"})
+
+        # 加入管理群后跳过，离开后恢复
+        service.handle_notice({"notice_type": "group_increase", "group_id": 3, "user_id": 21})
+        self.assertNotIn("21", {m.user_id for m in tracker.unbound(2)})
+        service.handle_notice({"notice_type": "group_decrease", "group_id": 3, "user_id": 21})
+        self.assertIn("21", {m.user_id for m in tracker.unbound(2)})
+
+        # 绑定/解绑
+        bound.add("10")
+        tracker.refresh_users(["10"])
+        bound.discard("11")
+        tracker.refresh_users(["11"])
+        self.assertEqual({m.user_id for m in tracker.unbound(1)}, {"11", "99"})
+
+        # 增量维护不再拉取群成员
+        self.assertEqual(len(bot.calls), calls)
+        self.assertFalse(tracker.configure([1, 2], [3], [12]))
+        self.assertTrue(tracker.configure([1], [3], [12]))
+        self.assertFalse(tracker.ready)
+
+
+class TestOnlineRoster(unittest.TestCase):
+    """测试在线玩家名单"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils OnlineRoster **")
+
+    def test_events_and_resync(self):
+        roster = OnlineRoster()
+        self.assertFalse(roster.ready)
+
+        roster.replace(["Steve", "bot_1"])
+        roster.join("Alex")
+        roster.leave("Steve")
+        self.assertEqual(roster.names(), ["bot_1", "Alex"])
+
+        # 校准期间有事件时放弃过期结果
+        version = roster.version
+        roster.join("Steve")
+        self.assertFalse(roster.replace(["bot_1"], version=version))
+        self.assertIn("Steve", roster)
+
+        roster.clear()
+        self.assertTrue(roster.ready)
+        self.assertEqual(len(roster), 0)
+
+    def test_split_cache(self):
+        roster = OnlineRoster()
+        calls = []
+
+        def is_bot(name):
+            calls.append(name)
+            return name.startswith("bot_")
+
+        roster.replace(["Steve", "bot_1"])
+        self.assertEqual(roster.split(is_bot), (["Steve"], ["bot_1"]))
+        self.assertEqual(roster.split(is_bot), (["Steve"], ["bot_1"]))
+        self.assertEqual(len(calls), 2)
+
+        # /bot list 给出的假人名单直接作为分类
+        roster.replace(["Steve"], ["sese"])
+        self.assertEqual(roster.split(is_bot), (["Steve"], ["sese"]))
+        self.assertEqual(len(calls), 2)
+
+
+
+class _FakeRconServer:
+    """只实现 RconManager 用到的接口"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.running = True
+        self.executed = []
+        self.logger = None
+
+    def is_rcon_running(self):
+        return self.running
+
+    def rcon_query(self, command):
+        time.sleep(self.delay)
+        return f"ok {command}"
+
+    def execute(self, command):
+        self.executed.append(command)
+
+
+class _FakeRconConfig:
+    def __init__(self, **options):
+        self.options = options
+
+    def get_keys(self, keys, default=None):
+        return self.options.get(keys[-1], default)
+
+
+class TestRconManager(unittest.TestCase):
+    """测试 RCON 查询的超时与熔断"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils RconManager **")
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        # 冷却期内只放行一次试探
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+
+    def test_query(self):
+        server = _FakeRconServer()
+        manager = RconManager(server)
+        try:
+            self.assertEqual(asyncio.run(manager.query("list")), "ok list")
+
+            server.running = False
+            self.assertEqual(asyncio.run(manager.execute_async("say hi")), "指令已执行")
+            self.assertEqual(server.executed, ["say hi"])
+        finally:
+            manager.close()
+
+    def test_timeout_opens_breaker(self):
+        server = _FakeRconServer(delay=0.2)
+        manager = RconManager(
+            server, _FakeRconConfig(timeout=0.01, failure_threshold=3, cooldown=60)
+        )
+
+        async def run():
+            for _ in range(2):
+                with self.assertRaises(RconTimeoutError):
+                    await manager.query("list")
+            # 超时不降级重复执行
+            with self.assertRaises(RconTimeoutError):
+                await manager.execute_async("list")
+            with self.assertRaises(RconUnavailableError):
+                await manager.query("list")
+
+        try:
+            asyncio.run(run())
+        finally:
+            manager.close()
+
+        metrics = manager.get_metrics()
+        self.assertEqual(metrics["timeouts"], 3)
+        self.assertEqual(metrics["rejected"], 1)
+        self.assertTrue(metrics["breaker_open"])
+        self.assertEqual(server.executed, [])
+
+
+class _FakeBroadcastConfig:
+    def __init__(self, **options):
+        self.options = options
+
+    def get_keys(self, keys, default=None):
+        return self.options.get(keys[-1], default)
+
+
+class _FakeServer:
+    def __init__(self):
+        self.logger = logging.getLogger("test_connector_manager")
+
+
+class _SleepyConnector:
+    """send_message 会等待一段时间的测试连接器"""
+
+    def __init__(self, source, delay=0.0, error=None, **options):
+        self.source = source
+        self.delay = delay
+        self.error = error
+        self.active = 0
+        self.peak = 0
+        self.sent = []
+        for key, value in options.items():
+            setattr(self, key, value)
+
+    async def connect(self):
+        return
+
+    async def disconnect(self):
+        return
+
+    async def send_message(self, message):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            self.sent.append(message)
+        finally:
+            self.active -= 1
+
+
+class TestConnectorManager(unittest.TestCase):
+    """测试连接器管理器的广播"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils ConnectorManager **")
+
+    @staticmethod
+    async def _build(*connectors, **options):
+        options.setdefault("send_timeout", 5)
+        options.setdefault("max_concurrent_sends", 8)
+        manager = ConnectorManager(_FakeServer(), _FakeBroadcastConfig(**options))
+        for connector in connectors:
+            await manager.register_connector(connector)
+        return manager
+
+    def test_timeout_includes_semaphore_wait(self):
+        connector = _SleepyConnector("slow", delay=0.3, send_timeout=0.5, max_concurrent_sends=1)
+
+        async def run():
+            manager = await self._build(connector)
+            results = await asyncio.gather(
+                manager.broadcast_processed_info("a"),
+                manager.broadcast_processed_info("b"),
+            )
+            return manager, results
+
+        manager, results = asyncio.run(run())
+        # 第二条消息排队 0.3 秒，加上发送 0.3 秒超过了 0.5 秒的超时
+        self.assertEqual(results[0], {})
+        self.assertIsInstance(results[1]["slow"], asyncio.TimeoutError)
+        stats = manager.get_metrics()["broadcast"]["connectors"]["slow"]
+        self.assertEqual(stats, {"sent": 1, "failed": 0, "timeout": 1})
+
+    def test_concurrency_cap(self):
+        connector = _SleepyConnector("capped", delay=0.02, max_concurrent_sends=2)
+
+        async def run():
+            manager = await self._build(connector)
+            await asyncio.gather(*(manager.broadcast_processed_info(i) for i in range(5)))
+
+        asyncio.run(run())
+        self.assertEqual(connector.peak, 2)
+        self.assertEqual(sorted(connector.sent), list(range(5)))
+
+    def test_fire_and_forget_on_failure(self):
+        broken = _SleepyConnector("broken", delay=0.01, error=RuntimeError("boom"))
+        healthy = _SleepyConnector("healthy", delay=0.01)
+        failures = []
+
+        async def run():
+            manager = await self._build(broken, healthy, wait_for_delivery=False)
+            result = await manager.broadcast_processed_info(
+                "hello",
+                on_failure=lambda connector, message, e: failures.append((connector.source, message, e)),
+            )
+            pending = manager.get_metrics()["broadcast"]["pending"]
+            await asyncio.gather(*list(manager._background_tasks), return_exceptions=True)
+            return manager, result, pending
+
+        manager, result, pending = asyncio.run(run())
+        self.assertEqual(result, {})
+        self.assertEqual(pending, 2)
+        self.assertEqual(manager.get_metrics()["broadcast"]["pending"], 0)
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0][:2], ("broken", "hello"))
+        self.assertIsInstance(failures[0][2], RuntimeError)
+        self.assertEqual(healthy.sent, ["hello"])
+
+    def test_route_cache(self):
+        qq = _SleepyConnector("QQ")
+        mc = _SleepyConnector("Minecraft")
+        bridge = _SleepyConnector("Minecraft_bridge")
+
+        async def run():
+            manager = await self._build(qq, mc, bridge)
+            self.assertEqual(manager._route(None, None), [qq, mc, bridge])
+            self.assertEqual(manager._route(["Minecraft"], None), [mc, bridge])
+            self.assertEqual(manager._route(["Minecraft"], ["Minecraft_bridge"]), [mc])
+            self.assertEqual(manager._route(None, ["QQ"]), [mc, bridge])
+            self.assertEqual(set(manager._route_cache), {"Minecraft", "Minecraft_bridge", "QQ"})
+
+            # 连接器变化后路由表失效
+            version = manager.routes_version
+            extra = _SleepyConnector("Minecraft_extra")
+            await manager.register_connector(extra)
+            self.assertEqual(manager.routes_version, version + 1)
+            self.assertEqual(manager._route_cache, {})
+            self.assertEqual(manager._route(["Minecraft"], ["Minecraft_bridge"]), [mc, extra])
+
+        asyncio.run(run())
+
+
+class TestInactiveCheckPlayTimes(unittest.TestCase):
+    """测试不活跃检查的存档扫描"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils InactiveCheck PlayTimes **")
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.player_data_dir = Path(self._tmp.name)
+        for name, mtime in (
+            ("AAAA-java", 1000),
+            ("bbbb-bedrock", 3000),
+            ("cccc-alt", 2000),
+        ):
+            path = self.player_data_dir / f"{name}.dat"
+            path.write_bytes(b"")
+            os.utime(path, (mtime, mtime))
+        # 非 .dat 文件和子目录都被忽略
+        (self.player_data_dir / "AAAA-java.dat_old").write_bytes(b"")
+        (self.player_data_dir / "nested").mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_scan_playerdata(self):
+        mtimes = InactiveCheckSystem._scan_playerdata(self.player_data_dir)
+        self.assertEqual(
+            mtimes, {"aaaa-java": 1000, "bbbb-bedrock": 3000, "cccc-alt": 2000}
+        )
+
+    def test_collect_play_times(self):
+        system = InactiveCheckSystem.__new__(InactiveCheckSystem)
+        system.logger = logging.getLogger("test_inactive_check")
+        system._get_name_uuid_map = lambda: {"steve": "AAAA-java", "alex_alt": "cccc-alt"}
+
+        players = [
+            SimpleNamespace(name="steve", java_name=["Steve"], bedrock_name=["SteveBE"]),
+            SimpleNamespace(name="alex", java_name=["Alex", "Alex_Alt"], bedrock_name=[]),
+            SimpleNamespace(name="ghost", java_name=["Ghost"], bedrock_name=["GhostBE"]),
+        ]
+        play_times = system._collect_play_times(
+            players,
+            self.player_data_dir,
+            bedrock_uuids={"stevebe": "BBBB-bedrock", "ghostbe": None},
+        )
+
+        # 取所有账号中最新的存档时间，没有存档的玩家不出现
+        self.assertEqual(play_times, {"steve": 3000, "alex": 2000})
+
+
+class _FakeDataServer:
+    def __init__(self, data_folder):
+        self.logger = logging.getLogger("test_player_manager")
+        self.data_folder = data_folder
+
+    def get_data_folder(self):
+        return self.data_folder
+
+
+class TestPlayerManager(unittest.TestCase):
+    """测试玩家管理器的名称与账号索引"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Utils PlayerManager **")
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.server = _FakeDataServer(self._tmp.name)
+        self.manager = PlayerManager(self.server, SimpleNamespace(config=None))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_name_index(self):
+        self.manager.add_player("steve", "Steve")
+        player = self.manager.add_player("steve", "SteveBE", is_bedrock=True)
+
+        self.assertIs(self.manager.get_player("STEVE"), player)
+        self.assertIs(self.manager.get_player("stevebe"), player)
+        self.assertIsNone(self.manager.get_player("Steve", name_only=True))
+
+        # 外部直接修改 Player 后 save() 使索引在下次查询时重建
+        player.java_name.append("Notch")
+        self.manager.save()
+        self.assertIs(self.manager.get_player("notch"), player)
+
+        self.manager.remove_player("steve")
+        self.assertIsNone(self.manager.get_player("Steve"))
+
+    def test_exact_name_first(self):
+        upper = self.manager.add_player("upper", "Steve")
+        lower = self.manager.add_player("lower", "steve")
+        self.assertIs(self.manager.get_player("steve"), lower)
+        self.assertIs(self.manager.get_player("Steve"), upper)
+        self.assertIs(self.manager.get_player("STEVE"), upper)
+
+    def test_account_index(self):
+        changes = []
+        self.manager.add_account_listener(changes.append)
+
+        steve = self.manager.add_player("steve", "Steve")
+        self.manager.add_player_account("steve", "QQ", "123")
+        alex = self.manager.add_player("alex", "Alex")
+        self.manager.add_player_account("alex", "QQ", "123")
+
+        self.assertIs(self.manager.get_player("123"), steve)
+        self.assertIs(self.manager.get_player("123", platform="QQ"), steve)
+        self.assertIsNone(self.manager.get_player("123", platform="Discord"))
+        self.assertEqual(changes, [{("QQ", "123")}, {("QQ", "123")}])
+
+        # 同一账号的其他持有者回填到账号索引
+        self.manager.remove_player("steve")
+        self.assertIs(self.manager.get_player("123", platform="QQ"), alex)
+
+        # 外部修改账号后 save() 通知变动的账号
+        alex.accounts["QQ"] = ["456"]
+        self.manager.save()
+        self.assertEqual(changes[-1], {("QQ", "123"), ("QQ", "456")})
+        self.assertIs(self.manager.get_player("456"), alex)
+        self.assertIsNone(self.manager.get_player("123"))
+
+    def test_reload_builds_index(self):
+        self.manager.add_player_account("Steve", "QQ", "123")
+        reloaded = PlayerManager(self.server, SimpleNamespace(config=None))
+        self.assertEqual(reloaded.get_player("123").name, "Steve")
+        self.assertEqual(reloaded.get_player("steve").accounts, {"QQ": ["123"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
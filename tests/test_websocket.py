@@ -1,7 +1,10 @@
 """WebSocket 模块测试
 
-测试 WebSocket 客户端和服务器的基本功能
+测试 WebSocket 客户端和服务器的基本功能，以及桥接消息编解码
 """
+import asyncio
+import json
+import threading
 import unittest
 import time
 import logging
@@ -9,10 +12,27 @@ from typing import List, Dict
 
 try:
     from gugubot.ws import WebSocketServer, WebSocketClient, WebSocketFactory
+    from gugubot.ws import bridge_codec
+    from gugubot.ws.bridge_codec import PeerCapabilities
+    from gugubot.ws.bridge_rpc import BridgeRpc
+    from gugubot.ws.frame_batcher import FrameBatcher
+    from gugubot.ws.websocket_server import _ClientOutbox
     WS_AVAILABLE = True
 except ImportError:
     WS_AVAILABLE = False
 
+try:
+    from gugubot.connector.bridge_connector import BridgeConnector
+    BRIDGE_AVAILABLE = WS_AVAILABLE
+except ImportError:
+    BRIDGE_AVAILABLE = False
+
+try:
+    from gugubot.connector.qq_connector import Bot
+    QQ_AVAILABLE = WS_AVAILABLE
+except ImportError:
+    QQ_AVAILABLE = False
+
 
 @unittest.skipIf(not WS_AVAILABLE, "WebSocket 模块不可用")
 class TestWebSocketServer(unittest.TestCase):
@@ -135,6 +155,335 @@ class TestWebSocketFactory(unittest.TestCase):
         self.assertIsNone(client.headers)
 
 
+MESSAGE = {
+    "sender": "Steve",
+    "sender_id": "123",
+    "event_sub_type": "group",
+    "receiver": None,
+    "source": ["QQ", "Main"],
+    "source_id": "456",
+    "raw": {"post_type": "message", "sender": {"nickname": "Steve"}},
+    "processed_message": [{"type": "text", "data": {"text": "hello " * 200}}],
+    "target": {},
+    "is_admin": False,
+}
+
+
+@unittest.skipIf(not WS_AVAILABLE, "WebSocket 模块不可用")
+class TestBridgeCodec(unittest.TestCase):
+    """测试桥接消息编解码"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Bridge Codec **")
+
+    def test_legacy(self):
+        frame = bridge_codec.encode(MESSAGE)
+        self.assertEqual(json.loads(frame), MESSAGE)
+        self.assertEqual(bridge_codec.decode(frame), MESSAGE)
+
+    def test_compact_omits_raw(self):
+        frame = bridge_codec.encode(MESSAGE, PeerCapabilities(version=2, want_raw=False))
+        decoded = bridge_codec.decode(frame)
+        self.assertNotIn("raw", decoded)
+        self.assertEqual(decoded["processed_message"], MESSAGE["processed_message"])
+        self.assertEqual(decoded["source"], ["QQ", "Main"])
+        self.assertIs(decoded["is_admin"], False)
+        self.assertLess(len(frame), len(bridge_codec.encode(MESSAGE)))
+
+    def test_compression(self):
+        capabilities = PeerCapabilities(version=2, compression=True, want_raw=True)
+        frame = bridge_codec.encode(MESSAGE, capabilities)
+        self.assertTrue(frame.startswith(bridge_codec.COMPRESSED_PREFIX))
+        self.assertEqual(bridge_codec.decode(frame)["raw"], MESSAGE["raw"])
+
+    def test_hello(self):
+        hello = bridge_codec.make_hello("server", compression=True, want_raw=False)
+        decoded = bridge_codec.decode(json.dumps(hello))
+        self.assertTrue(bridge_codec.is_hello(decoded))
+        capabilities = bridge_codec.parse_hello(decoded, compression=False)
+        self.assertEqual(capabilities, PeerCapabilities(version=2, compression=False, want_raw=False))
+
+    def test_batch_frames(self):
+        frames = [bridge_codec.encode({"sender": f"p{i}", "text": "a\nb"}) for i in range(3)]
+        batch = bridge_codec.encode_batch(frames)
+        self.assertTrue(batch.startswith(bridge_codec.BATCH_PREFIX))
+        decoded = bridge_codec.decode_frames(batch)
+        self.assertEqual([item["sender"] for item in decoded], ["p0", "p1", "p2"])
+        self.assertEqual(decoded[0]["text"], "a\nb")
+        self.assertEqual(bridge_codec.decode_frames(frames[0]), [json.loads(frames[0])])
+
+
+@unittest.skipIf(not WS_AVAILABLE, "WebSocket 模块不可用")
+class TestFrameBatcher(unittest.TestCase):
+    """测试帧合并发送"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Frame Batcher **")
+
+    def test_idle_sends_immediately(self):
+        sent = []
+        batcher = FrameBatcher(lambda frame: sent.append(frame) or True, window=10)
+        batcher.put("a")
+        self.assertEqual(sent, ["a"])
+
+        # 窗口内的帧先缓存，达到上限或 flush 时合并发送
+        batcher.max_size = 3
+        batcher.put("b")
+        batcher.put("c")
+        self.assertEqual(len(sent), 1)
+        batcher.put("d")
+        self.assertEqual(sent[1], bridge_codec.encode_batch(["b", "c", "d"]))
+        batcher.put("e")
+        batcher.flush()
+        self.assertEqual(sent[2], "e")
+        self.assertEqual(batcher.frames, 5)
+
+
+class _GatedServer:
+    """在 gate 打开前阻塞发送的假服务器，用于让消息堆积在发送队列中"""
+
+    def __init__(self):
+        self.server = self
+        self.logger = logging.getLogger("test_client_outbox")
+        self.gate = threading.Event()
+        self.sent = []
+
+    def send_message(self, client, message):
+        self.gate.wait(timeout=5)
+        self.sent.append(message)
+
+
+@unittest.skipIf(not WS_AVAILABLE, "WebSocket 模块不可用")
+class TestClientOutbox(unittest.TestCase):
+    """测试客户端发送队列的溢出策略"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Client Outbox **")
+
+    def _blocked_outbox(self, policy, max_size=2):
+        server = _GatedServer()
+        outbox = _ClientOutbox(server, {"id": 1}, max_size=max_size, policy=policy)
+        # 第一条消息被发送线程取走并阻塞在发送中，之后的消息留在队列里
+        outbox.put("a")
+        deadline = time.monotonic() + 1
+        while outbox.get_metrics()["depth"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return server, outbox
+
+    def _drain(self, server, outbox):
+        server.gate.set()
+        outbox.close(timeout=1)
+        return server.sent
+
+    def test_drop_oldest(self):
+        server, outbox = self._blocked_outbox("drop_oldest")
+        self.assertTrue(outbox.put("b"))
+        self.assertTrue(outbox.put("c"))
+        self.assertTrue(outbox.put("d"))
+        self.assertTrue(outbox.put("x", control=True))
+        self.assertTrue(outbox.put("e"))
+
+        self.assertEqual(self._drain(server, outbox), ["a", "d", "x", "e"])
+        self.assertEqual(
+            outbox.get_metrics(),
+            {"depth": 0, "max_depth": 3, "sent": 4, "frames": 4, "dropped": 2},
+        )
+
+    def test_drop_newest(self):
+        server, outbox = self._blocked_outbox("drop_newest")
+        self.assertTrue(outbox.put("b"))
+        self.assertTrue(outbox.put("c"))
+        self.assertFalse(outbox.put("d"))
+        self.assertTrue(outbox.put("x", control=True))
+
+        self.assertEqual(self._drain(server, outbox), ["a", "b", "c", "x"])
+        self.assertEqual(outbox.get_metrics()["dropped"], 1)
+        self.assertEqual(outbox.get_metrics()["max_depth"], 3)
+
+    def test_control_frames_never_dropped(self):
+        server, outbox = self._blocked_outbox("drop_oldest", max_size=1)
+        for i in range(3):
+            self.assertTrue(outbox.put(f"ctrl{i}", control=True))
+        # 队列中只有控制帧时，新的普通消息被丢弃
+        self.assertFalse(outbox.put("chat"))
+
+        self.assertEqual(self._drain(server, outbox), ["a", "ctrl0", "ctrl1", "ctrl2"])
+        self.assertEqual(outbox.get_metrics()["dropped"], 1)
+
+
+@unittest.skipIf(not QQ_AVAILABLE, "QQ 连接器不可用")
+class TestQQBotEcho(unittest.TestCase):
+    """测试 OneBot API 调用的 echo 响应"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing QQ Bot Echo **")
+
+    def test_echo_resolves_future(self):
+        requests = []
+
+        async def send_message(request):
+            requests.append(request)
+            # 模拟 WebSocket 线程收到响应
+            threading.Thread(
+                target=bot.resolve, args=(request["echo"], {"user_id": 1})
+            ).start()
+
+        bot = Bot(send_message)
+
+        result = asyncio.run(bot.get_login_info())
+        self.assertEqual(result, {"user_id": 1})
+        self.assertEqual(requests[0]["action"], "get_login_info")
+        self.assertEqual(bot._pending, {})
+        self.assertEqual(bot.late_responses, 0)
+
+    def test_timeout_cleans_up(self):
+        requests = []
+
+        async def send_message(request):
+            requests.append(request)
+
+        bot = Bot(send_message)
+
+        result = asyncio.run(bot.get_group_member_list(group_id=1, wait_timeout=0.05))
+        self.assertIsNone(result)
+        self.assertEqual(bot._pending, {})
+
+        # 超时后才到达的响应没有等待方，只计数
+        self.assertFalse(bot.resolve(requests[0]["echo"], {}))
+        self.assertEqual(bot.late_responses, 1)
+
+
+class _FakeRuntime:
+    def call_soon(self, callback, *args):
+        asyncio.get_running_loop().call_soon(callback, *args)
+
+
+class _FakeConnectorManager:
+    runtime = _FakeRuntime()
+
+
+class _FakeBridgeServer:
+    def get_client_count(self):
+        return 2
+
+
+@unittest.skipIf(not BRIDGE_AVAILABLE, "桥接连接器不可用")
+class TestBridgeInboundOrder(unittest.TestCase):
+    """测试桥接入站消息按到达顺序处理"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Bridge Inbound Order **")
+
+    def _make_connector(self, handled):
+        connector = BridgeConnector.__new__(BridgeConnector)
+        connector.logger = logging.getLogger("test_bridge")
+        connector.log_prefix = "[test]"
+        connector.connector_manager = _FakeConnectorManager()
+        connector.ws_server = _FakeBridgeServer()
+        connector._inbound = {}
+        connector._inbound_workers = {}
+        connector._broadcast = lambda message_data, exclude=None: 0
+
+        async def is_admin(sender_id):
+            # 第一条消息的管理员判断很慢
+            await asyncio.sleep(0.05 if sender_id == "slow" else 0)
+            return False
+
+        async def process(message_data):
+            handled.append(message_data["n"])
+
+        connector._is_admin = is_admin
+        connector._process_bridge_message = process
+        return connector
+
+    def test_slow_message_not_overtaken(self):
+        handled = []
+        connector = self._make_connector(handled)
+        client = {"id": 1, "address": ["127.0.0.1", 0]}
+
+        async def run():
+            connector._handle_server_message(client, None, json.dumps({"sender_id": "slow", "n": 1}))
+            connector._handle_server_message(client, None, json.dumps({"sender_id": "fast", "n": 2}))
+            connector._handle_server_message(
+                client, None, bridge_codec.encode_batch([json.dumps({"n": 3}), json.dumps({"n": 4})])
+            )
+            await asyncio.sleep(0)
+            await asyncio.gather(*connector._inbound_workers.values())
+
+        asyncio.run(run())
+        self.assertEqual(handled, [1, 2, 3, 4])
+        self.assertEqual(connector._inbound, {})
+
+
+@unittest.skipIf(not WS_AVAILABLE, "WebSocket 模块不可用")
+class TestBridgeRpc(unittest.TestCase):
+    """测试桥接 RPC"""
+
+    @classmethod
+    def setUpClass(cls):
+        print("\n** Testing Bridge Rpc **")
+
+    def test_call_completes_when_all_peers_reply(self):
+        server = BridgeRpc()
+        clients = {peer: BridgeRpc() for peer in ("a", "b")}
+
+        async def list_players(params):
+            return {"players": ["Steve"], "type": params["list_type"]}
+
+        async def run():
+            for peer, client in clients.items():
+                client.register("list.players", list_players)
+                server.add_peer(peer)
+
+            def send(peer, frame):
+                # 经过一次编解码，模拟真实传输
+                def reply(response):
+                    response = bridge_codec.decode(json.dumps(response))
+                    asyncio.ensure_future(server.handle(peer, response, None))
+                    return True
+
+                frame = bridge_codec.decode(json.dumps(frame))
+                asyncio.ensure_future(clients[peer].handle("server", frame, reply))
+                return True
+
+            start = time.perf_counter()
+            results = await server.call("list.players", {"list_type": "all"}, send, timeout=5)
+            return results, time.perf_counter() - start
+
+        results, elapsed = asyncio.run(run())
+        self.assertEqual(set(results), {"a", "b"})
+        self.assertEqual(results["a"]["type"], "all")
+        self.assertLess(elapsed, 1)
+
+    def test_timeout_and_disconnect(self):
+        server = BridgeRpc()
+
+        async def run():
+            server.add_peer("silent")
+            server.add_peer("gone")
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.05, server.remove_peer, "gone")
+            return await server.call("list.players", None, lambda peer, frame: True, timeout=0.2)
+
+        self.assertEqual(asyncio.run(run()), {})
+        self.assertEqual(server.get_metrics()["timeouts"], 1)
+        self.assertEqual(server.peers(), {"silent"})
+
+    def test_unknown_method(self):
+        replies = []
+        asyncio.run(
+            BridgeRpc().handle("server", bridge_codec.make_rpc_request("1", "nope"), replies.append)
+        )
+        self.assertEqual(replies[0]["id"], "1")
+        self.assertIn("error", replies[0])
+        self.assertTrue(bridge_codec.is_rpc(replies[0]))
+
+
 if __name__ == '__main__':
     # 配置日志
     logging.basicConfig(
@@ -143,4 +492,3 @@ if __name__ == '__main__':
     )
     
     unittest.main()
-